@@ -1,20 +1,388 @@
 import os
-from typing import Dict, Any, Optional
-from anthropic import Anthropic
-from openai import OpenAI
+import re
+import json
+import time
+import random
+import asyncio
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
+from typing import AsyncIterator, Callable, Dict, Any, Iterator, List, Optional, Tuple, Union
+import anthropic
+import openai
+from anthropic import Anthropic, AsyncAnthropic
+from openai import OpenAI, AsyncOpenAI
+
+from analysis_cache import AnalysisCache
+from condenser import DEFAULT_RESUME_TOKENS, condense_resume, estimate_tokens
+from rate_limiter import RateLimiter
+
+
+# Default number of in-flight provider requests for batch analysis
+DEFAULT_CONCURRENCY = 5
+
+# Progress callback of the multi-resume methods: (index, result)
+ResultCallback = Callable[[int, Dict[str, Any]], None]
+
+# Retries after rate limits, overload and transient errors, with full-jitter
+# exponential backoff (never shorter than the provider's retry-after)
+DEFAULT_MAX_RETRIES = 4
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+RATE_LIMIT_STATUS_CODES = {429, 529}
+
+# Model used for each provider unless one is passed explicitly
+DEFAULT_MODELS = {
+    "anthropic": "claude-3-5-sonnet-20241022",
+    "openai": "gpt-4o"
+}
+
+# Small, fast models used as the first tier of a model cascade
+FAST_MODELS = {
+    "anthropic": "claude-3-5-haiku-20241022",
+    "openai": "gpt-4o-mini"
+}
+
+# Bump whenever the prompt templates or response parsing change, so cached
+# analyses produced by older prompts are not reused
+PROMPT_VERSION = "2"
+
+# Instructions and output format for job description-based analysis
+JD_INSTRUCTIONS = "You are an expert HR recruiter analyzing resumes. Compare the following resume against the job description to determine if the candidate should be invited for an interview."
+
+JD_RESPONSE_FORMAT = """IMPORTANT: You MUST respond with actual numeric scores (0-100), not placeholders like "[0-100]".
+
+Please provide a detailed analysis in the following EXACT format:
+
+OVERALL SCORE: 75
+(Your actual numeric score from 0-100)
+
+INTERVIEW RECOMMENDATION: Yes
+(Choose: Yes / No / Maybe)
+
+KEY QUALIFICATIONS MATCH: 80
+(Your actual numeric score from 0-100)
+
+SKILLS ASSESSMENT: 75
+(Your actual numeric score from 0-100)
+
+EXPERIENCE ASSESSMENT: 70
+(Your actual numeric score from 0-100)
+
+EDUCATION ASSESSMENT: 85
+(Your actual numeric score from 0-100)
+
+STRENGTHS:
+- Strong Python development skills
+- Experience with cloud infrastructure
+- Excellent communication abilities
+
+GAPS & CONCERNS:
+- Limited experience with team leadership
+- Missing some advanced certifications
+
+INTERVIEW QUESTIONS:
+- Tell me about a challenging project you led
+- How do you stay updated with new technologies?
+
+SUMMARY:
+A solid candidate with strong technical skills who would be a good fit for the role.
+
+REMEMBER: Replace the example numbers above with your actual scores. Do NOT include "[0-100]" or similar placeholders.
+"""
+
+# Instructions and output format for criteria-based analysis
+CRITERIA_INSTRUCTIONS = "You are an expert HR recruiter analyzing resumes. Please analyze the following resume against the given criteria."
+
+CRITERIA_RESPONSE_FORMAT = """IMPORTANT: You MUST respond with actual numeric scores (0-100), not placeholders like "[0-100]".
+
+Please provide a detailed analysis in the following EXACT format:
+
+OVERALL SCORE: 75
+(Your actual numeric score from 0-100)
+
+INTERVIEW RECOMMENDATION: Yes
+(Choose: Yes / No / Maybe)
+
+SKILLS MATCH: 75
+(Your actual numeric score from 0-100)
+
+EXPERIENCE ASSESSMENT: 70
+(Your actual numeric score from 0-100)
+
+EDUCATION ASSESSMENT: 85
+(Your actual numeric score from 0-100)
+
+STRENGTHS:
+- Strong technical background
+- Relevant work experience
+- Good educational qualifications
+
+GAPS & CONCERNS:
+- Missing some specific skills
+- Limited industry experience
+
+INTERVIEW QUESTIONS:
+- Describe your experience with key technologies
+- How do you approach problem-solving?
+
+SUMMARY:
+A qualified candidate who meets most requirements.
+
+REMEMBER: Replace the example numbers above with your actual scores. Do NOT include "[0-100]" or similar placeholders.
+"""
+
+# Output formats: "text" is the labelled free-text format above; "json" asks
+# for a compact structured result (a forced tool call on Anthropic, a strict
+# JSON schema response on OpenAI) that needs far fewer completion tokens
+OUTPUT_FORMATS = ("text", "json")
+TEXT_MAX_TOKENS = 2500
+JSON_MAX_TOKENS = 600
+
+JSON_RESPONSE_FORMAT = """Give every score as a whole number from 0 to 100 and an interview recommendation of Yes, No or Maybe. List at most 3 strengths, 3 gaps or concerns and 3 interview questions, each under 15 words, and write a summary of at most two sentences. Respond only with the structured analysis.
+"""
+
+ANALYSIS_TOOL_NAME = "record_analysis"
+
+_SCORE_SCHEMA = {"type": "integer", "minimum": 0, "maximum": 100}
+_LIST_SCHEMA = {"type": "array", "items": {"type": "string", "maxLength": 120}, "maxItems": 3}
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "overall_score": _SCORE_SCHEMA,
+        "interview_recommendation": {"type": "string", "enum": ["Yes", "No", "Maybe"]},
+        "qualifications_score": _SCORE_SCHEMA,
+        "skills_score": _SCORE_SCHEMA,
+        "experience_score": _SCORE_SCHEMA,
+        "education_score": _SCORE_SCHEMA,
+        "strengths": _LIST_SCHEMA,
+        "weaknesses": _LIST_SCHEMA,
+        "interview_questions": _LIST_SCHEMA,
+        "summary": {"type": "string", "maxLength": 300}
+    },
+    "required": [
+        "overall_score", "interview_recommendation", "qualifications_score", "skills_score",
+        "experience_score", "education_score", "strengths", "weaknesses",
+        "interview_questions", "summary"
+    ],
+    "additionalProperties": False
+}
+
+# Keywords OpenAI strict schemas reject; the prompt states those limits instead
+UNSUPPORTED_STRICT_KEYWORDS = ("minimum", "maximum", "maxLength", "maxItems")
+
+# Supported prompt layouts: "inline" places the resume between the job
+# details and the instructions; "shared_prefix" puts everything that is the
+# same across a batch first so providers can cache it
+PROMPT_LAYOUTS = ("inline", "shared_prefix")
+
+# Batched scoring packs several resumes into one request. The budget bounds
+# the estimated input tokens per request; output is capped by how many
+# candidate analyses fit in MAX_BATCH_OUTPUT_TOKENS.
+DEFAULT_BATCH_TOKEN_BUDGET = 12000
+BATCH_OUTPUT_TOKENS_PER_CANDIDATE = 700
+MAX_BATCH_OUTPUT_TOKENS = 8000
+
+BATCH_INSTRUCTIONS = """You will be given several resumes, each starting with a line "=== CANDIDATE n ===". Analyze every candidate independently against the requirements above.
+
+For each candidate, in order, first write the line "=== CANDIDATE n ===" with the same n, then the analysis in the EXACT format above. Do not skip any candidate.
+"""
+
+# Delimiter line between candidates in batched prompts and replies
+CANDIDATE_MARKER = re.compile(r'^\s*=+\s*CANDIDATE\s+(\d+)\s*=+\s*$', re.MULTILINE)
+
+
+class AnalysisStreamParser:
+    """Incremental parser for the analysis response format.
+
+    Text can be fed in arbitrary chunks as a completion streams in. Each
+    call to feed() returns the names of the fields that became final:
+    scores and the recommendation as soon as their line is complete, lists
+    and the summary once the next section starts (or at close()).
+    """
+
+    LIST_SECTIONS = ('strengths', 'weaknesses', 'interview_questions')
+    BULLET_PREFIXES = {
+        'strengths': ('-', '•', '1.', '2.', '3.'),
+        'weaknesses': ('-', '•', '1.', '2.', '3.'),
+        'interview_questions': ('-', '•', '1.', '2.', '3.', '4.')
+    }
+
+    def __init__(self, extract_score: Callable[[str], int]):
+        """Initialize the parser.
+
+        Args:
+            extract_score: Turns the text after a score label into 0-100
+        """
+        self.extract_score = extract_score
+        self.result = {
+            "overall_score": 0,
+            "skills_score": 0,
+            "experience_score": 0,
+            "education_score": 0,
+            "qualifications_score": 0,
+            "strengths": [],
+            "weaknesses": [],
+            "interview_questions": [],
+            "interview_recommendation": "",
+            "recommendation": "",
+            "summary": "",
+            "detailed_analysis": ""
+        }
+        self._buffer = ""
+        self._section: Optional[str] = None
+
+    def feed(self, text: str) -> List[str]:
+        """Consume a chunk of the response; return the fields completed by it."""
+        self.result['detailed_analysis'] += text
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split('\n')
+        completed = []
+        for line in lines:
+            completed += self._parse_line(line)
+        return completed
+
+    def close(self) -> List[str]:
+        """Parse any unterminated last line; return the fields completed by it."""
+        completed = self._parse_line(self._buffer) if self._buffer else []
+        self._buffer = ""
+        completed += self._enter_section(None)
+        return completed
+
+    def _enter_section(self, section: Optional[str]) -> List[str]:
+        """Switch sections, reporting the one left if it collected content."""
+        previous, self._section = self._section, section
+        if previous != section and (previous in self.LIST_SECTIONS or previous == 'summary'):
+            if previous == 'summary':
+                self.result['summary'] = self.result['summary'].strip()
+            return [previous]
+        return []
+
+    def _score(self, line: str) -> int:
+        """Extract the score after a label."""
+        score_part = line.split(':', 1)[1].strip() if ':' in line else ''
+        return self.extract_score(score_part)
+
+    def _parse_line(self, line: str) -> List[str]:
+        """Parse one complete line of the response."""
+        line = line.strip()
+        result = self.result
+
+        if line.startswith('OVERALL SCORE:'):
+            result['overall_score'] = self._score(line)
+            return ['overall_score']
+
+        if line.startswith('INTERVIEW RECOMMENDATION:'):
+            result['interview_recommendation'] = line.split(':', 1)[1].strip()
+            result['recommendation'] = result['interview_recommendation']
+            return self._enter_section(None) + ['interview_recommendation', 'recommendation']
+
+        if line.startswith('KEY QUALIFICATIONS MATCH:'):
+            result['qualifications_score'] = self._score(line)
+            return self._enter_section('qualifications') + ['qualifications_score']
+
+        if line.startswith('SKILLS MATCH:') or line.startswith('SKILLS ASSESSMENT:'):
+            result['skills_score'] = self._score(line)
+            return self._enter_section('skills') + ['skills_score']
+
+        if line.startswith('EXPERIENCE ASSESSMENT:'):
+            result['experience_score'] = self._score(line)
+            return self._enter_section('experience') + ['experience_score']
+
+        if line.startswith('EDUCATION ASSESSMENT:'):
+            result['education_score'] = self._score(line)
+            return self._enter_section('education') + ['education_score']
+
+        if line.startswith('STRENGTHS:'):
+            completed = self._enter_section('strengths')
+            result['strengths'] = []
+            return completed
+
+        if line.startswith('GAPS & CONCERNS:') or line.startswith('WEAKNESSES/GAPS:'):
+            completed = self._enter_section('weaknesses')
+            result['weaknesses'] = []
+            return completed
+
+        if line.startswith('INTERVIEW QUESTIONS:'):
+            completed = self._enter_section('interview_questions')
+            result['interview_questions'] = []
+            return completed
+
+        if line.startswith('SUMMARY:'):
+            completed = self._enter_section('summary')
+            result['summary'] = ''
+            return completed
+
+        if line and self._section in self.LIST_SECTIONS:
+            if line.startswith(self.BULLET_PREFIXES[self._section]):
+                result[self._section].append(line.lstrip('-•123456789. ').strip())
+        elif line and self._section == 'summary':
+            result['summary'] += line + ' '
+        return []
+
+
+def rank_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Order results by overall score, highest first, with errors at the end."""
+    valid_results = [r for r in results if 'error' not in r]
+    valid_results.sort(key=lambda x: x.get('overall_score', 0), reverse=True)
+    error_results = [r for r in results if 'error' in r]
+    return valid_results + error_results
 
 
 class AIAnalyzer:
     """Use AI (Claude or GPT) to analyze and score resumes."""
 
-    def __init__(self, api_key: Optional[str] = None, provider: str = "anthropic"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        provider: str = "anthropic",
+        model: Optional[str] = None,
+        cache: Optional[AnalysisCache] = None,
+        prompt_layout: str = "inline",
+        base_url: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        resume_token_budget: Optional[int] = DEFAULT_RESUME_TOKENS,
+        output_format: str = "text"
+    ):
         """Initialize the AI analyzer with API key and provider.
 
         Args:
             api_key: The API key for the selected provider
             provider: Either "anthropic" or "openai"
+            model: Model name, defaults to the provider's entry in DEFAULT_MODELS
+            cache: Optional store of previous results, reused for identical requests
+            prompt_layout: One of PROMPT_LAYOUTS; "shared_prefix" enables
+                provider-side prompt caching across a batch
+            base_url: Alternative API endpoint, e.g. a local stand-in server
+                (OpenAI base URLs include the /v1 suffix)
+            rate_limiter: Optional request/token budget every call waits for
+            max_retries: Retries per call after rate limits and transient
+                errors (the SDK clients' own retries are turned off)
+            resume_token_budget: Tokens each resume is condensed to in the
+                prompt, or None to send the whole (cleaned) text
+            output_format: One of OUTPUT_FORMATS for single-resume requests;
+                streaming and batched requests always use "text"
         """
         self.provider = provider.lower()
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.resume_token_budget = resume_token_budget
+        self.model = model or DEFAULT_MODELS.get(self.provider)
+        self.cache = cache
+
+        if prompt_layout not in PROMPT_LAYOUTS:
+            raise ValueError(
+                f"Unsupported prompt layout: {prompt_layout}. Use one of {', '.join(PROMPT_LAYOUTS)}"
+            )
+        self.prompt_layout = prompt_layout
+
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unsupported output format: {output_format}. Use one of {', '.join(OUTPUT_FORMATS)}"
+            )
+        self.output_format = output_format
 
         if self.provider == "anthropic":
             self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
@@ -22,180 +390,937 @@ class AIAnalyzer:
                 raise ValueError(
                     "Anthropic API key not found. Please provide ANTHROPIC_API_KEY."
                 )
-            self.client = Anthropic(api_key=self.api_key)
+            self.client = Anthropic(api_key=self.api_key, base_url=self.base_url, max_retries=0)
         elif self.provider == "openai":
             self.api_key = api_key or os.getenv('OPENAI_API_KEY')
             if not self.api_key:
                 raise ValueError(
                     "OpenAI API key not found. Please provide OPENAI_API_KEY."
                 )
-            self.client = OpenAI(api_key=self.api_key)
+            self.client = OpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
         else:
             raise ValueError(f"Unsupported provider: {provider}. Use 'anthropic' or 'openai'")
 
     def analyze_resume(
         self,
         resume_text: str,
-        criteria: Dict[str, Any]
+        criteria: Dict[str, Any],
+        refresh: bool = False
     ) -> Dict[str, Any]:
         """Analyze a resume against screening criteria using AI.
 
         Args:
             resume_text: The text content of the resume
             criteria: Dictionary containing screening criteria including job description
+            refresh: Skip cached results and re-analyze (the new result is still stored)
 
         Returns:
             Dictionary with analysis results including score and details
         """
-        prompt = self._build_analysis_prompt(resume_text, criteria)
+        cache_key = self._cache_key(resume_text, criteria)
+        if cache_key and not refresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            message = self._create(self.client, self._request_params(resume_text, criteria))
+            result = self._parse_response(message)
+            if cache_key:
+                self._store(cache_key, result)
+            return result
+
+        except Exception as e:
+            print(f"Error analyzing resume with AI: {e}")
+            return self._error_result(e)
+
+    def analyze_resume_stream(
+        self,
+        resume_text: str,
+        criteria: Dict[str, Any],
+        refresh: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """Analyze a resume, yielding each field as soon as the completion contains it.
+
+        The headline scores and recommendation come first in the response, so
+        they are available long before the lists and summary are written.
+
+        Args:
+            resume_text: The text content of the resume
+            criteria: Dictionary containing screening criteria including job description
+            refresh: Skip cached results and re-analyze (the new result is still stored)
+
+        Yields:
+            {"type": "field", "field": name, "value": value} for each finished
+            field, then {"type": "result", "result": result} with the same
+            dictionary analyze_resume would return
+        """
+        cache_key = self._cache_key(resume_text, criteria, output_format="text")
+        if cache_key and not refresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield {"type": "result", "result": cached}
+                return
+
+        try:
+            params = self._stream_params(self._request_params(resume_text, criteria, "text"))
+            stream = self._create(self.client, params)
+            parser = AnalysisStreamParser(self._extract_score)
+            usage: Dict[str, Any] = {}
+            for chunk in stream:
+                yield from self._field_events(parser, parser.feed(self._stream_delta(chunk, usage)))
+            yield from self._field_events(parser, parser.close())
+            result = self._finish_stream(parser, usage, self._reserved_tokens(params))
+            if cache_key:
+                self._store(cache_key, result)
+
+        except Exception as e:
+            print(f"Error analyzing resume with AI: {e}")
+            result = self._error_result(e)
+
+        yield {"type": "result", "result": result}
+
+    def analyze_resumes(
+        self,
+        resume_texts: List[str],
+        criteria: Dict[str, Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        refresh: bool = False,
+        on_result: Optional[ResultCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """Analyze several resumes concurrently.
+
+        Blocking wrapper around analyze_resumes_async for callers that are not
+        running an event loop (Flask views, the Tk worker thread).
+
+        Args:
+            resume_texts: The text content of each resume
+            criteria: Dictionary containing screening criteria including job description
+            concurrency: Maximum number of provider requests in flight at once
+            refresh: Skip cached results and re-analyze every resume
+            on_result: Called with (index, result) as each resume finishes
+
+        Returns:
+            List of analysis results in the same order as resume_texts
+        """
+        return asyncio.run(
+            self.analyze_resumes_async(resume_texts, criteria, concurrency, refresh, on_result)
+        )
+
+    async def analyze_resumes_async(
+        self,
+        resume_texts: List[str],
+        criteria: Dict[str, Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        refresh: bool = False,
+        on_result: Optional[ResultCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """Analyze several resumes with at most `concurrency` requests in flight.
+
+        A failure on one resume produces an error result for that resume only.
+
+        Args:
+            resume_texts: The text content of each resume
+            criteria: Dictionary containing screening criteria including job description
+            concurrency: Maximum number of provider requests in flight at once
+            refresh: Skip cached results and re-analyze every resume
+            on_result: Called with (index, result) as each resume finishes
+
+        Returns:
+            List of analysis results in the same order as resume_texts
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        # Async clients are bound to the event loop they were used on, so
+        # each batch gets its own client and closes it when done.
+        client = self._create_async_client()
+
+        async def analyze_one(index: int, resume_text: str) -> Dict[str, Any]:
+            cache_key = self._cache_key(resume_text, criteria)
+            result = await self._cached_async(cache_key) if cache_key and not refresh else None
+
+            if result is None:
+                async with semaphore:
+                    result = await self._analyze_resume_async(client, resume_text, criteria)
+                if cache_key and 'error' not in result:
+                    await self._store_async(cache_key, result)
+
+            if on_result:
+                on_result(index, result)
+            return result
 
         try:
-            if self.provider == "anthropic":
-                message = self.client.messages.create(
-                    model="claude-3-5-sonnet-20241022",
-                    max_tokens=2500,
-                    temperature=0,
-                    messages=[{
-                        "role": "user",
-                        "content": prompt
-                    }]
+            return await asyncio.gather(*(analyze_one(i, text) for i, text in enumerate(resume_texts)))
+        finally:
+            await client.close()
+
+    async def analyze_resumes_stream_async(
+        self,
+        resume_texts: List[str],
+        criteria: Dict[str, Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        refresh: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream several analyses at once, yielding fields as they arrive.
+
+        Events are those of analyze_resume_stream with an added "index" into
+        resume_texts, interleaved in arrival order. Every resume ends with
+        exactly one "result" event.
+
+        Args:
+            resume_texts: The text content of each resume
+            criteria: Dictionary containing screening criteria including job description
+            concurrency: Maximum number of provider requests in flight at once
+            refresh: Skip cached results and re-analyze every resume
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        client = self._create_async_client()
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def stream_one(index: int, resume_text: str) -> None:
+            try:
+                async with semaphore:
+                    async for event in self._analyze_resume_stream_async(client, resume_text, criteria, refresh):
+                        event['index'] = index
+                        await events.put(event)
+            except Exception as e:
+                # The consumer waits for one result per resume
+                print(f"Error analyzing resume with AI: {e}")
+                await events.put({"type": "result", "index": index, "result": self._error_result(e)})
+
+        tasks = [
+            asyncio.create_task(stream_one(index, text))
+            for index, text in enumerate(resume_texts)
+        ]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                event = await events.get()
+                if event['type'] == 'result':
+                    remaining -= 1
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await client.close()
+
+    def analyze_resumes_batched(
+        self,
+        resume_texts: List[str],
+        criteria: Dict[str, Any],
+        token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        refresh: bool = False,
+        on_result: Optional[ResultCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """Analyze resumes with several candidates packed into each request.
+
+        Blocking wrapper around analyze_resumes_batched_async.
+
+        Args:
+            resume_texts: The text content of each resume
+            criteria: Dictionary containing screening criteria including job description
+            token_budget: Approximate input tokens allowed per request
+            concurrency: Maximum number of provider requests in flight at once
+            refresh: Skip cached results and re-analyze every resume
+            on_result: Called with (index, result) as each resume finishes
+
+        Returns:
+            List of analysis results in the same order as resume_texts
+        """
+        return asyncio.run(self.analyze_resumes_batched_async(
+            resume_texts, criteria, token_budget, concurrency, refresh, on_result
+        ))
+
+    async def analyze_resumes_batched_async(
+        self,
+        resume_texts: List[str],
+        criteria: Dict[str, Any],
+        token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        refresh: bool = False,
+        on_result: Optional[ResultCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """Analyze resumes with several candidates packed into each request.
+
+        Resumes are grouped so each request stays within token_budget. Any
+        candidate whose section of the reply is missing or unparseable is
+        retried with a request of its own.
+
+        Args:
+            resume_texts: The text content of each resume
+            criteria: Dictionary containing screening criteria including job description
+            token_budget: Approximate input tokens allowed per request
+            concurrency: Maximum number of provider requests in flight at once
+            refresh: Skip cached results and re-analyze every resume
+            on_result: Called with (index, result) as each resume finishes
+
+        Returns:
+            List of analysis results in the same order as resume_texts
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(resume_texts)
+        cache_keys = [self._cache_key(text, criteria, batched=True) for text in resume_texts]
+
+        pending = []
+        for index, cache_key in enumerate(cache_keys):
+            if cache_key and not refresh:
+                results[index] = await self._cached_async(cache_key)
+            if results[index] is None:
+                pending.append(index)
+            elif on_result:
+                on_result(index, results[index])
+
+        batches = self._pack_batches([resume_texts[i] for i in pending], criteria, token_budget)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        client = self._create_async_client()
+
+        async def retry_one(index: int) -> None:
+            async with semaphore:
+                results[index] = await self._analyze_resume_async(
+                    client, resume_texts[index], criteria
                 )
-                response_text = message.content[0].text
-
-            elif self.provider == "openai":
-                response = self.client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[{
-                        "role": "user",
-                        "content": prompt
-                    }],
-                    max_tokens=2500,
-                    temperature=0
+
+        async def run_batch(batch: List[int]) -> None:
+            indices = [pending[i] for i in batch]
+            async with semaphore:
+                batch_results = await self._analyze_batch_async(
+                    client, [resume_texts[i] for i in indices], criteria
                 )
-                response_text = response.choices[0].message.content
 
-            return self._parse_analysis_response(response_text)
+            retries = []
+            for index, result in zip(indices, batch_results):
+                if result is None:
+                    retries.append(index)
+                else:
+                    results[index] = result
+            await asyncio.gather(*(retry_one(index) for index in retries))
+
+            for index in indices:
+                if cache_keys[index] and 'error' not in results[index]:
+                    await self._store_async(cache_keys[index], results[index])
+                if on_result:
+                    on_result(index, results[index])
+
+        try:
+            await asyncio.gather(*(run_batch(batch) for batch in batches))
+        finally:
+            await client.close()
+
+        return results
+
+    async def _analyze_batch_async(
+        self,
+        client: Any,
+        resume_texts: List[str],
+        criteria: Dict[str, Any]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Analyze several resumes in one request.
+
+        Returns one result per resume, or None where the reply could not be
+        used for that candidate.
+        """
+        try:
+            message = await self._create_async(client, self._batch_request_params(resume_texts, criteria))
+            response_text = self._response_text(message)
+        except Exception as e:
+            print(f"Error analyzing resume batch with AI: {e}")
+            return [None] * len(resume_texts)
+
+        results = self._parse_batch_analysis_response(response_text, len(resume_texts))
+
+        # Split the request's token usage evenly across its candidates
+        usage = self._usage(message)
+        if usage:
+            share = {name: count // len(resume_texts) for name, count in usage.items()}
+            for result in results:
+                if result is not None:
+                    result['usage'] = dict(share)
+
+        return results
+
+    def _pack_batches(
+        self,
+        resume_texts: List[str],
+        criteria: Dict[str, Any],
+        token_budget: int
+    ) -> List[List[int]]:
+        """Group resume indices into batches that fit the input token budget."""
+        prefix, _ = self._build_batch_prompt_parts([], criteria)
+        available = token_budget - estimate_tokens(prefix)
+        max_per_batch = max(1, MAX_BATCH_OUTPUT_TOKENS // BATCH_OUTPUT_TOKENS_PER_CANDIDATE)
+
+        batches = []
+        current: List[int] = []
+        used = 0
+        for index, resume_text in enumerate(resume_texts):
+            cost = estimate_tokens(self._candidate_block(index + 1, resume_text))
+            if current and (used + cost > available or len(current) >= max_per_batch):
+                batches.append(current)
+                current, used = [], 0
+            current.append(index)
+            used += cost
+        if current:
+            batches.append(current)
+
+        return batches
+
+    async def _analyze_resume_async(
+        self,
+        client: Any,
+        resume_text: str,
+        criteria: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Analyze a single resume using an async provider client."""
+        try:
+            message = await self._create_async(client, self._request_params(resume_text, criteria))
+            return self._parse_response(message)
 
         except Exception as e:
             print(f"Error analyzing resume with AI: {e}")
-            return {
-                "error": str(e),
-                "overall_score": 0,
-                "analysis": "Failed to analyze resume"
-            }
+            return self._error_result(e)
 
-    def _build_analysis_prompt(self, resume_text: str, criteria: Dict[str, Any]) -> str:
-        """Build the prompt for AI analysis."""
-        job_description = criteria.get('job_description', '')
+    async def _analyze_resume_stream_async(
+        self,
+        client: Any,
+        resume_text: str,
+        criteria: Dict[str, Any],
+        refresh: bool
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Async version of analyze_resume_stream on a shared client."""
+        try:
+            cache_key = self._cache_key(resume_text, criteria, output_format="text")
+            cached = await self._cached_async(cache_key) if cache_key and not refresh else None
+            if cached is not None:
+                yield {"type": "result", "result": cached}
+                return
+
+            params = self._stream_params(self._request_params(resume_text, criteria, "text"))
+            stream = await self._create_async(client, params)
+            parser = AnalysisStreamParser(self._extract_score)
+            usage: Dict[str, Any] = {}
+            async for chunk in stream:
+                for event in self._field_events(parser, parser.feed(self._stream_delta(chunk, usage))):
+                    yield event
+            for event in self._field_events(parser, parser.close()):
+                yield event
+            result = await asyncio.to_thread(
+                self._finish_stream, parser, usage, self._reserved_tokens(params)
+            )
+            if cache_key:
+                await self._store_async(cache_key, result)
 
-        if job_description:
-            # Use job description-based analysis
-            prompt = f"""You are an expert HR recruiter analyzing resumes. Compare the following resume against the job description to determine if the candidate should be invited for an interview.
+        except Exception as e:
+            print(f"Error analyzing resume with AI: {e}")
+            result = self._error_result(e)
 
-JOB DESCRIPTION:
-{job_description}
+        yield {"type": "result", "result": result}
 
-RESUME:
-{resume_text[:4000]}
+    def _cache_key(
+        self,
+        resume_text: str,
+        criteria: Dict[str, Any],
+        batched: bool = False,
+        output_format: Optional[str] = None
+    ) -> Optional[str]:
+        """Return the result cache key for a request, or None when caching is off."""
+        if self.cache is None:
+            return None
+        prompt_version = f"{PROMPT_VERSION}/{self.prompt_layout}/{self.resume_token_budget}"
+        if batched:
+            prompt_version += "/batched"
+        elif (output_format or self.output_format) == "json":
+            prompt_version += "/json"
+        return AnalysisCache.make_key(
+            resume_text, criteria, self.provider, self.model, prompt_version
+        )
+
+    def _store(self, cache_key: str, result: Dict[str, Any]) -> None:
+        """Store a result in the cache without its per-call token usage."""
+        self.cache.put(cache_key, {k: v for k, v in result.items() if k != 'usage'})
+
+    async def _cached_async(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached result without blocking the event loop.
+
+        The cache is SQLite shared with other workers and may wait on their
+        writes, so it is read from a worker thread like the rate limiter.
+        """
+        return await asyncio.to_thread(self.cache.get, cache_key)
 
-IMPORTANT: You MUST respond with actual numeric scores (0-100), not placeholders like "[0-100]".
+    async def _store_async(self, cache_key: str, result: Dict[str, Any]) -> None:
+        """Store a result from a worker thread; see _cached_async."""
+        await asyncio.to_thread(self._store, cache_key, result)
 
-Please provide a detailed analysis in the following EXACT format:
+    def _create_async_client(self) -> Any:
+        """Create an async client for the configured provider."""
+        if self.provider == "anthropic":
+            return AsyncAnthropic(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        return AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+
+    def _create(self, client: Any, params: Dict[str, Any]) -> Any:
+        """Send one completion request, waiting for rate limits and retrying transient errors."""
+        create = self._messages_api(client)
+        tokens = self._reserved_tokens(params)
+        attempt = 0
+
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire(tokens)
+            try:
+                response = create(**params)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+
+            if not params.get('stream'):
+                # Streams report usage at the end; their caller records it
+                self._record_success(tokens, self._usage(response))
+            return response
+
+    async def _create_async(self, client: Any, params: Dict[str, Any]) -> Any:
+        """Async version of _create."""
+        create = self._messages_api(client)
+        tokens = self._reserved_tokens(params)
+        attempt = 0
+
+        while True:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async(tokens)
+            try:
+                response = await create(**params)
+            except Exception as e:
+                # Recording a rate limit writes to the shared limiter state
+                delay = await asyncio.to_thread(self._retry_delay, e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            if not params.get('stream'):
+                # Streams report usage at the end; their caller records it
+                await asyncio.to_thread(self._record_success, tokens, self._usage(response))
+            return response
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Return how long to wait before retrying after error, or None to give up."""
+        if attempt >= self.max_retries:
+            return None
+
+        retry_after = None
+        if isinstance(error, (anthropic.APIStatusError, openai.APIStatusError)):
+            if error.status_code not in RETRYABLE_STATUS_CODES:
+                return None
+            retry_after = self._retry_after(error.response)
+            if self.rate_limiter and error.status_code in RATE_LIMIT_STATUS_CODES:
+                # Pause every worker sharing this budget, not just this call
+                self.rate_limiter.record_rate_limited(retry_after)
+        elif not isinstance(error, (anthropic.APIConnectionError, openai.APIConnectionError)):
+            return None
+
+        backoff = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+        return max(backoff, retry_after or 0)
+
+    @staticmethod
+    def _retry_after(response: Any) -> Optional[float]:
+        """Read the provider's retry-after header in seconds, if present."""
+        headers = getattr(response, 'headers', None) or {}
+        try:
+            if headers.get('retry-after-ms'):
+                return float(headers['retry-after-ms']) / 1000
+            value = headers.get('retry-after')
+            if not value:
+                return None
+            try:
+                return float(value)
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _reserved_tokens(self, params: Dict[str, Any]) -> int:
+        """Estimate the tokens a request counts against the budget (input plus max output)."""
+        text = ""
+        for message in params.get('messages', []):
+            content = message['content']
+            if isinstance(content, str):
+                text += content
+            else:
+                text += "".join(block.get('text', '') for block in content)
+        return estimate_tokens(text) + params.get('max_tokens', 0)
+
+    def _record_success(self, reserved_tokens: int, usage: Optional[Dict[str, int]]) -> None:
+        """Tell the rate limiter how many tokens a successful call actually used."""
+        if not self.rate_limiter:
+            return
+        used_tokens = usage['input_tokens'] + usage['output_tokens'] if usage else None
+        self.rate_limiter.record_success(reserved_tokens, used_tokens)
+
+    def _stream_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn request parameters into a streaming request that still reports usage."""
+        params = dict(params, stream=True)
+        if self.provider == "openai":
+            params['stream_options'] = {"include_usage": True}
+        return params
+
+    def _stream_delta(self, chunk: Any, usage: Dict[str, Any]) -> str:
+        """Return the text in one stream event, collecting token usage on the way."""
+        if self.provider == "anthropic":
+            if chunk.type == 'message_start':
+                usage['start'] = chunk.message.usage
+            elif chunk.type == 'message_delta':
+                usage['output_tokens'] = chunk.usage.output_tokens
+            elif chunk.type == 'content_block_delta':
+                return getattr(chunk.delta, 'text', None) or ''
+            return ''
+
+        if getattr(chunk, 'usage', None):
+            usage['final'] = chunk.usage
+        if chunk.choices:
+            return chunk.choices[0].delta.content or ''
+        return ''
+
+    def _finish_stream(
+        self,
+        parser: AnalysisStreamParser,
+        usage: Dict[str, Any],
+        reserved_tokens: int
+    ) -> Dict[str, Any]:
+        """Build the final result of a stream and record its token usage."""
+        if self.provider == "anthropic" and 'start' in usage:
+            start = usage['start']
+            totals = SimpleNamespace(
+                input_tokens=start.input_tokens,
+                cache_read_input_tokens=getattr(start, 'cache_read_input_tokens', None),
+                cache_creation_input_tokens=getattr(start, 'cache_creation_input_tokens', None),
+                output_tokens=usage.get('output_tokens', start.output_tokens)
+            )
+        else:
+            totals = usage.get('final')
 
-OVERALL SCORE: 75
-(Your actual numeric score from 0-100)
+        result = parser.result
+        summary = self._usage(SimpleNamespace(usage=totals))
+        if summary:
+            result['usage'] = summary
+        self._record_success(reserved_tokens, summary)
+        return result
 
-INTERVIEW RECOMMENDATION: Yes
-(Choose: Yes / No / Maybe)
+    @staticmethod
+    def _field_events(parser: AnalysisStreamParser, fields: List[str]) -> List[Dict[str, Any]]:
+        """Build stream events for fields the parser just completed."""
+        return [
+            {"type": "field", "field": field, "value": parser.result[field]}
+            for field in fields
+        ]
 
-KEY QUALIFICATIONS MATCH: 80
-(Your actual numeric score from 0-100)
+    def _messages_api(self, client: Any) -> Callable[..., Any]:
+        """Return the client's create-completion method for the configured provider."""
+        if self.provider == "anthropic":
+            if self.prompt_layout == "shared_prefix":
+                # cache_control blocks need the prompt caching endpoint
+                return client.beta.prompt_caching.messages.create
+            return client.messages.create
+        return client.chat.completions.create
 
-SKILLS ASSESSMENT: 75
-(Your actual numeric score from 0-100)
+    def _request_params(
+        self,
+        resume_text: str,
+        criteria: Dict[str, Any],
+        output_format: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the provider request parameters for one resume.
 
-EXPERIENCE ASSESSMENT: 70
-(Your actual numeric score from 0-100)
+        output_format overrides the analyzer's configured format.
+        """
+        output_format = output_format or self.output_format
+        if self.prompt_layout == "shared_prefix":
+            prompt = self._build_prompt_parts(resume_text, criteria, output_format)
+        else:
+            prompt = self._build_analysis_prompt(resume_text, criteria, output_format)
+        if output_format == "json":
+            return {**self._completion_params(prompt, JSON_MAX_TOKENS), **self._structured_output_params()}
+        return self._completion_params(prompt, TEXT_MAX_TOKENS)
 
-EDUCATION ASSESSMENT: 85
-(Your actual numeric score from 0-100)
+    def _structured_output_params(self) -> Dict[str, Any]:
+        """Request parameters that make the provider return ANALYSIS_SCHEMA."""
+        if self.provider == "anthropic":
+            return {
+                "tools": [{
+                    "name": ANALYSIS_TOOL_NAME,
+                    "description": "Record the screening analysis of the candidate.",
+                    "input_schema": ANALYSIS_SCHEMA
+                }],
+                "tool_choice": {"type": "tool", "name": ANALYSIS_TOOL_NAME}
+            }
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": ANALYSIS_TOOL_NAME,
+                    "strict": True,
+                    "schema": self._strict_schema(ANALYSIS_SCHEMA)
+                }
+            }
+        }
 
-STRENGTHS:
-- Strong Python development skills
-- Experience with cloud infrastructure
-- Excellent communication abilities
+    @classmethod
+    def _strict_schema(cls, schema: Any) -> Any:
+        """Copy a JSON schema without the keywords OpenAI strict mode rejects."""
+        if isinstance(schema, dict):
+            return {
+                key: cls._strict_schema(value) for key, value in schema.items()
+                if key not in UNSUPPORTED_STRICT_KEYWORDS
+            }
+        if isinstance(schema, list):
+            return [cls._strict_schema(value) for value in schema]
+        return schema
+
+    def _batch_request_params(self, resume_texts: List[str], criteria: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the provider request parameters for a batch of resumes."""
+        prompt = self._build_batch_prompt_parts(resume_texts, criteria)
+        if self.prompt_layout != "shared_prefix":
+            prompt = "".join(prompt)
+        max_tokens = min(
+            BATCH_OUTPUT_TOKENS_PER_CANDIDATE * len(resume_texts), MAX_BATCH_OUTPUT_TOKENS
+        )
+        return self._completion_params(prompt, max_tokens)
+
+    def _completion_params(self, prompt: Union[str, Tuple[str, str]], max_tokens: int) -> Dict[str, Any]:
+        """Build request parameters from a prompt string or a (cacheable prefix, rest) pair."""
+        if self.provider == "anthropic":
+            if isinstance(prompt, tuple):
+                prefix, rest = prompt
+                content = [
+                    {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+                    {"type": "text", "text": rest}
+                ]
+            else:
+                content = prompt
+            return {
+                "model": self.model,
+                "max_tokens": max_tokens,
+                "temperature": 0,
+                "messages": [{
+                    "role": "user",
+                    "content": content
+                }]
+            }
+        # OpenAI caches long repeated prompt prefixes automatically
+        if isinstance(prompt, tuple):
+            prompt = "".join(prompt)
+        return {
+            "model": self.model,
+            "messages": [{
+                "role": "user",
+                "content": prompt
+            }],
+            "max_tokens": max_tokens,
+            "temperature": 0
+        }
 
-GAPS & CONCERNS:
-- Limited experience with team leadership
-- Missing some advanced certifications
+    def _response_text(self, response: Any) -> str:
+        """Extract the completion text from a provider response."""
+        if self.provider == "anthropic":
+            return response.content[0].text
+        return response.choices[0].message.content
 
-INTERVIEW QUESTIONS:
-- Tell me about a challenging project you led
-- How do you stay updated with new technologies?
+    def _parse_response(self, response: Any) -> Dict[str, Any]:
+        """Parse a provider response, attaching its token usage when reported."""
+        if self.output_format == "json":
+            result = self._parse_structured_response(self._structured_data(response))
+        else:
+            result = self._parse_analysis_response(self._response_text(response))
+        usage = self._usage(response)
+        if usage:
+            result['usage'] = usage
+        return result
 
-SUMMARY:
-A solid candidate with strong technical skills who would be a good fit for the role.
+    def _structured_data(self, response: Any) -> Dict[str, Any]:
+        """Extract the structured analysis from a JSON-format provider response."""
+        if self.provider == "anthropic":
+            for block in response.content:
+                if getattr(block, 'type', None) == 'tool_use':
+                    return block.input
+            raise ValueError("Response did not contain the structured analysis")
+        return json.loads(response.choices[0].message.content)
+
+    def _parse_structured_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a structured analysis into the same dictionary the text parser builds."""
+        def score(name: str) -> int:
+            try:
+                return max(0, min(100, int(data.get(name) or 0)))
+            except (TypeError, ValueError):
+                return 0
+
+        def items(name: str) -> List[str]:
+            return [str(item).strip() for item in data.get(name) or [] if str(item).strip()]
+
+        recommendation = str(data.get('interview_recommendation') or '').strip()
+        return {
+            "overall_score": score('overall_score'),
+            "skills_score": score('skills_score'),
+            "experience_score": score('experience_score'),
+            "education_score": score('education_score'),
+            "qualifications_score": score('qualifications_score'),
+            "strengths": items('strengths'),
+            "weaknesses": items('weaknesses'),
+            "interview_questions": items('interview_questions'),
+            "interview_recommendation": recommendation,
+            "recommendation": recommendation,
+            "summary": str(data.get('summary') or '').strip(),
+            "detailed_analysis": json.dumps(data, ensure_ascii=False, indent=2)
+        }
 
-REMEMBER: Replace the example numbers above with your actual scores. Do NOT include "[0-100]" or similar placeholders.
-"""
+    def _usage(self, response: Any) -> Optional[Dict[str, int]]:
+        """Summarize cached and uncached input tokens for one provider call."""
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return None
+
+        if self.provider == "anthropic":
+            cache_read = getattr(usage, 'cache_read_input_tokens', None) or 0
+            cache_write = getattr(usage, 'cache_creation_input_tokens', None) or 0
+            input_tokens = usage.input_tokens + cache_read + cache_write
+            output_tokens = usage.output_tokens
         else:
-            # Use criteria-based analysis (fallback)
-            prompt = f"""You are an expert HR recruiter analyzing resumes. Please analyze the following resume against the given criteria.
+            details = getattr(usage, 'prompt_tokens_details', None)
+            cache_read = (getattr(details, 'cached_tokens', None) or 0) if details else 0
+            cache_write = 0
+            input_tokens = usage.prompt_tokens
+            output_tokens = usage.completion_tokens
+
+        return {
+            "input_tokens": input_tokens,
+            "cached_input_tokens": cache_read,
+            "uncached_input_tokens": input_tokens - cache_read,
+            "cache_write_tokens": cache_write,
+            "output_tokens": output_tokens
+        }
 
-Resume:
-{resume_text[:4000]}
+    @staticmethod
+    def _error_result(error: Exception) -> Dict[str, Any]:
+        """Build the result returned when a resume could not be analyzed."""
+        return {
+            "error": str(error),
+            "overall_score": 0,
+            "analysis": "Failed to analyze resume"
+        }
 
-Screening Criteria:
-- Job Title: {criteria.get('job_title', 'Not specified')}
-- Required Skills: {criteria.get('skills', 'Not specified')}
-- Experience Level: {criteria.get('experience', 'Not specified')}
-- Education: {criteria.get('education', 'Not specified')}
-- Additional Requirements: {criteria.get('additional_notes', 'None')}
+    def _build_analysis_prompt(
+        self,
+        resume_text: str,
+        criteria: Dict[str, Any],
+        output_format: Optional[str] = None
+    ) -> str:
+        """Build the prompt for AI analysis."""
+        if self.prompt_layout == "shared_prefix":
+            return "".join(self._build_prompt_parts(resume_text, criteria, output_format))
 
-IMPORTANT: You MUST respond with actual numeric scores (0-100), not placeholders like "[0-100]".
+        job_description = criteria.get('job_description', '')
+        resume_text = condense_resume(resume_text, self.resume_token_budget)
 
-Please provide a detailed analysis in the following EXACT format:
+        if job_description:
+            # Use job description-based analysis
+            prompt = f"""{JD_INSTRUCTIONS}
 
-OVERALL SCORE: 75
-(Your actual numeric score from 0-100)
+JOB DESCRIPTION:
+{job_description}
 
-INTERVIEW RECOMMENDATION: Yes
-(Choose: Yes / No / Maybe)
+RESUME:
+{resume_text}
 
-SKILLS MATCH: 75
-(Your actual numeric score from 0-100)
+{self._response_format(criteria, output_format)}"""
+        else:
+            # Use criteria-based analysis (fallback)
+            prompt = f"""{CRITERIA_INSTRUCTIONS}
 
-EXPERIENCE ASSESSMENT: 70
-(Your actual numeric score from 0-100)
+Resume:
+{resume_text}
 
-EDUCATION ASSESSMENT: 85
-(Your actual numeric score from 0-100)
+{self._format_criteria(criteria)}
 
-STRENGTHS:
-- Strong technical background
-- Relevant work experience
-- Good educational qualifications
+{self._response_format(criteria, output_format)}"""
 
-GAPS & CONCERNS:
-- Missing some specific skills
-- Limited industry experience
+        return prompt
 
-INTERVIEW QUESTIONS:
-- Describe your experience with key technologies
-- How do you approach problem-solving?
+    def _build_prompt_parts(
+        self,
+        resume_text: str,
+        criteria: Dict[str, Any],
+        output_format: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """Build the prompt as a (shared prefix, resume) pair.
+
+        The prefix holds the instructions, job details and output format and
+        is identical for every resume screened against the same criteria, so
+        providers can serve it from their prompt cache.
+        """
+        prefix = self._build_job_prefix(criteria, output_format) + "The resume to analyze follows.\n\n"
+        label = "RESUME" if criteria.get('job_description') else "Resume"
+        resume_text = condense_resume(resume_text, self.resume_token_budget)
+        resume = f"""{label}:
+{resume_text}
+"""
+        return prefix, resume
 
-SUMMARY:
-A qualified candidate who meets most requirements.
+    def _build_batch_prompt_parts(self, resume_texts: List[str], criteria: Dict[str, Any]) -> Tuple[str, str]:
+        """Build a multi-candidate prompt as a (shared prefix, resumes) pair.
 
-REMEMBER: Replace the example numbers above with your actual scores. Do NOT include "[0-100]" or similar placeholders.
+        The prefix does not depend on the number of candidates, so every
+        batch for the same criteria shares it.
+        """
+        prefix = self._build_job_prefix(criteria, "text") + "\n" + BATCH_INSTRUCTIONS + "\n"
+        resumes = f"There are {len(resume_texts)} candidates.\n\n" + "".join(
+            self._candidate_block(number, resume_text)
+            for number, resume_text in enumerate(resume_texts, 1)
+        )
+        return prefix, resumes
+
+    def _candidate_block(self, number: int, resume_text: str) -> str:
+        """Format one resume for a multi-candidate prompt."""
+        resume_text = condense_resume(resume_text, self.resume_token_budget)
+        return f"=== CANDIDATE {number} ===\n{resume_text}\n\n"
+
+    def _build_job_prefix(self, criteria: Dict[str, Any], output_format: Optional[str] = None) -> str:
+        """Build the instructions, job details and output format shared by a batch."""
+        job_description = criteria.get('job_description', '')
+
+        if job_description:
+            return f"""{JD_INSTRUCTIONS}
+
+JOB DESCRIPTION:
+{job_description}
+
+{self._response_format(criteria, output_format)}
 """
+        return f"""{CRITERIA_INSTRUCTIONS}
 
-        return prompt
+{self._format_criteria(criteria)}
+
+{self._response_format(criteria, output_format)}
+"""
+
+    def _response_format(self, criteria: Dict[str, Any], output_format: Optional[str] = None) -> str:
+        """Return the output format instructions for a prompt."""
+        if (output_format or self.output_format) == "json":
+            return JSON_RESPONSE_FORMAT
+        return JD_RESPONSE_FORMAT if criteria.get('job_description') else CRITERIA_RESPONSE_FORMAT
+
+    @staticmethod
+    def _format_criteria(criteria: Dict[str, Any]) -> str:
+        """Format custom screening criteria for the prompt."""
+        return f"""Screening Criteria:
+- Job Title: {criteria.get('job_title', 'Not specified')}
+- Required Skills: {criteria.get('skills', 'Not specified')}
+- Experience Level: {criteria.get('experience', 'Not specified')}
+- Education: {criteria.get('education', 'Not specified')}
+- Additional Requirements: {criteria.get('additional_notes', 'None')}"""
 
     def _extract_score(self, text: str) -> int:
         """Extract a numeric score from text, trying multiple patterns."""
-        import re
-
         # Try to find a number followed by % or just a number
         patterns = [
             r'(\d+)\s*%',           # "75%" or "75 %"
@@ -219,86 +1344,34 @@ REMEMBER: Replace the example numbers above with your actual scores. Do NOT incl
 
     def _parse_analysis_response(self, response_text: str) -> Dict[str, Any]:
         """Parse the AI response into structured data."""
-        result = {
-            "overall_score": 0,
-            "skills_score": 0,
-            "experience_score": 0,
-            "education_score": 0,
-            "qualifications_score": 0,
-            "strengths": [],
-            "weaknesses": [],
-            "interview_questions": [],
-            "interview_recommendation": "",
-            "recommendation": "",
-            "summary": "",
-            "detailed_analysis": response_text
-        }
-
-        lines = response_text.split('\n')
-        current_section = None
-
-        for line in lines:
-            line = line.strip()
-
-            if line.startswith('OVERALL SCORE:'):
-                score_part = line.split(':', 1)[1].strip() if ':' in line else ''
-                result['overall_score'] = self._extract_score(score_part)
-
-            elif line.startswith('INTERVIEW RECOMMENDATION:'):
-                result['interview_recommendation'] = line.split(':', 1)[1].strip()
-                result['recommendation'] = result['interview_recommendation']
-                current_section = None
-
-            elif line.startswith('KEY QUALIFICATIONS MATCH:'):
-                score_part = line.split(':', 1)[1].strip() if ':' in line else ''
-                result['qualifications_score'] = self._extract_score(score_part)
-                current_section = 'qualifications'
-
-            elif line.startswith('SKILLS MATCH:') or line.startswith('SKILLS ASSESSMENT:'):
-                score_part = line.split(':', 1)[1].strip() if ':' in line else ''
-                result['skills_score'] = self._extract_score(score_part)
-                current_section = 'skills'
-
-            elif line.startswith('EXPERIENCE ASSESSMENT:'):
-                score_part = line.split(':', 1)[1].strip() if ':' in line else ''
-                result['experience_score'] = self._extract_score(score_part)
-                current_section = 'experience'
-
-            elif line.startswith('EDUCATION ASSESSMENT:'):
-                score_part = line.split(':', 1)[1].strip() if ':' in line else ''
-                result['education_score'] = self._extract_score(score_part)
-                current_section = 'education'
-
-            elif line.startswith('STRENGTHS:'):
-                current_section = 'strengths'
-                result['strengths'] = []
-
-            elif line.startswith('GAPS & CONCERNS:') or line.startswith('WEAKNESSES/GAPS:'):
-                current_section = 'weaknesses'
-                result['weaknesses'] = []
-
-            elif line.startswith('INTERVIEW QUESTIONS:'):
-                current_section = 'interview_questions'
-                result['interview_questions'] = []
-
-            elif line.startswith('SUMMARY:'):
-                current_section = 'summary'
-                result['summary'] = ''
+        parser = AnalysisStreamParser(self._extract_score)
+        parser.feed(response_text)
+        parser.close()
+        return parser.result
 
+    def _parse_batch_analysis_response(
+        self,
+        response_text: str,
+        count: int
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Split a multi-candidate reply into per-candidate results.
+
+        Each "=== CANDIDATE n ===" section is parsed with
+        _parse_analysis_response. Candidates whose section is missing or has
+        no OVERALL SCORE line come back as None.
+        """
+        sections = {}
+        markers = list(CANDIDATE_MARKER.finditer(response_text))
+        for marker, next_marker in zip(markers, markers[1:] + [None]):
+            end = next_marker.start() if next_marker else len(response_text)
+            sections.setdefault(int(marker.group(1)), response_text[marker.end():end].strip())
+
+        results = []
+        for number in range(1, count + 1):
+            section = sections.get(number)
+            if not section or not re.search(r'^\s*OVERALL SCORE:', section, re.MULTILINE):
+                results.append(None)
             else:
-                if line and current_section:
-                    if current_section == 'strengths':
-                        if line.startswith('-') or line.startswith('•') or line.startswith('1.') or line.startswith('2.') or line.startswith('3.'):
-                            result['strengths'].append(line.lstrip('-•123456789. ').strip())
-                    elif current_section == 'weaknesses':
-                        if line.startswith('-') or line.startswith('•') or line.startswith('1.') or line.startswith('2.') or line.startswith('3.'):
-                            result['weaknesses'].append(line.lstrip('-•123456789. ').strip())
-                    elif current_section == 'interview_questions':
-                        if line.startswith('-') or line.startswith('•') or line.startswith('1.') or line.startswith('2.') or line.startswith('3.') or line.startswith('4.'):
-                            result['interview_questions'].append(line.lstrip('-•123456789. ').strip())
-                    elif current_section == 'summary':
-                        result['summary'] += line + ' '
-
-        result['summary'] = result['summary'].strip()
+                results.append(self._parse_analysis_response(section))
 
-        return result
+        return results
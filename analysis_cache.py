@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+class AnalysisCache:
+    """Durable SQLite cache of parsed AI analysis results.
+
+    Analysis runs at temperature 0, so the same resume, criteria, provider,
+    model and prompt template give the same answer. Entries expire after
+    ttl_seconds and the least recently used ones are dropped once the table
+    holds more than max_entries rows. The database may be shared by several
+    worker processes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        max_entries: int = 10000
+    ):
+        """Initialize the cache, creating the database if needed.
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: Age after which entries are ignored, or None to keep
+                them until evicted by size
+            max_entries: Maximum number of stored results
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_analysis_cache_accessed "
+                "ON analysis_cache (accessed_at)"
+            )
+
+    @classmethod
+    def from_env(cls, default_path: str) -> Optional["AnalysisCache"]:
+        """Create a cache from ANALYSIS_CACHE_* environment variables.
+
+        Returns None when ANALYSIS_CACHE_PATH is set to an empty string.
+        """
+        path = os.environ.get('ANALYSIS_CACHE_PATH', default_path)
+        if not path:
+            return None
+        ttl = float(os.environ.get('ANALYSIS_CACHE_TTL', 7 * 24 * 3600))
+        return cls(
+            path,
+            ttl_seconds=ttl if ttl > 0 else None,
+            max_entries=int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', 10000))
+        )
+
+    @staticmethod
+    def make_key(
+        resume_text: str,
+        criteria: Dict[str, Any],
+        provider: str,
+        model: str,
+        prompt_version: str
+    ) -> str:
+        """Return the cache key for one analysis request."""
+        payload = json.dumps(
+            [resume_text, criteria, provider, model, prompt_version],
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored result for a key, or None if missing or expired."""
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT result, created_at FROM analysis_cache WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row is not None and self._expired(row[1], now):
+                    conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                    row = None
+                if row is not None:
+                    conn.execute(
+                        "UPDATE analysis_cache SET accessed_at = ? WHERE key = ?",
+                        (now, key)
+                    )
+        except sqlite3.Error as e:
+            print(f"Error reading analysis cache: {e}")
+            row = None
+
+        with self._lock:
+            self._counters['hits' if row is not None else 'misses'] += 1
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a parsed result, evicting old entries if over the limits."""
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, result, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(result, ensure_ascii=False), now, now)
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            print(f"Error writing analysis cache: {e}")
+            return
+
+        with self._lock:
+            self._counters['stores'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this process and the stored entry count."""
+        with self._lock:
+            stats = dict(self._counters)
+        try:
+            with self._connect() as conn:
+                stats['entries'] = conn.execute(
+                    "SELECT COUNT(*) FROM analysis_cache"
+                ).fetchone()[0]
+        except sqlite3.Error:
+            stats['entries'] = None
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        """Delete every stored result."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM analysis_cache")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction and close it afterwards.
+
+        A connection per operation keeps threads and processes independent.
+        """
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        """Check whether an entry created at created_at is past its TTL."""
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries and trim the table to max_entries."""
+        if self.ttl_seconds is not None:
+            conn.execute(
+                "DELETE FROM analysis_cache WHERE created_at < ?",
+                (now - self.ttl_seconds,)
+            )
+        conn.execute(
+            "DELETE FROM analysis_cache WHERE key IN ("
+            "SELECT key FROM analysis_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
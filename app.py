@@ -1,26 +1,112 @@
-from flask import Flask, render_template, request, jsonify, session, send_file
+from flask import Flask, render_template, request, jsonify, session, send_file, stream_with_context
+from flask import Request
 from werkzeug.utils import secure_filename
+import base64
+import binascii
+import io
+import json
 import os
+import tempfile
+import time
 from datetime import datetime
-import uuid
-from functools import wraps
+from functools import lru_cache, wraps
+
+import numpy as np
 
 from resume_parser import ResumeParser
-from ai_analyzer import AIAnalyzer
+from ai_analyzer import AIAnalyzer, DEFAULT_CONCURRENCY, DEFAULT_BATCH_TOKEN_BUDGET, FAST_MODELS
+from analysis_cache import AnalysisCache
+from condenser import DEFAULT_RESUME_TOKENS
+from rate_limiter import RateLimiter
+from prefilter import criteria_query, local_scores, shortlist
+from hedged_analyzer import HedgedAnalyzer, DEFAULT_HEDGE_AFTER
+from cascade_analyzer import CascadeAnalyzer, DEFAULT_ESCALATION_BAND
+from job_queue import JobStore, JobQueue, FILE_STATUSES, SORT_COLUMNS
+from reranker import parse_weights, parse_weight_spec, rerank
+from requisitions import RequisitionStore
+from search_index import SearchIndex, DEFAULT_TOP_K as DEFAULT_SEARCH_RESULTS
+from result_export import (
+    EXPORT_FORMATS, MIMETYPES as EXPORT_MIMETYPES, export_available, export_rows, stream_export
+)
+from upload_store import (
+    UploadStore, ChunkedUploads, DEFAULT_UPLOAD_TTL, DEFAULT_SPOOL_BYTES, DEFAULT_CHUNK_BYTES,
+    DEFAULT_MAX_UPLOAD_BYTES
+)
+
+class UploadRequest(Request):
+    """Request that keeps each uploaded file part in memory only up to UPLOAD_SPOOL_BYTES."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES, mode='rb+')
+
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc'}
+# Uploaded files are staged on disk until analyzed; unused ones expire
+UPLOAD_STAGING_DIR = os.environ.get('UPLOAD_STAGING_DIR', os.path.join(UPLOAD_FOLDER, 'staging'))
+UPLOAD_TTL = float(os.environ.get('UPLOAD_TTL', DEFAULT_UPLOAD_TTL))
+UPLOAD_SPOOL_BYTES = int(os.environ.get('UPLOAD_SPOOL_BYTES', DEFAULT_SPOOL_BYTES))
+MAX_UPLOAD_CHECK = 5000
+# Large files are uploaded in resumable chunks of this size, assembled here
+UPLOAD_PARTIAL_DIR = os.environ.get('UPLOAD_PARTIAL_DIR', os.path.join(UPLOAD_FOLDER, 'partial'))
+UPLOAD_CHUNK_BYTES = int(os.environ.get('UPLOAD_CHUNK_BYTES', DEFAULT_CHUNK_BYTES))
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', DEFAULT_MAX_UPLOAD_BYTES))
 PASSWORD = os.environ.get('APP_PASSWORD', 'admin123')  # Change this password!
+ANALYSIS_CONCURRENCY = int(os.environ.get('ANALYSIS_CONCURRENCY', DEFAULT_CONCURRENCY))
+MAX_ANALYSIS_CONCURRENCY = int(os.environ.get('MAX_ANALYSIS_CONCURRENCY', 20))
+PROMPT_LAYOUT = os.environ.get('PROMPT_LAYOUT', 'shared_prefix')
+OUTPUT_FORMAT = os.environ.get('OUTPUT_FORMAT', 'text')
+# Seconds before a slow analysis is also sent to the fallback provider
+# (0 disables hedging unless the request brings a fallback API key)
+HEDGE_AFTER_SECONDS = float(os.environ.get('HEDGE_AFTER_SECONDS', 0))
+# Model cascade: fast-tier scores inside this band go to the large model
+CASCADE_BAND = (
+    int(os.environ.get('CASCADE_BAND_LOW', DEFAULT_ESCALATION_BAND[0])),
+    int(os.environ.get('CASCADE_BAND_HIGH', DEFAULT_ESCALATION_BAND[1]))
+)
+BATCH_TOKEN_BUDGET = int(os.environ.get('BATCH_TOKEN_BUDGET', DEFAULT_BATCH_TOKEN_BUDGET))
+# Tokens each resume is condensed to before analysis (0 sends the whole text)
+RESUME_TOKEN_BUDGET = int(os.environ.get('RESUME_TOKEN_BUDGET', DEFAULT_RESUME_TOKENS)) or None
+# Provider rate limits are shared by every worker through this file
+RATE_LIMIT_STATE_PATH = os.environ.get(
+    'RATE_LIMIT_STATE_PATH', os.path.join('cache', 'rate_limits.sqlite3')
+) or None
+# Background analysis jobs: store shared by all workers, and jobs run at
+# once per worker process
+JOB_STORE_PATH = os.environ.get('JOB_STORE_PATH', os.path.join('cache', 'jobs.sqlite3'))
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+# Requisitions: criteria and screened candidates of open positions, kept
+# until deleted
+REQUISITION_STORE_PATH = os.environ.get('REQUISITION_STORE_PATH', os.path.join('cache', 'requisitions.sqlite3'))
+# Result event streams reconnect after this long, below gunicorn's timeout
+EVENT_STREAM_SECONDS = float(os.environ.get('EVENT_STREAM_SECONDS', 25))
+# Result listings are paged; clients may ask for up to MAX_RESULTS_PAGE rows
+RESULTS_PAGE_SIZE = 50
+MAX_RESULTS_PAGE = 500
+# Listing sort key that ranks by a weighted composite of the sub-scores
+WEIGHTED_SORT = 'weighted'
+# Most hits one archive search may return
+MAX_SEARCH_RESULTS = 200
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request size (one chunk for larger files)
 
 # Create upload folder if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+upload_store = UploadStore(UPLOAD_STAGING_DIR, ttl_seconds=UPLOAD_TTL)
+chunked_uploads = ChunkedUploads(UPLOAD_PARTIAL_DIR, upload_store, ttl_seconds=UPLOAD_TTL, max_bytes=MAX_UPLOAD_BYTES)
+
+# Durable cache of analysis results; set ANALYSIS_CACHE_PATH= to disable
+analysis_cache = AnalysisCache.from_env(os.path.join('cache', 'analysis_cache.sqlite3'))
+
+# Every parsed resume is added to a similarity search index over past
+# screenings; set SEARCH_INDEX_DIR= to disable
+ResumeParser.search_index = SearchIndex.from_env(os.path.join('cache', 'search_index'))
 
 
 def login_required(f):
@@ -38,11 +124,347 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def build_analyzer(api_key, provider, model=None):
+    """Create an analyzer with the app's cache, prompt and rate limit settings."""
+    analyzer = AIAnalyzer(
+        api_key, provider, model=model, cache=analysis_cache, prompt_layout=PROMPT_LAYOUT,
+        resume_token_budget=RESUME_TOKEN_BUDGET, output_format=OUTPUT_FORMAT
+    )
+    analyzer.rate_limiter = RateLimiter.from_env(
+        provider, analyzer.model, analyzer.api_key, state_path=RATE_LIMIT_STATE_PATH
+    )
+    return analyzer
+
+
+def build_fallback_analyzer(provider, api_key=None):
+    """Create an analyzer for the other provider, or None without an API key for it."""
+    other = 'openai' if provider == 'anthropic' else 'anthropic'
+    try:
+        return build_analyzer(api_key, other)
+    except ValueError:
+        return None
+
+
+def summarize_usage(results):
+    """Total the per-call token usage reported in analysis results."""
+    totals = {}
+    for result in results:
+        for name, count in result.get('usage', {}).items():
+            totals[name] = totals.get(name, 0) + count
+    if totals.get('input_tokens'):
+        totals['cached_input_ratio'] = round(
+            totals['cached_input_tokens'] / totals['input_tokens'], 3
+        )
+    return totals
+
+
+def analysis_options(data, require_api_key=True):
+    """Validate an analysis request and return its settings.
+
+    Args:
+        data: The request fields
+        require_api_key: False when the server's own provider keys may be used
+
+    Raises:
+        ValueError: With a message for the client when the request is invalid
+    """
+    if require_api_key and not data.get('api_key'):
+        raise ValueError('API key is required')
+
+    if not data.get('files'):
+        raise ValueError('No files to analyze')
+
+    criteria = analysis_criteria(data)
+
+    try:
+        concurrency = int(data.get('concurrency', ANALYSIS_CONCURRENCY))
+        batch_token_budget = int(data.get('batch_token_budget', BATCH_TOKEN_BUDGET))
+    except (TypeError, ValueError):
+        raise ValueError('Concurrency and batch token budget must be integers')
+
+    # Optional local pre-ranking: only the best lexical matches reach the AI
+    try:
+        top_k = data.get('prefilter_top_k')
+        top_k = int(top_k) if top_k not in (None, '') else None
+        min_local_score = data.get('prefilter_min_score')
+        min_local_score = float(min_local_score) if min_local_score not in (None, '') else None
+    except (TypeError, ValueError):
+        raise ValueError('Pre-filter top K and minimum score must be numbers')
+
+    return {
+        'criteria': criteria,
+        'provider': data.get('provider', 'anthropic'),
+        'concurrency': max(1, min(concurrency, MAX_ANALYSIS_CONCURRENCY)),
+        'batch_token_budget': batch_token_budget,
+        'top_k': top_k,
+        'min_local_score': min_local_score
+    }
+
+
+def analysis_criteria(data):
+    """Read the screening criteria of a request: a job description or structured fields.
+
+    Raises:
+        ValueError: If the required description or job title is missing
+    """
+    mode = data.get('mode', 'criteria')
+
+    if mode == 'description':
+        job_description = data.get('job_description', '').strip()
+        if not job_description:
+            raise ValueError('Job description is required')
+        criteria = {'job_description': job_description}
+    else:
+        job_title = data.get('job_title', '').strip()
+        if not job_title:
+            raise ValueError('Job title is required')
+        criteria = {
+            'job_title': job_title,
+            'skills': data.get('skills', ''),
+            'experience': data.get('experience', ''),
+            'education': data.get('education', ''),
+            'additional_notes': data.get('additional_notes', '')
+        }
+    return criteria
+
+
+# Request fields analysis_criteria reads
+CRITERIA_FIELDS = (
+    'mode', 'job_description', 'job_title', 'skills', 'experience', 'education', 'additional_notes'
+)
+
+
+def criteria_request(criteria):
+    """Turn stored criteria back into the request fields analysis_criteria reads."""
+    return {'mode': 'description' if 'job_description' in criteria else 'criteria', **criteria}
+
+
+def results_filters(args):
+    """Read the sort and filter options of a results listing from query parameters.
+
+    Raises:
+        ValueError: If an option is invalid
+    """
+    sort = args.get('sort', 'score')
+    if sort not in SORT_COLUMNS and sort != WEIGHTED_SORT:
+        raise ValueError(f"sort must be one of: {', '.join([*SORT_COLUMNS, WEIGHTED_SORT])}")
+    status = args.get('status') or None
+    if status and status not in FILE_STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(FILE_STATUSES)}")
+    try:
+        min_score = float(args['min_score']) if args.get('min_score') not in (None, '') else None
+    except ValueError:
+        raise ValueError('min_score must be a number')
+
+    return {
+        'sort': sort,
+        'descending': args.get('order', 'desc') != 'asc',
+        'status': status,
+        'recommendation': args.get('recommendation') or None,
+        'min_score': min_score,
+        'search': args.get('q') or None
+    }
+
+
+@lru_cache(maxsize=16)
+def load_score_matrix(job_id, updated_at, recommendation, min_score, search):
+    """Load the positions and (n, 4) sub-score matrix of a job's analyzed files.
+
+    Cached per job and filter; updated_at is part of the key so a job that
+    records more files is read again.
+    """
+    rows = job_store.sub_scores(job_id, recommendation=recommendation, min_score=min_score, search=search)
+    positions = np.array([row[0] for row in rows], dtype=np.int64)
+    matrix = np.array([row[1:] for row in rows], dtype=float).reshape(len(rows), -1)
+    return positions, matrix
+
+
+def weighted_ranking(job, args, filters):
+    """Rank a job's analyzed files by the weighted sub-scores given in args['weights'].
+
+    Weights look like skills:3,experience:2,education:1 and are applied to
+    the stored sub-scores, so no analysis is repeated.
+
+    Returns:
+        File positions and their composite scores, in ranked order
+
+    Raises:
+        ValueError: If the weights are invalid
+    """
+    weights = parse_weights(parse_weight_spec(args.get('weights', '')))
+    positions, matrix = load_score_matrix(
+        job['id'], job['updated_at'], filters['recommendation'], filters['min_score'], filters['search']
+    )
+    composite, order = rerank(matrix, weights)
+    if not filters['descending']:
+        order = order[::-1]
+    return positions[order], composite[order]
+
+
+def run_analysis_job(job_id, data, finished, report):
+    """Parse, pre-rank and analyze the files of one job in the background.
+
+    Each file's outcome is passed to report as soon as it is known. Files
+    already in `finished` (when a job resumes after a worker restart) are
+    not reported or analyzed again. Jobs started for a requisition reuse the
+    text stored for its candidates and record each outcome there as well.
+
+    Returns:
+        Job summary with the hedged routing statistics, if any
+    """
+    # API keys are not stored with the job; one taken over from another
+    # worker runs with the server's ANTHROPIC_API_KEY / OPENAI_API_KEY
+    options = analysis_options(data, require_api_key=False)
+    criteria = options['criteria']
+    provider = options['provider']
+    concurrency = options['concurrency']
+    refresh = bool(data.get('force_refresh'))
+    requisition_id = data.get('requisition_id')
+
+    texts = {}
+    stored_texts = {}
+    if requisition_id:
+        job_report = report
+        stored_texts = requisition_store.resume_texts(
+            requisition_id, [file_info['file_id'] for file_info in data['files']]
+        )
+
+        def report(position, status, result):
+            job_report(position, status, result)
+            requisition_store.record(
+                requisition_id, data['files'][position]['file_id'], status, result,
+                data['criteria_key'], texts.get(position)
+            )
+
+    def report_new(position, status, result):
+        if position not in finished:
+            report(position, status, result)
+
+    analyzer = build_analyzer(data.get('api_key'), provider)
+
+    # Collect each file's content - handle both file path and bytes
+    sources = []
+    extracted = []
+    for position, file_info in enumerate(data['files']):
+        filename = file_info.get('original_name', 'Unknown')
+        try:
+            if file_info.get('file_id') in stored_texts:
+                # Text kept by the requisition; no need to parse the file again
+                extracted.append((position, filename, stored_texts[file_info['file_id']]))
+            elif 'file_id' in file_info:
+                staged_path = upload_store.path(file_info['file_id'])
+                if staged_path:
+                    sources.append((position, filename, staged_path))
+                else:
+                    report_new(position, 'error', {'filename': filename, 'error': 'Uploaded file expired'})
+            elif 'saved_path' in file_info:
+                sources.append((position, filename, file_info['saved_path']))
+            elif 'content' in file_info:
+                # Decode base64 content if needed
+                if isinstance(file_info['content'], str):
+                    file_content = base64.b64decode(file_info['content'])
+                else:
+                    file_content = file_info['content']
+                sources.append((position, filename, file_content))
+            else:
+                report_new(position, 'error', {'filename': filename, 'error': 'No file content or path provided'})
+        except Exception as e:
+            report_new(position, 'error', {'filename': filename, 'error': str(e)})
+
+    # Parse all files in parallel, keeping upload order for analysis
+    parsed = [None] * len(sources)
+    for outcome in ResumeParser.parse_many((filename, source) for _, filename, source in sources):
+        position = sources[outcome['index']][0]
+        if outcome['error']:
+            report_new(position, 'error', {
+                'filename': outcome['filename'],
+                'error': f"Failed to parse resume: {outcome['error']}"
+            })
+        else:
+            parsed[outcome['index']] = (position, outcome['filename'], outcome['text'])
+    parsed = sorted([item for item in parsed if item is not None] + extracted)
+    texts.update((position, resume_text) for position, _, resume_text in parsed)
+
+    # Score every resume locally, then send only the shortlist to the AI.
+    # Finished files still count, so a resumed job keeps the same shortlist.
+    scores = local_scores([resume_text for _, _, resume_text in parsed], criteria)
+    kept = set(shortlist(scores, top_k=options['top_k'], min_score=options['min_local_score']))
+    pending = []
+    for i, (position, filename, resume_text) in enumerate(parsed):
+        if i not in kept:
+            report_new(position, 'screened_out', {'filename': filename, 'local_score': scores[i]})
+        elif position not in finished:
+            pending.append((position, filename, resume_text, scores[i]))
+
+    def analysis_done(index, analysis):
+        position, filename, _, local_score = pending[index]
+        analysis['filename'] = filename
+        analysis['local_score'] = local_score
+        report(position, 'error' if 'error' in analysis else 'done', analysis)
+
+    # Analyze with AI, several resumes in flight at once
+    routing = None
+    resume_texts = [resume_text for _, _, resume_text, _ in pending]
+    if data.get('batched'):
+        # Several resumes per request for large intake batches
+        analyzer.analyze_resumes_batched(
+            resume_texts,
+            criteria,
+            token_budget=options['batch_token_budget'],
+            concurrency=concurrency,
+            refresh=refresh,
+            on_result=analysis_done
+        )
+    elif data.get('cascade'):
+        # Small fast model first; only uncertain candidates reach the large one
+        fast = build_analyzer(data.get('api_key'), provider, model=FAST_MODELS.get(provider))
+        cascade = CascadeAnalyzer(fast, analyzer, band=CASCADE_BAND)
+        cascade.analyze_resumes(
+            resume_texts, criteria, concurrency=concurrency, refresh=refresh, on_result=analysis_done
+        )
+    elif HEDGE_AFTER_SECONDS > 0 or data.get('fallback_api_key'):
+        # Hedge slow requests and fail over to the other provider when
+        # it has a key; otherwise hedge with a second attempt
+        analyzers = [analyzer]
+        fallback = build_fallback_analyzer(provider, data.get('fallback_api_key'))
+        if fallback:
+            analyzers.append(fallback)
+        hedged = HedgedAnalyzer(analyzers, hedge_after=HEDGE_AFTER_SECONDS or DEFAULT_HEDGE_AFTER)
+        hedged.analyze_resumes(
+            resume_texts, criteria, concurrency=concurrency, refresh=refresh, on_result=analysis_done
+        )
+        routing = hedged.routing_summary()
+    else:
+        analyzer.analyze_resumes(
+            resume_texts, criteria, concurrency=concurrency, refresh=refresh, on_result=analysis_done
+        )
+
+    # Clean up uploaded files if they were saved to disk
+    for file_info in data['files']:
+        try:
+            if 'saved_path' in file_info and os.path.exists(file_info['saved_path']):
+                os.remove(file_info['saved_path'])
+        except:
+            pass
+
+    return {'routing': routing}
+
+
+# Analysis runs as background jobs so large batches outlive the HTTP
+# request; progress is kept in SQLite and shared by every worker
+job_store = JobStore(JOB_STORE_PATH)
+job_queue = JobQueue(
+    job_store, run_analysis_job, workers=JOB_WORKERS, secret_fields=('api_key', 'fallback_api_key')
+)
+requisition_store = RequisitionStore(REQUISITION_STORE_PATH)
+
+
 @app.route('/')
 def index():
     """Render login page or main app."""
     if session.get('logged_in'):
-        return render_template('index.html')
+        export_formats = [export_format for export_format in EXPORT_FORMATS if export_available(export_format)]
+        return render_template('index.html', export_formats=export_formats)
     return render_template('login.html')
 
 
@@ -83,190 +505,691 @@ def serve_service_worker():
 @app.route('/api/upload', methods=['POST'])
 @login_required
 def upload_files():
-    """Handle file uploads - keep files in memory."""
+    """Stage uploaded files on disk and return their file IDs."""
     if 'files' not in request.files:
         return jsonify({'error': 'No files provided'}), 400
 
     files = request.files.getlist('files')
     uploaded_files = []
+    rejected = []
 
     for file in files:
         if file and allowed_file(file.filename):
-            # Read file content into memory
-            file_content = file.read()
-            filename = secure_filename(file.filename)
+            # Copied in chunks from the spooled upload, never read whole
+            file_id, size = upload_store.put(file.stream)
             uploaded_files.append({
-                'original_name': filename,
-                'content': file_content,
-                'id': str(uuid.uuid4())
+                'id': file_id,
+                'original_name': secure_filename(file.filename),
+                'size': size
             })
+        elif file:
+            rejected.append(file.filename)
 
     return jsonify({
         'success': True,
         'files': uploaded_files,
-        'count': len(uploaded_files)
+        'count': len(uploaded_files),
+        'rejected': rejected
+    })
+
+
+@app.route('/api/upload/check', methods=['POST'])
+@login_required
+def check_uploads():
+    """Report which files, by SHA-256 of their content, are already staged.
+
+    The client uploads only the missing ones and refers to the others by
+    their hash, which is their file ID. Checking a file keeps it from
+    expiring.
+    """
+    hashes = (request.json or {}).get('hashes')
+    if not isinstance(hashes, list) or not all(isinstance(h, str) for h in hashes):
+        return jsonify({'error': 'hashes must be a list of SHA-256 hex digests'}), 400
+    if len(hashes) > MAX_UPLOAD_CHECK:
+        return jsonify({'error': f'At most {MAX_UPLOAD_CHECK} hashes per request'}), 400
+
+    hashes = [h.lower() for h in hashes]
+    known = [h for h in hashes if upload_store.has(h)]
+    known_set = set(known)
+    return jsonify({
+        'success': True,
+        'known': known,
+        'missing': [h for h in hashes if h not in known_set]
+    })
+
+
+@app.route('/api/uploads', methods=['POST'])
+@login_required
+def start_chunked_upload():
+    """Start a resumable upload of one file sent in chunks.
+
+    Takes the file name, its size in bytes and optionally its SHA-256. A file
+    that is already staged is returned straight away instead.
+    """
+    data = request.json or {}
+    filename = data.get('filename') or ''
+    if not allowed_file(filename):
+        return jsonify({'error': f'Unsupported file type: {filename}'}), 400
+
+    sha256 = data.get('sha256')
+    if isinstance(sha256, str) and upload_store.has(sha256.lower()):
+        return jsonify({
+            'success': True,
+            'file': {'id': sha256.lower(), 'original_name': secure_filename(filename), 'size': data.get('size')}
+        })
+
+    try:
+        upload_id = chunked_uploads.create(secure_filename(filename), data.get('size'), sha256)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'chunk_size': UPLOAD_CHUNK_BYTES, **chunked_uploads.info(upload_id)})
+
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+@login_required
+def chunked_upload_status(upload_id):
+    """Report which byte ranges of an upload have arrived, for resuming it."""
+    info = chunked_uploads.info(upload_id)
+    if info is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify({'success': True, 'chunk_size': UPLOAD_CHUNK_BYTES, **info})
+
+
+@app.route('/api/uploads/<upload_id>/chunks/<int:offset>', methods=['PUT'])
+@login_required
+def put_upload_chunk(upload_id, offset):
+    """Write the raw request body into an upload at offset.
+
+    An X-Chunk-SHA256 header, when sent, is checked before the chunk counts
+    as received. Sending a chunk again is harmless.
+    """
+    if not request.content_length:
+        return jsonify({'error': 'Content-Length required'}), 411
+    try:
+        received = chunked_uploads.write_chunk(
+            upload_id, offset, request.content_length, request.stream,
+            request.headers.get('X-Chunk-SHA256')
+        )
+    except LookupError:
+        return jsonify({'error': 'Upload not found'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'received_bytes': received})
+
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+@login_required
+def complete_chunked_upload(upload_id):
+    """Verify a fully sent upload and stage it; return its file ID."""
+    info = chunked_uploads.info(upload_id)
+    if info is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    if info['missing']:
+        return jsonify({'error': 'Upload is incomplete', 'missing': info['missing']}), 409
+
+    try:
+        file_id, size = chunked_uploads.complete(upload_id)
+    except LookupError:
+        return jsonify({'error': 'Upload not found'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'success': True,
+        'file': {'id': file_id, 'original_name': info['filename'], 'size': size}
     })
 
 
+def stage_inline_files(files):
+    """Move base64 file contents sent with a request into the upload store.
+
+    Jobs keep their request until they finish, so they refer to staged
+    files by ID rather than carrying the bytes.
+
+    Raises:
+        ValueError: If a file's content is not valid base64
+    """
+    staged = []
+    for file_info in files:
+        if 'content' in file_info and 'file_id' not in file_info:
+            try:
+                content = base64.b64decode(file_info['content'], validate=True)
+            except (TypeError, binascii.Error):
+                raise ValueError(f"Invalid file content: {file_info.get('original_name', 'Unknown')}")
+            file_id, _ = upload_store.put(io.BytesIO(content))
+            file_info = {'file_id': file_id, 'original_name': file_info.get('original_name', 'Unknown')}
+        staged.append(file_info)
+    return staged
+
+
 @app.route('/api/analyze', methods=['POST'])
 @login_required
 def analyze():
-    """Analyze resumes against criteria."""
+    """Queue resumes for analysis and return the ID of the job to poll."""
     data = request.json
 
-    # Validate request
-    if not data.get('api_key'):
-        return jsonify({'error': 'API key is required'}), 400
+    try:
+        analysis_options(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    if not data.get('files'):
-        return jsonify({'error': 'No files to analyze'}), 400
+    missing = [
+        file_info.get('original_name', file_info['file_id']) for file_info in data['files']
+        if 'file_id' in file_info and not upload_store.has(file_info['file_id'])
+    ]
+    if missing:
+        return jsonify({'error': f"Uploaded files not found or expired: {', '.join(missing)}"}), 400
 
-    # Get analysis mode and criteria
-    mode = data.get('mode', 'criteria')
+    try:
+        files = stage_inline_files(data['files'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    filenames = [file_info.get('original_name', 'Unknown') for file_info in files]
+    job_id = job_queue.submit(dict(data, files=files), filenames)
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': f'/api/jobs/{job_id}',
+        'total': len(filenames)
+    }), 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@login_required
+def job_status(job_id):
+    """Report an analysis job's per-file progress and the results so far."""
+    job = job_store.get(job_id, files=False)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_summary(job))
 
-    if mode == 'description':
-        job_description = data.get('job_description', '').strip()
-        if not job_description:
-            return jsonify({'error': 'Job description is required'}), 400
-        criteria = {'job_description': job_description}
-    else:
-        job_title = data.get('job_title', '').strip()
-        if not job_title:
-            return jsonify({'error': 'Job title is required'}), 400
-        criteria = {
-            'job_title': job_title,
-            'skills': data.get('skills', ''),
-            'experience': data.get('experience', ''),
-            'education': data.get('education', ''),
-            'additional_notes': data.get('additional_notes', '')
-        }
 
-    provider = data.get('provider', 'anthropic')
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+@login_required
+def job_results(job_id):
+    """List one page of a job's results, sorted and filtered in the database.
+
+    Query parameters: sort (score, local_score, filename, position or
+    weighted), order (desc or asc), status, recommendation (yes, no or maybe),
+    min_score, q (part of the file name), offset and limit. Files still
+    waiting for analysis are listed only with status=pending. Rows carry only
+    the file name, scores and recommendation; the full analysis of a file comes from
+    /api/jobs/<id>/results/<position>.
 
+    sort=weighted re-ranks the analyzed files by a weighted composite of
+    their sub-scores, with weights such as skills:3,experience:2 in the
+    weights parameter; each row then also has its weighted_score.
+    """
+    job = job_store.get(job_id, files=False)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
     try:
-        # Initialize analyzer
-        analyzer = AIAnalyzer(data['api_key'], provider)
-        parser = ResumeParser()
-        results = []
+        filters = results_filters(request.args)
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = max(1, min(int(request.args.get('limit', RESULTS_PAGE_SIZE)), MAX_RESULTS_PAGE))
+        if filters['sort'] == WEIGHTED_SORT:
+            positions, composite = weighted_ranking(job, request.args, filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-        # Analyze each file
-        for file_info in data['files']:
-            try:
-                # Parse resume - handle both file path and bytes
-                if 'saved_path' in file_info:
-                    resume_text = parser.parse_resume(file_info['saved_path'])
-                elif 'content' in file_info:
-                    import base64
-                    # Decode base64 content if needed
-                    if isinstance(file_info['content'], str):
-                        file_content = base64.b64decode(file_info['content'])
-                    else:
-                        file_content = file_info['content']
-                    resume_text = parser.parse_resume_from_bytes(file_content, file_info['original_name'])
-                else:
-                    results.append({
-                        'filename': file_info['original_name'],
-                        'error': 'No file content or path provided'
-                    })
-                    continue
+    if filters['sort'] == WEIGHTED_SORT:
+        page = positions[offset:offset + limit].tolist()
+        found = job_store.rows_at(job_id, page)
+        rows = [
+            dict(found[position], weighted_score=round(float(score), 1))
+            for position, score in zip(page, composite[offset:offset + limit])
+            if position in found
+        ]
+        total = len(positions)
+    else:
+        rows, total = job_store.page_files(job_id, offset=offset, limit=limit, **filters)
+    return jsonify({
+        'success': True,
+        'rows': rows,
+        'total': total,
+        'offset': offset,
+        'limit': limit
+    })
 
-                if not resume_text:
-                    results.append({
-                        'filename': file_info['original_name'],
-                        'error': 'Failed to parse resume'
-                    })
-                    continue
 
-                # Analyze with AI
-                analysis = analyzer.analyze_resume(resume_text, criteria)
-                analysis['filename'] = file_info['original_name']
-                results.append(analysis)
+@app.route('/api/jobs/<job_id>/results/<int:position>', methods=['GET'])
+@login_required
+def job_result_detail(job_id, position):
+    """Return the full analysis of one file of a job."""
+    entry = job_store.file_result(job_id, position)
+    if entry is None:
+        return jsonify({'error': 'Result not found'}), 404
+    return jsonify({'success': True, **entry})
+
 
-            except Exception as e:
-                results.append({
-                    'filename': file_info['original_name'],
-                    'error': str(e)
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+@login_required
+def job_events(job_id):
+    """Stream an analysis job's results as Server-Sent Events.
+
+    Sends a "result" event with the slim row of each file as soon as it is
+    analyzed, fails or is screened out, then a "done" event with the same
+    summary as /api/jobs/<id>. A connection is closed after
+    EVENT_STREAM_SECONDS so it never hits the worker timeout; the browser
+    reconnects and is sent the finished files again. An open stream holds
+    its worker thread, so the app must run on threaded workers (see the
+    Procfile).
+    """
+    if job_store.get(job_id, files=False) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    total = sum(job_store.progress(job_id).values())
+
+    def events():
+        sent = set()
+        since = 0.0
+        deadline = time.monotonic() + EVENT_STREAM_SECONDS
+        yield "retry: 1000\n\n"
+        while True:
+            # Read the status first: once it says finished, every file is stored
+            job = job_store.get(job_id, files=False)
+            if job is None:
+                return
+            for row in job_store.finished_rows(job_id, since):
+                since = max(since, row.pop('finished_at'))
+                if row['position'] in sent:
+                    continue
+                sent.add(row['position'])
+                yield sse_event('result', {
+                    'position': row['position'],
+                    'status': row['status'],
+                    'row': row,
+                    'completed': len(sent),
+                    'total': total
                 })
 
-        # Sort by score
-        valid_results = [r for r in results if 'error' not in r]
-        valid_results.sort(key=lambda x: x.get('overall_score', 0), reverse=True)
+            if job['status'] in ('completed', 'failed'):
+                yield sse_event('done', job_summary(job))
+                return
+            if time.monotonic() >= deadline:
+                return
+            # Woken early when this worker finishes a file; jobs running in
+            # other workers are picked up by the timeout
+            job_queue.wait_for_update(timeout=1.0)
 
-        # Put errors at the end
-        error_results = [r for r in results if 'error' in r]
-        final_results = valid_results + error_results
+    response = app.response_class(stream_with_context(events()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
-        # Clean up uploaded files if they were saved to disk
-        for file_info in data['files']:
-            try:
-                if 'saved_path' in file_info and os.path.exists(file_info['saved_path']):
-                    os.remove(file_info['saved_path'])
-            except:
-                pass
 
-        return jsonify({
-            'success': True,
-            'results': final_results,
-            'analyzed': len(valid_results),
-            'errors': len(error_results)
-        })
+def sse_event(name, payload):
+    """Format one Server-Sent Event."""
+    return f"event: {name}\ndata: {json.dumps(payload)}\n\n"
+
+
+def job_summary(job):
+    """Build the status response of a job from its stored file counts.
+
+    The results themselves are listed page by page by
+    /api/jobs/<id>/results, so the response stays small however many files
+    the job has. Token usage and cascade tiers are added once it finishes.
+    """
+    progress = job_store.progress(job['id'])
+    total = sum(progress.values())
+
+    usage = tiers = None
+    if job['status'] in ('completed', 'failed'):
+        # Only the small fields are kept while reading every result once
+        finished = [
+            {key: result[key] for key in ('usage', 'tier', 'escalation_error', 'error') if key in result}
+            for _, status, result in job_store.iter_results(job['id'], sort='position')
+            if status in ('done', 'error')
+        ]
+        usage = summarize_usage(result for result in finished if 'error' not in result)
+        if any('tier' in result for result in finished):
+            tiers = CascadeAnalyzer.tier_counts(finished)
+
+    return {
+        'success': job['status'] != 'failed',
+        'job_id': job['id'],
+        'status': job['status'],
+        'error': job['error'],
+        'total': total,
+        'completed': total - progress['pending'],
+        'progress': progress,
+        'analyzed': progress['done'],
+        'errors': progress['error'],
+        'screened_out': progress['screened_out'],
+        'usage': usage,
+        'routing': job['summary'].get('routing'),
+        'tiers': tiers
+    }
+
+
+@app.route('/api/stats', methods=['GET'])
+@login_required
+def cache_stats():
+    """Report cache hit/miss counters for this worker process."""
+    return jsonify({
+        'success': True,
+        'text_cache': ResumeParser.cache.stats(),
+        'analysis_cache': analysis_cache.stats() if analysis_cache else None,
+        'search_index': ResumeParser.search_index.stats() if ResumeParser.search_index else None
+    })
+
+
+@app.route('/api/search', methods=['POST'])
+@login_required
+def search_archive():
+    """Find previously parsed resumes that best match a job description.
+
+    Criteria are given as for /api/analyze; top_k sets how many hits come
+    back (at most MAX_SEARCH_RESULTS). Hits are ranked by cosine
+    similarity of hashed word and word-pair counts, without any AI call.
+    """
+    if ResumeParser.search_index is None:
+        return jsonify({'error': 'Resume search is disabled on this server'}), 400
+
+    data = request.json or {}
+    try:
+        query = criteria_query(analysis_criteria(data))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        top_k = max(1, min(int(data.get('top_k', DEFAULT_SEARCH_RESULTS)), MAX_SEARCH_RESULTS))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'top_k must be an integer'}), 400
+
+    start = time.perf_counter()
+    hits = ResumeParser.search_index.search(query, top_k=top_k)
+    return jsonify({
+        'success': True,
+        'hits': hits,
+        'searched': ResumeParser.search_index.stats()['documents'],
+        'seconds': round(time.perf_counter() - start, 4)
+    })
+
+
+@app.route('/api/jobs/<job_id>/export', methods=['GET'])
+@login_required
+def export_job_results(job_id):
+    """Stream a job's results as an xlsx, CSV or Parquet download.
+
+    Takes format plus the sort and filter parameters of
+    /api/jobs/<id>/results; only analyzed files are exported unless a status
+    is given. Rows are read from the database and written to the response
+    one at a time.
+    """
+    job = job_store.get(job_id, files=False)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    export_format = request.args.get('format', 'xlsx')
+    try:
+        filters = results_filters(request.args)
+        if filters['sort'] == WEIGHTED_SORT:
+            positions, _ = weighted_ranking(job, request.args, filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if filters['sort'] == WEIGHTED_SORT:
+        results = weighted_results(job_id, positions.tolist())
+    else:
+        filters['status'] = filters['status'] or 'done'
+        results = (result for _, _, result in job_store.iter_results(job_id, **filters))
+    return export_response(export_format, results)
 
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+
+def weighted_results(job_id, positions, batch_size=500):
+    """Yield the full results of the given files in order, reading a batch at a time."""
+    for start in range(0, len(positions), batch_size):
+        batch = positions[start:start + batch_size]
+        found = job_store.rows_at(job_id, batch, full=True)
+        for position in batch:
+            if position in found:
+                yield found[position]
 
 
 @app.route('/api/export', methods=['POST'])
 @login_required
 def export_results():
-    """Export results to Excel."""
-    import pandas as pd
+    """Export a job's analyzed results, or results posted by the client, as a download."""
+    data = request.json or {}
+    export_format = data.get('format', 'xlsx')
+    if data.get('job_id'):
+        results = (result for _, _, result in job_store.iter_results(data['job_id'], status='done'))
+    else:
+        results = data.get('results', [])
+        if not results:
+            return jsonify({'error': 'No results to export'}), 400
+    return export_response(export_format, results)
 
-    data = request.json
-    results = data.get('results', [])
-
-    if not results:
-        return jsonify({'error': 'No results to export'}), 400
-
-    # Prepare data
-    export_data = []
-    for rank, result in enumerate(results, 1):
-        if 'error' not in result:
-            export_data.append({
-                'Rank': rank,
-                'Filename': result.get('filename', 'Unknown'),
-                'Overall Score': result.get('overall_score', 0),
-                'Interview Recommendation': result.get('interview_recommendation', result.get('recommendation', 'N/A')),
-                'Skills Score': result.get('skills_score', 0),
-                'Experience Score': result.get('experience_score', 0),
-                'Education Score': result.get('education_score', 0),
-                'Qualifications Score': result.get('qualifications_score', 0),
-                'Strengths': '; '.join(result.get('strengths', [])),
-                'Gaps & Concerns': '; '.join(result.get('weaknesses', [])),
-                'Interview Questions': '; '.join(result.get('interview_questions', [])),
-                'Summary': result.get('summary', '')
-            })
 
-    # Create Excel file
-    df = pd.DataFrame(export_data)
+def export_response(export_format, results):
+    """Build a streamed download of results in the given format."""
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    if not export_available(export_format):
+        return jsonify({'error': f'{export_format} export is not available on this server'}), 400
+
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"resume_screening_results_{timestamp}.xlsx"
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    df.to_excel(filepath, index=False)
+    filename = f"resume_screening_results_{timestamp}.{export_format}"
+    response = app.response_class(
+        stream_with_context(stream_export(export_format, export_rows(results))),
+        mimetype=EXPORT_MIMETYPES[export_format]
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
 
-    # Send file and clean up
+
+@app.route('/api/requisitions', methods=['GET'])
+@login_required
+def list_requisitions():
+    """List requisitions with their candidate counts, most recently updated first."""
+    return jsonify({'success': True, 'requisitions': requisition_store.list()})
+
+
+@app.route('/api/requisitions', methods=['POST'])
+@login_required
+def create_requisition():
+    """Open a requisition: a title and the criteria its candidates are screened against.
+
+    Criteria are given as for /api/analyze: mode=description with
+    job_description, or job_title, skills, experience, education and
+    additional_notes.
+    """
+    data = request.json or {}
     try:
-        return send_file(filepath, as_attachment=True, download_name=filename)
-    finally:
-        import threading
-        def cleanup():
-            import time
-            time.sleep(5)  # Wait 5 seconds before cleanup
-            try:
-                if os.path.exists(filepath):
-                    os.remove(filepath)
-            except:
-                pass
-        threading.Thread(target=cleanup).start()
+        criteria = analysis_criteria(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    title = (data.get('title') or criteria.get('job_title') or 'Untitled requisition').strip()
+    requisition_id = requisition_store.create(title, criteria)
+    return jsonify({'success': True, 'requisition': requisition_store.get(requisition_id)}), 201
+
+
+@app.route('/api/requisitions/<requisition_id>', methods=['GET'])
+@login_required
+def requisition_status(requisition_id):
+    """Report a requisition's criteria and how many candidates are in each status."""
+    requisition = requisition_store.get(requisition_id)
+    if requisition is None:
+        return jsonify({'error': 'Requisition not found'}), 404
+    return jsonify({'success': True, 'requisition': requisition})
+
+
+@app.route('/api/requisitions/<requisition_id>', methods=['PATCH'])
+@login_required
+def update_requisition(requisition_id):
+    """Rename a requisition or change its criteria.
+
+    Criteria fields given are merged into the stored criteria, so
+    {"skills": "java"} changes only the skills. Candidates scored under other criteria keep their results and place in
+    the ranking but are marked stale; /api/requisitions/<id>/refresh scores
+    them again.
+    """
+    requisition = requisition_store.get(requisition_id)
+    if requisition is None:
+        return jsonify({'error': 'Requisition not found'}), 404
+
+    data = request.json or {}
+    criteria = None
+    changes = {field: data[field] for field in CRITERIA_FIELDS if field in data}
+    if changes:
+        try:
+            criteria = analysis_criteria({**criteria_request(requisition['criteria']), **changes})
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    stale = requisition_store.update(requisition_id, title=data.get('title'), criteria=criteria)
+    if stale is None:
+        return jsonify({'error': 'Requisition not found'}), 404
+    return jsonify({'success': True, 'stale': stale, 'requisition': requisition_store.get(requisition_id)})
+
+
+@app.route('/api/requisitions/<requisition_id>', methods=['DELETE'])
+@login_required
+def delete_requisition(requisition_id):
+    """Delete a requisition and everything stored about its candidates."""
+    if not requisition_store.delete(requisition_id):
+        return jsonify({'error': 'Requisition not found'}), 404
+    return jsonify({'success': True})
+
+
+@app.route('/api/requisitions/<requisition_id>/candidates', methods=['POST'])
+@login_required
+def add_requisition_candidates(requisition_id):
+    """Add uploaded resumes to a requisition and analyze only the ones it has not seen.
+
+    Takes the files (by file_id) and analysis options of /api/analyze;
+    the criteria are the requisition's. Resumes already analyzed for the
+    requisition are skipped. Returns the ID of the job analyzing the new
+    ones, whose results are merged into the requisition's ranking as they
+    arrive.
+    """
+    requisition = requisition_store.get(requisition_id)
+    if requisition is None:
+        return jsonify({'error': 'Requisition not found'}), 404
+
+    data = request.json or {}
+    files = data.get('files') or []
+    if any('file_id' not in file_info for file_info in files):
+        return jsonify({'error': 'Candidates must be uploaded first and given by file_id'}), 400
+    try:
+        analysis_options(requisition_job(requisition, data, files))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    missing = [
+        file_info.get('original_name', file_info['file_id']) for file_info in files
+        if not upload_store.has(file_info['file_id'])
+    ]
+    if missing:
+        return jsonify({'error': f"Uploaded files not found or expired: {', '.join(missing)}"}), 400
+
+    added = requisition_store.add_candidates(requisition_id, files)
+    job_id = submit_requisition_job(requisition, data, added) if added else None
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': f'/api/jobs/{job_id}' if job_id else None,
+        'added': len(added),
+        'skipped': len(files) - len(added)
+    }), 202 if job_id else 200
+
+
+@app.route('/api/requisitions/<requisition_id>/candidates', methods=['GET'])
+@login_required
+def requisition_candidates(requisition_id):
+    """List one page of a requisition's analyzed candidates, best first.
+
+    Query parameters: offset and limit. Rows carry the scores and
+    recommendation plus rank, file_id and stale; the full analysis comes
+    from /api/requisitions/<id>/candidates/<file_id>.
+    """
+    if requisition_store.get(requisition_id) is None:
+        return jsonify({'error': 'Requisition not found'}), 404
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = max(1, min(int(request.args.get('limit', RESULTS_PAGE_SIZE)), MAX_RESULTS_PAGE))
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+
+    rows, total = requisition_store.ranked(requisition_id, offset=offset, limit=limit)
+    return jsonify({'success': True, 'rows': rows, 'total': total, 'offset': offset, 'limit': limit})
+
+
+@app.route('/api/requisitions/<requisition_id>/candidates/<file_id>', methods=['GET'])
+@login_required
+def requisition_candidate(requisition_id, file_id):
+    """Return one candidate's full analysis."""
+    candidate = requisition_store.candidate(requisition_id, file_id)
+    if candidate is None:
+        return jsonify({'error': 'Candidate not found'}), 404
+    return jsonify({'success': True, **candidate})
+
+
+@app.route('/api/requisitions/<requisition_id>/refresh', methods=['POST'])
+@login_required
+def refresh_requisition(requisition_id):
+    """Analyze the candidates without a current result under the requisition's criteria.
+
+    These are stale candidates, failed ones and any left pending by a job
+    that stopped. Their stored text is reused, so nothing is uploaded again.
+    Takes the analysis options of /api/analyze.
+    """
+    requisition = requisition_store.get(requisition_id)
+    if requisition is None:
+        return jsonify({'error': 'Requisition not found'}), 404
+
+    data = request.json or {}
+    files = [
+        candidate for candidate in requisition_store.unfinished(requisition_id)
+        if not job_active(candidate['job_id'])
+    ]
+    if not files:
+        return jsonify({'success': True, 'job_id': None, 'total': 0})
+    try:
+        analysis_options(requisition_job(requisition, data, files))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    job_id = submit_requisition_job(requisition, data, files)
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': f'/api/jobs/{job_id}',
+        'total': len(files)
+    }), 202
+
+
+def requisition_job(requisition, data, files):
+    """Build the job request that analyzes some of a requisition's candidates.
+
+    The requisition's current criteria replace any in data. Every file is
+    analyzed: a local pre-filter over a handful of late applicants would not
+    say anything about the whole pool.
+    """
+    job = {key: value for key, value in data.items() if not key.startswith('prefilter_')}
+    job.update(criteria_request(requisition['criteria']))
+    job.update(
+        files=[
+            {'file_id': file_info['file_id'], 'original_name': file_info.get('original_name', 'Unknown')}
+            for file_info in files
+        ],
+        requisition_id=requisition['id'],
+        criteria_key=requisition['criteria_key']
+    )
+    return job
+
+
+def submit_requisition_job(requisition, data, files):
+    """Queue a job for some of a requisition's candidates and return its ID."""
+    job = requisition_job(requisition, data, files)
+    job_id = job_queue.submit(job, [file_info['original_name'] for file_info in job['files']])
+    requisition_store.assign_job(requisition['id'], [file_info['file_id'] for file_info in job['files']], job_id)
+    return job_id
+
+
+def job_active(job_id):
+    """Check whether a job is still queued or running."""
+    job = job_store.get(job_id, files=False) if job_id else None
+    return job is not None and job['status'] in ('queued', 'running')
 
 
 if __name__ == '__main__':
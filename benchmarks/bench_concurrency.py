@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch analysis wall-clock time against the concurrency setting.
+
+Uses a local fake provider that answers every request after a fixed delay,
+so no API key or network access is needed:
+
+    python benchmarks/bench_concurrency.py --resumes 50 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_analyzer import AIAnalyzer
+
+
+FAKE_RESPONSE = """OVERALL SCORE: 72
+INTERVIEW RECOMMENDATION: Maybe
+KEY QUALIFICATIONS MATCH: 70
+SKILLS ASSESSMENT: 75
+EXPERIENCE ASSESSMENT: 68
+EDUCATION ASSESSMENT: 80
+STRENGTHS:
+- Solid Python background
+GAPS & CONCERNS:
+- No team leadership
+INTERVIEW QUESTIONS:
+- Describe a project you owned end to end
+SUMMARY:
+Reasonable fit for the role.
+"""
+
+
+class FakeMessages:
+    """Stand-in for the Anthropic messages API with a fixed response delay."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def create(self, **kwargs):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            return SimpleNamespace(content=[SimpleNamespace(text=FAKE_RESPONSE)])
+        finally:
+            self.in_flight -= 1
+
+
+class FakeAsyncClient:
+    """Stand-in for AsyncAnthropic."""
+
+    def __init__(self, latency: float):
+        self.messages = FakeMessages(latency)
+
+    async def close(self):
+        pass
+
+
+class FakeProviderAnalyzer(AIAnalyzer):
+    """AIAnalyzer wired to the fake provider instead of the real API."""
+
+    def __init__(self, latency: float):
+        super().__init__(api_key="fake-key", provider="anthropic")
+        self.latency = latency
+        self.last_client = None
+
+    def _create_async_client(self):
+        self.last_client = FakeAsyncClient(self.latency)
+        return self.last_client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=50, help='Number of resumes in the batch')
+    parser.add_argument('--latency', type=float, default=0.2, help='Fake provider latency in seconds')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 5, 10, 20],
+                        help='Concurrency settings to compare')
+    args = parser.parse_args()
+
+    analyzer = FakeProviderAnalyzer(args.latency)
+    resumes = [f"Candidate {i}\nPython developer with {i % 10} years experience" for i in range(args.resumes)]
+    criteria = {'job_description': 'Senior Python developer'}
+
+    print(f"{args.resumes} resumes, {args.latency * 1000:.0f} ms fake provider latency")
+    print(f"{'concurrency':>12} {'wall (s)':>10} {'resumes/s':>10} {'peak':>6}")
+
+    for concurrency in args.concurrency:
+        start = time.perf_counter()
+        results = analyzer.analyze_resumes(resumes, criteria, concurrency=concurrency)
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == args.resumes
+        assert all(r['overall_score'] == 72 for r in results)
+
+        peak = analyzer.last_client.messages.peak_in_flight
+        print(f"{concurrency:>12} {elapsed:>10.2f} {args.resumes / elapsed:>10.1f} {peak:>6}")
+
+
+if __name__ == '__main__':
+    main()
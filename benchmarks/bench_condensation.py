@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Compare resume condensation with the old 4000 character cut.
+
+Builds a seeded corpus of synthetic resumes of varied length, with PDF-style
+page headers and footers, and plants a known fact in each section (latest
+job title, a key skill, the degree, a certification). Reports the average
+input tokens per resume and how many planted facts survive each method,
+then checks on a second corpus, whose roles share bullets, skill and
+employer lines, that cleanup keeps every copy of that content while still
+dropping the repeated page headers:
+
+    python benchmarks/bench_condensation.py --resumes 200 --budget 800
+
+Pass --corpus DIR to also report token counts for real PDF/DOCX resumes.
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from condenser import DEFAULT_RESUME_TOKENS, condense_resume, estimate_tokens
+
+
+TITLES = ["Software Engineer", "Data Analyst", "Project Manager", "DevOps Engineer", "Product Designer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Ltd", "Stark Industries", "Wayne Enterprises"]
+SKILLS = ["Python", "Kubernetes", "Tableau", "Terraform", "Figma", "PostgreSQL", "React", "Spark"]
+DEGREES = ["BSc Computer Science", "MSc Statistics", "BA Economics", "MEng Electrical Engineering"]
+CERTIFICATIONS = ["AWS Solutions Architect", "PMP", "CKA", "Google Data Analytics"]
+VERBS = ["Led", "Built", "Designed", "Migrated", "Automated", "Streamlined", "Owned", "Launched"]
+OBJECTS = ["the reporting pipeline", "a customer onboarding flow", "internal tooling", "the billing service",
+           "quarterly planning", "the data warehouse", "a mobile release process", "vendor integrations"]
+OUTCOMES = ["cutting costs by {n}%", "improving retention by {n}%", "reducing incidents by {n}%",
+            "saving {n} hours a month", "serving {n}k users"]
+
+
+def bullet(rng: random.Random) -> str:
+    """Return one varied experience bullet."""
+    outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+    return (f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} with cross-functional stakeholders, "
+            f"{outcome} while mentoring {rng.randint(2, 9)} colleagues.")
+
+
+def synthetic_resume(rng: random.Random, index: int):
+    """Return (text, planted facts) for one synthetic resume."""
+    name = f"Candidate {index}"
+    latest_title = f"Lead {rng.choice(TITLES)} {index}"
+    key_skill = f"{rng.choice(SKILLS)}-{index}"
+    degree = f"{rng.choice(DEGREES)} ({index})"
+    certification = f"{rng.choice(CERTIFICATIONS)} #{index}"
+
+    lines = [name, f"{name.lower().replace(' ', '.')}@example.com | +1 555 0100", "", "PROFESSIONAL SUMMARY",
+             bullet(rng) + " " + bullet(rng), "", "WORK EXPERIENCE"]
+    jobs = rng.randint(2, 9)
+    for job in range(jobs):
+        title = latest_title if job == 0 else rng.choice(TITLES)
+        lines.append(f"{title} - {rng.choice(COMPANIES)} ({2023 - job * 2} - {2025 - job * 2})")
+        for _ in range(rng.randint(3, 7)):
+            lines.append(f"  •   {bullet(rng)}")
+        if job % 3 == 2:
+            # Page break artefacts from PDF extraction
+            lines += ["", f"Page {job // 3 + 1} of {jobs // 3 + 1}", f"{name} - Resume", ""]
+    lines += ["", "SKILLS", ", ".join(rng.sample(SKILLS, 4) + [key_skill]),
+              "", "EDUCATION", degree, "University of Somewhere, 2012",
+              "", "CERTIFICATIONS", certification,
+              "", "HOBBIES", "Hiking, chess, photography", "", "References available upon request"]
+    return "\n".join(lines), [latest_title, key_skill, degree, certification]
+
+
+def repeated_content_resume(rng: random.Random, index: int):
+    """Return (text, repeated content lines, page header) for a resume whose roles share lines.
+
+    Each repeated line appears under two roles; the header follows every
+    page number, as PDF extraction leaves it.
+    """
+    name = f"Candidate {index}"
+    header = f"{name} - Resume"
+    shared = [f"• {bullet(rng)}", rng.choice(SKILLS), f"{rng.choice(COMPANIES)}, Bangkok"]
+    lines = [name, "", "WORK EXPERIENCE"]
+    jobs = rng.randint(4, 8)
+    for job in range(jobs):
+        lines.append(f"{rng.choice(TITLES)} ({2023 - job * 2} - {2025 - job * 2})")
+        if job in (1, jobs - 1):
+            lines += shared
+        lines += [f"  •   {bullet(rng)}" for _ in range(rng.randint(2, 4))]
+        if job % 2 == 1:
+            lines += ["", f"Page {job // 2 + 1} of {jobs // 2 + 1}", header, ""]
+    return "\n".join(lines), shared, header
+
+
+def report(label: str, texts, facts_per_text=None):
+    """Print average tokens and planted fact retention for a list of texts."""
+    tokens = [estimate_tokens(text) for text in texts]
+    line = f"{label:<22} avg tokens {sum(tokens) / len(tokens):8.1f}   max {max(tokens):6d}"
+    if facts_per_text is not None:
+        kept = sum(fact in text for text, facts in zip(texts, facts_per_text) for fact in facts)
+        total = sum(len(facts) for facts in facts_per_text)
+        line += f"   facts kept {kept}/{total} ({kept / total:.0%})"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resumes', type=int, default=200, help='number of synthetic resumes')
+    parser.add_argument('--budget', type=int, default=DEFAULT_RESUME_TOKENS, help='condensation token budget')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--corpus', help='directory of real PDF/DOCX resumes to measure as well')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [synthetic_resume(rng, index) for index in range(args.resumes)]
+    texts = [text for text, _ in corpus]
+    facts = [planted for _, planted in corpus]
+
+    print(f"Synthetic corpus: {len(texts)} resumes")
+    report("full text", texts, facts)
+    report("first 4000 chars", [text[:4000] for text in texts], facts)
+    report(f"condensed ({args.budget})", [condense_resume(text, args.budget) for text in texts], facts)
+
+    repeated = [repeated_content_resume(rng, index) for index in range(args.resumes)]
+    content_kept = headers_left = 0
+    for text, shared, header in repeated:
+        cleaned = condense_resume(text, None)
+        content_kept += sum(min(cleaned.count(line), 2) for line in shared)
+        headers_left += cleaned.count(header)
+    print(f"\nRepeated content corpus: {len(repeated)} resumes")
+    print(f"cleanup keeps {content_kept}/{2 * 3 * len(repeated)} copies of content shared by two roles, "
+          f"{headers_left} page headers for {len(repeated)} resumes")
+
+    if args.corpus:
+        from resume_parser import ResumeParser
+        files = [
+            (name, os.path.join(args.corpus, name)) for name in sorted(os.listdir(args.corpus))
+            if name.lower().endswith(('.pdf', '.docx'))
+        ]
+        real = [outcome['text'] for outcome in ResumeParser().parse_many(files) if outcome['text']]
+        if real:
+            print(f"\n{args.corpus}: {len(real)} resumes")
+            report("full text", real)
+            report("first 4000 chars", [text[:4000] for text in real])
+            report(f"condensed ({args.budget})", [condense_resume(text, args.budget) for text in real])
+
+
+if __name__ == '__main__':
+    main()
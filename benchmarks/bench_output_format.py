@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compare completion tokens and latency of the text and json output formats.
+
+Sends the same synthetic resumes through AIAnalyzer once per format and
+reports the mean input tokens, output tokens and request latency. Needs a
+provider API key (from --api-key or ANTHROPIC_API_KEY / OPENAI_API_KEY),
+or --base-url pointing at a compatible stand-in server:
+
+    python benchmarks/bench_output_format.py --provider anthropic --resumes 10
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_analyzer import AIAnalyzer, OUTPUT_FORMATS
+from bench_condensation import synthetic_resume
+
+
+CRITERIA = {
+    'job_description': (
+        "Senior Data Analyst. Build dashboards in Tableau, model data in PostgreSQL and "
+        "Spark, and present findings to stakeholders. 5+ years of analytics experience; "
+        "a degree in statistics, economics or computer science."
+    )
+}
+
+
+def run(analyzer: AIAnalyzer, resumes):
+    """Analyze resumes one at a time; return (results, latencies)."""
+    results, latencies = [], []
+    for resume_text in resumes:
+        start = time.perf_counter()
+        results.append(analyzer.analyze_resume(resume_text, CRITERIA))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--provider', default='anthropic', choices=['anthropic', 'openai'])
+    parser.add_argument('--model', help='model name (defaults to the analyzer default)')
+    parser.add_argument('--api-key')
+    parser.add_argument('--base-url')
+    parser.add_argument('--resumes', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resumes = [synthetic_resume(rng, index)[0] for index in range(args.resumes)]
+
+    print(f"{args.resumes} resumes, provider {args.provider}")
+    scores = {}
+    for output_format in OUTPUT_FORMATS:
+        analyzer = AIAnalyzer(
+            args.api_key, args.provider, model=args.model, base_url=args.base_url,
+            output_format=output_format
+        )
+        results, latencies = run(analyzer, resumes)
+        usages = [result['usage'] for result in results if 'usage' in result]
+        errors = sum('error' in result for result in results)
+        if not usages:
+            print(f"  {output_format:<5} all {errors} requests failed")
+            continue
+        scores[output_format] = [result.get('overall_score', 0) for result in results]
+        print(
+            f"  {output_format:<5} input {sum(u['input_tokens'] for u in usages) / len(usages):7.1f}"
+            f"   output {sum(u['output_tokens'] for u in usages) / len(usages):7.1f}"
+            f"   latency {sum(latencies) / len(latencies):6.2f} s"
+            f"   errors {errors}"
+        )
+
+    if len(scores) == 2:
+        text_scores, json_scores = scores['text'], scores['json']
+        mean_gap = sum(abs(a - b) for a, b in zip(text_scores, json_scores)) / len(text_scores)
+        print(f"  mean absolute overall score difference between formats: {mean_gap:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Measure archive search: indexing rate, index size and query latency.
+
+Builds a search index of seeded synthetic resumes in a temporary directory
+(or --index DIR, which is kept and grown on later runs), then times top-k
+searches with job descriptions and checks that searching with a resume's
+own text finds that resume first:
+
+    python benchmarks/bench_search_index.py --resumes 100000 --queries 20
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_condensation import synthetic_resume
+from hedged_analyzer import percentile
+from search_index import SearchIndex
+
+
+JOB_DESCRIPTIONS = [
+    "Senior Data Analyst: SQL, Python, Tableau and PostgreSQL; 5+ years building reporting pipelines "
+    "and the data warehouse. Bachelor's in statistics or economics.",
+    "DevOps Engineer to own Kubernetes and Terraform, automate internal tooling and reduce incidents. "
+    "CKA or AWS Solutions Architect preferred.",
+    "Product Designer fluent in Figma who has led customer onboarding flows with cross-functional stakeholders.",
+    "Project Manager for quarterly planning and vendor integrations; PMP certification a plus.",
+    "Software Engineer, React and Python, to build a mobile release process and the billing service."
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resumes', type=int, default=20000, help='number of synthetic resumes to index')
+    parser.add_argument('--queries', type=int, default=20, help='searches to time')
+    parser.add_argument('--top-k', type=int, default=20)
+    parser.add_argument('--batch', type=int, default=1000, help='resumes added per add_many call')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--index', help='index directory to use and keep (default: a temporary one)')
+    args = parser.parse_args()
+
+    directory = args.index or tempfile.mkdtemp()
+    index = SearchIndex(directory)
+    rng = random.Random(args.seed)
+    try:
+        texts = []
+        start = time.perf_counter()
+        for first in range(0, args.resumes, args.batch):
+            batch = [
+                (synthetic_resume(rng, number)[0], f"candidate_{number:06d}.pdf")
+                for number in range(first, min(first + args.batch, args.resumes))
+            ]
+            index.add_many(batch)
+            texts.extend(text for text, _ in batch[:1])
+        elapsed = time.perf_counter() - start
+        stats = index.stats()
+        print(f"Indexed {args.resumes} resumes in {elapsed:.1f} s "
+              f"({args.resumes / elapsed:.0f}/s, including generating them)")
+        print(f"Index holds {stats['documents']} resumes, {stats['bytes'] / 1e6:.0f} MB on disk")
+
+        index.search(JOB_DESCRIPTIONS[0], top_k=args.top_k)  # map the files
+        timings = []
+        for number in range(args.queries):
+            query = JOB_DESCRIPTIONS[number % len(JOB_DESCRIPTIONS)]
+            start = time.perf_counter()
+            index.search(query, top_k=args.top_k)
+            timings.append(time.perf_counter() - start)
+        print(f"Search top {args.top_k}: p50 {percentile(timings, 0.5) * 1000:.0f} ms, "
+              f"p95 {percentile(timings, 0.95) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms")
+
+        found = sum(
+            1 for number, text in enumerate(texts)
+            if index.search(text, top_k=1)[0]['filename'] == f"candidate_{number * args.batch:06d}.pdf"
+        )
+        print(f"Own text ranked first for {found} of {len(texts)} sampled resumes")
+    finally:
+        if not args.index:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Measure time to first score with streaming versus waiting for the full reply.
+
+Uses a local fake provider that streams a fixed analysis in small text
+deltas at a steady output rate, so no API key or network access is needed:
+
+    python benchmarks/bench_streaming.py --resumes 20 --tokens-per-second 60
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_analyzer import AIAnalyzer
+from bench_concurrency import FAKE_RESPONSE
+
+# Real completions run to several hundred tokens, mostly lists and summary
+STREAM_RESPONSE = FAKE_RESPONSE + " ".join(
+    ["Has shipped production services and shows steady growth in scope."] * 30
+) + "\n"
+
+
+def fake_deltas(text: str, chars_per_delta: int = 4):
+    """Split text into deltas of about one token each."""
+    return [text[i:i + chars_per_delta] for i in range(0, len(text), chars_per_delta)]
+
+
+class FakeStream:
+    """Async stream of Anthropic-style events emitted at a fixed token rate."""
+
+    def __init__(self, tokens_per_second: float, first_token_latency: float):
+        self.tokens_per_second = tokens_per_second
+        self.first_token_latency = first_token_latency
+
+    async def __aiter__(self):
+        usage = SimpleNamespace(input_tokens=900, output_tokens=1,
+                                cache_read_input_tokens=0, cache_creation_input_tokens=0)
+        yield SimpleNamespace(type='message_start', message=SimpleNamespace(usage=usage))
+        await asyncio.sleep(self.first_token_latency)
+        deltas = fake_deltas(STREAM_RESPONSE)
+        for delta in deltas:
+            await asyncio.sleep(1 / self.tokens_per_second)
+            yield SimpleNamespace(type='content_block_delta', delta=SimpleNamespace(text=delta))
+        yield SimpleNamespace(type='message_delta', usage=SimpleNamespace(output_tokens=len(deltas)))
+
+
+class FakeMessages:
+    """Stand-in for the Anthropic messages API that only streams."""
+
+    def __init__(self, tokens_per_second: float, first_token_latency: float):
+        self.tokens_per_second = tokens_per_second
+        self.first_token_latency = first_token_latency
+        self.started = {}
+
+    async def create(self, **kwargs):
+        # Note when each resume's request went out, by its number in the prompt
+        prompt = kwargs['messages'][0]['content']
+        if not isinstance(prompt, str):
+            prompt = "".join(block['text'] for block in prompt)
+        self.started[int(re.search(r'Resume number (\d+)', prompt).group(1))] = time.perf_counter()
+        return FakeStream(self.tokens_per_second, self.first_token_latency)
+
+
+class FakeAsyncClient:
+    """Stand-in for AsyncAnthropic."""
+
+    def __init__(self, tokens_per_second: float, first_token_latency: float):
+        self.messages = FakeMessages(tokens_per_second, first_token_latency)
+
+    async def close(self):
+        pass
+
+
+class FakeStreamingAnalyzer(AIAnalyzer):
+    """AIAnalyzer wired to the fake streaming provider."""
+
+    def __init__(self, tokens_per_second: float, first_token_latency: float):
+        super().__init__(api_key="fake-key", provider="anthropic")
+        self.tokens_per_second = tokens_per_second
+        self.first_token_latency = first_token_latency
+        self.last_client = None
+
+    def _create_async_client(self):
+        self.last_client = FakeAsyncClient(self.tokens_per_second, self.first_token_latency)
+        return self.last_client
+
+
+async def measure(analyzer: AIAnalyzer, resumes: int, concurrency: int):
+    """Return per-resume (first score, full result) times from its own request start."""
+    criteria = {'job_description': 'Backend engineer'}
+    first_score = {}
+    finished = {}
+    async for event in analyzer.analyze_resumes_stream_async(
+        [f"Resume number {i}" for i in range(resumes)], criteria, concurrency=concurrency
+    ):
+        now = time.perf_counter()
+        if event['type'] == 'field' and event['field'] == 'overall_score':
+            first_score.setdefault(event['index'], now)
+        elif event['type'] == 'result':
+            finished[event['index']] = now
+
+    started = analyzer.last_client.messages.started
+    return [
+        (first_score.get(i, finished[i]) - started[i], finished[i] - started[i])
+        for i in range(resumes)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resumes', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=5)
+    parser.add_argument('--tokens-per-second', type=float, default=60.0)
+    parser.add_argument('--first-token-latency', type=float, default=0.5)
+    args = parser.parse_args()
+
+    analyzer = FakeStreamingAnalyzer(args.tokens_per_second, args.first_token_latency)
+    timings = asyncio.run(measure(analyzer, args.resumes, args.concurrency))
+
+    first = [score for score, _ in timings]
+    full = [done for _, done in timings]
+    print(f"{args.resumes} resumes, concurrency {args.concurrency}, "
+          f"{args.tokens_per_second:.0f} tokens/s, {len(fake_deltas(STREAM_RESPONSE))} output tokens each")
+    print(f"  mean time to first score   {sum(first) / len(first):6.2f} s")
+    print(f"  mean time to full result   {sum(full) / len(full):6.2f} s")
+    print(f"  first score / full result  {sum(first) / sum(full):6.0%}")
+
+
+if __name__ == '__main__':
+    main()
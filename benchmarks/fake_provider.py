@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Anthropic and OpenAI APIs.
+
+Serves the Messages and Chat Completions endpoints (plain, streaming and
+structured output) as well as the batch APIs, answering every request with a
+synthetic resume analysis, so screening can be exercised and load tested
+without an API key or network access:
+
+    python benchmarks/fake_provider.py --port 8765 --latency 2 --latency-sigma 0.5 \
+        --error-rate 0.02 --rate-limit-rate 0.05
+
+Point the Anthropic client at http://127.0.0.1:8765 and the OpenAI client at
+http://127.0.0.1:8765/v1, either with AIAnalyzer's base_url (for example
+bulk_screening.py --base-url) or, for the web and desktop apps, through the
+SDKs' ANTHROPIC_BASE_URL and OPENAI_BASE_URL environment variables.
+
+Request latencies are drawn from a log-normal distribution around the median
+given by --latency. GET /stats returns request, error and 429 counts.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+ANALYSIS_TEMPLATE = """OVERALL SCORE: {overall}
+INTERVIEW RECOMMENDATION: {recommendation}
+KEY QUALIFICATIONS MATCH: {qualifications}
+SKILLS ASSESSMENT: {skills}
+EXPERIENCE ASSESSMENT: {experience}
+EDUCATION ASSESSMENT: {education}
+
+STRENGTHS:
+- Relevant technical background
+- Clear progression in previous roles
+
+GAPS & CONCERNS:
+- Limited evidence of leading teams
+
+INTERVIEW QUESTIONS:
+- Walk me through the project you are proudest of
+- How do you prioritise competing deadlines?
+
+SUMMARY:
+Synthetic analysis generated by the local fake provider.
+"""
+
+
+def fake_scores(prompt: str) -> Dict[str, Any]:
+    """Return deterministic synthetic scores for a prompt."""
+    rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).digest())
+    overall = rng.randint(30, 95)
+    return {
+        'overall': overall,
+        'recommendation': "Yes" if overall >= 75 else "Maybe" if overall >= 55 else "No",
+        'qualifications': rng.randint(30, 95),
+        'skills': rng.randint(30, 95),
+        'experience': rng.randint(30, 95),
+        'education': rng.randint(30, 95)
+    }
+
+
+def fake_analysis(prompt: str) -> str:
+    """Return a deterministic synthetic analysis for a prompt."""
+    return ANALYSIS_TEMPLATE.format(**fake_scores(prompt))
+
+
+def fake_structured_analysis(prompt: str) -> Dict[str, Any]:
+    """Return a deterministic synthetic analysis in the structured output schema."""
+    scores = fake_scores(prompt)
+    return {
+        'overall_score': scores['overall'],
+        'interview_recommendation': scores['recommendation'],
+        'qualifications_score': scores['qualifications'],
+        'skills_score': scores['skills'],
+        'experience_score': scores['experience'],
+        'education_score': scores['education'],
+        'strengths': ["Relevant technical background", "Clear progression in previous roles"],
+        'weaknesses': ["Limited evidence of leading teams"],
+        'interview_questions': ["Walk me through the project you are proudest of"],
+        'summary': "Synthetic analysis generated by the local fake provider."
+    }
+
+
+def prompt_text(messages: Any) -> str:
+    """Flatten chat messages (string or content-block form) into one string."""
+    parts = []
+    for message in messages or []:
+        content = message.get('content', '')
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get('text', '') for block in content)
+    return "".join(parts)
+
+
+def iso_time(timestamp: float) -> str:
+    """Format a Unix timestamp the way the Anthropic API does."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+class FakeProvider:
+    """Shared state of the fake server: batches, files and behaviour settings."""
+
+    def __init__(
+        self,
+        batch_delay: float = 2.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+        latency: float = 0.0,
+        latency_sigma: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0
+    ):
+        """Initialize the provider.
+
+        Args:
+            batch_delay: Seconds before a submitted batch reports completion
+            error_rate: Fraction of requests that fail
+            seed: Seed for the error and latency draws, for reproducible runs
+            latency: Median seconds a message or completion request takes
+            latency_sigma: Spread of the log-normal latency distribution
+                (0 makes every request take exactly the median)
+            rate_limit_rate: Fraction of message and completion requests
+                answered with 429
+            retry_after: Seconds sent in the retry-after header of a 429
+        """
+        self.batch_delay = batch_delay
+        self.error_rate = error_rate
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'requests': 0, 'succeeded': 0, 'errors': 0, 'rate_limited': 0, 'streamed': 0}
+
+    def should_fail(self) -> bool:
+        """Draw whether the current request fails."""
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def draw_outcome(self) -> str:
+        """Draw how a message or completion request ends: 'ok', 'error' or 'rate_limited'."""
+        with self.lock:
+            draw = self.random.random()
+            if draw < self.rate_limit_rate:
+                outcome, counter = 'rate_limited', 'rate_limited'
+            elif draw < self.rate_limit_rate + self.error_rate:
+                outcome, counter = 'error', 'errors'
+            else:
+                outcome, counter = 'ok', 'succeeded'
+            self.stats['requests'] += 1
+            self.stats[counter] += 1
+        return outcome
+
+    def draw_latency(self) -> float:
+        """Draw the seconds one request takes."""
+        if self.latency <= 0:
+            return 0.0
+        with self.lock:
+            return self.latency * math.exp(self.random.gauss(0.0, self.latency_sigma))
+
+    def add_file(self, content: bytes, filename: str, purpose: str) -> Dict[str, Any]:
+        """Store an uploaded or generated file and return its OpenAI file object."""
+        file_object = {
+            'id': f"file-{uuid.uuid4().hex[:24]}",
+            'object': 'file',
+            'bytes': len(content),
+            'created_at': int(time.time()),
+            'filename': filename,
+            'purpose': purpose,
+            'status': 'processed'
+        }
+        with self.lock:
+            self.files[file_object['id']] = {'object': file_object, 'content': content}
+        return file_object
+
+    def anthropic_message(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Build an Anthropic message response for request params."""
+        prompt = prompt_text(params.get('messages'))
+        if params.get('tools'):
+            # Forced tool call of the structured output mode
+            analysis = fake_structured_analysis(prompt)
+            content = [{
+                'type': 'tool_use',
+                'id': f"toolu_{uuid.uuid4().hex[:24]}",
+                'name': params['tools'][0]['name'],
+                'input': analysis
+            }]
+            output_tokens = len(json.dumps(analysis)) // 4 + 1
+            stop_reason = 'tool_use'
+        else:
+            text = fake_analysis(prompt)
+            content = [{'type': 'text', 'text': text}]
+            output_tokens = len(text) // 4 + 1
+            stop_reason = 'end_turn'
+        return {
+            'id': f"msg_{uuid.uuid4().hex[:24]}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': params.get('model', 'fake-model'),
+            'content': content,
+            'stop_reason': stop_reason,
+            'stop_sequence': None,
+            'usage': {'input_tokens': len(prompt) // 4 + 1, 'output_tokens': output_tokens}
+        }
+
+    def openai_completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Build an OpenAI chat completion response for a request body."""
+        prompt = prompt_text(body.get('messages'))
+        if (body.get('response_format') or {}).get('type') in ('json_schema', 'json_object'):
+            text = json.dumps(fake_structured_analysis(prompt))
+        else:
+            text = fake_analysis(prompt)
+        prompt_tokens = len(prompt) // 4 + 1
+        completion_tokens = len(text) // 4 + 1
+        return {
+            'id': f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'fake-model'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': text},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        }
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    """Route requests to the Anthropic or OpenAI style handlers."""
+
+    provider: FakeProvider = None
+    protocol_version = 'HTTP/1.1'
+
+    routes = [
+        ('GET', r'/stats', 'get_stats'),
+        ('POST', r'/v1/messages', 'create_message'),
+        ('POST', r'/v1/chat/completions', 'create_chat_completion'),
+        ('POST', r'/v1/messages/batches', 'create_message_batch'),
+        ('GET', r'/v1/messages/batches/(?P<batch_id>[^/]+)', 'get_message_batch'),
+        ('GET', r'/v1/messages/batches/(?P<batch_id>[^/]+)/results', 'get_message_batch_results'),
+        ('POST', r'/v1/files', 'create_file'),
+        ('GET', r'/v1/files/(?P<file_id>[^/]+)/content', 'get_file_content'),
+        ('POST', r'/v1/batches', 'create_openai_batch'),
+        ('GET', r'/v1/batches/(?P<batch_id>[^/]+)', 'get_openai_batch'),
+    ]
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+    def dispatch(self, method: str) -> None:
+        """Find the handler for the request path and call it."""
+        path = self.path.split('?', 1)[0]
+        for route_method, pattern, handler in self.routes:
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match:
+                try:
+                    getattr(self, handler)(**match.groupdict())
+                except KeyError as e:
+                    self.send_json(404, {'error': {'type': 'not_found_error', 'message': f"Unknown id {e}"}})
+                return
+        self.send_json(404, {'error': {'type': 'not_found_error', 'message': f"No route for {method} {path}"}})
+
+    def read_body(self) -> bytes:
+        """Read the request body."""
+        length = int(self.headers.get('Content-Length', 0))
+        return self.rfile.read(length) if length else b''
+
+    def read_json(self) -> Dict[str, Any]:
+        """Read and decode a JSON request body."""
+        return json.loads(self.read_body() or b'{}')
+
+    def send_body(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        """Send a complete response."""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        """Send a JSON response."""
+        self.send_body(status, json.dumps(payload).encode('utf-8'), 'application/json', headers)
+
+    def send_event_stream(self, events) -> None:
+        """Send server-sent events as a chunked response.
+
+        Args:
+            events: Iterable of (event name or None, payload, seconds to wait
+                before sending it); string payloads are sent as they are
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for name, payload, delay in events:
+            if delay:
+                time.sleep(delay)
+            data = payload if isinstance(payload, str) else json.dumps(payload)
+            event = (f"event: {name}\n" if name else "") + f"data: {data}\n\n"
+            body = event.encode('utf-8')
+            self.wfile.write(f"{len(body):x}\r\n".encode('ascii') + body + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def batch_finished(self, batch: Dict[str, Any]) -> bool:
+        """Check whether a batch's simulated processing time has passed."""
+        return time.time() - batch['created_at'] >= self.provider.batch_delay
+
+    def get_stats(self) -> None:
+        with self.provider.lock:
+            stats = dict(self.provider.stats)
+        self.send_json(200, stats)
+
+    def simulate_request(self, flavor: str) -> Optional[float]:
+        """Draw a request's outcome and latency, sending the error response if it fails.
+
+        Args:
+            flavor: 'anthropic' or 'openai', selecting the error body shape
+
+        Returns:
+            Seconds the successful answer should take, or None if an error
+            was sent
+        """
+        outcome = self.provider.draw_outcome()
+        latency = self.provider.draw_latency()
+        if outcome == 'ok':
+            return latency
+
+        # Errors come back faster than full answers
+        time.sleep(latency / 4)
+        if outcome == 'rate_limited':
+            status, error_type, message = 429, 'rate_limit_error', 'Simulated rate limit'
+            headers = {'retry-after': f"{self.provider.retry_after:g}"}
+        else:
+            status, error_type, message = 500, 'api_error', 'Simulated failure'
+            headers = {}
+        if flavor == 'anthropic':
+            payload = {'type': 'error', 'error': {'type': error_type, 'message': message}}
+        else:
+            payload = {'error': {'message': message, 'type': error_type, 'param': None, 'code': None}}
+        self.send_json(status, payload, headers)
+        return None
+
+    # Anthropic Messages
+
+    def create_message(self) -> None:
+        params = self.read_json()
+        latency = self.simulate_request('anthropic')
+        if latency is None:
+            return
+        message = self.provider.anthropic_message(params)
+        if not params.get('stream'):
+            time.sleep(latency)
+            self.send_json(200, message)
+            return
+
+        with self.provider.lock:
+            self.provider.stats['streamed'] += 1
+        text = message['content'][0].get('text', '')
+        deltas = [text[i:i + 16] for i in range(0, len(text), 16)]
+        # A fifth of the latency before the first token, the rest spread over the deltas
+        first_delay = latency / 5
+        delta_delay = (latency - first_delay) / max(1, len(deltas))
+        start = dict(message, content=[], stop_reason=None,
+                     usage=dict(message['usage'], output_tokens=1))
+        events = [
+            ('message_start', {'type': 'message_start', 'message': start}, first_delay),
+            ('content_block_start', {'type': 'content_block_start', 'index': 0,
+                                     'content_block': {'type': 'text', 'text': ''}}, 0)
+        ]
+        events += [
+            ('content_block_delta', {'type': 'content_block_delta', 'index': 0,
+                                     'delta': {'type': 'text_delta', 'text': delta}}, delta_delay)
+            for delta in deltas
+        ]
+        events += [
+            ('content_block_stop', {'type': 'content_block_stop', 'index': 0}, 0),
+            ('message_delta', {'type': 'message_delta',
+                               'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                               'usage': {'output_tokens': message['usage']['output_tokens']}}, 0),
+            ('message_stop', {'type': 'message_stop'}, 0)
+        ]
+        self.send_event_stream(events)
+
+    # OpenAI Chat Completions
+
+    def create_chat_completion(self) -> None:
+        body = self.read_json()
+        latency = self.simulate_request('openai')
+        if latency is None:
+            return
+        completion = self.provider.openai_completion(body)
+        if not body.get('stream'):
+            time.sleep(latency)
+            self.send_json(200, completion)
+            return
+
+        with self.provider.lock:
+            self.provider.stats['streamed'] += 1
+        text = completion['choices'][0]['message']['content']
+        deltas = [text[i:i + 16] for i in range(0, len(text), 16)]
+        first_delay = latency / 5
+        delta_delay = (latency - first_delay) / max(1, len(deltas))
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            return {
+                'id': completion['id'],
+                'object': 'chat.completion.chunk',
+                'created': completion['created'],
+                'model': completion['model'],
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+            }
+
+        events = [(None, chunk({'role': 'assistant', 'content': ''}), first_delay)]
+        events += [(None, chunk({'content': delta}), delta_delay) for delta in deltas]
+        events.append((None, chunk({}, 'stop'), 0))
+        if (body.get('stream_options') or {}).get('include_usage'):
+            events.append((None, dict(chunk({}), choices=[], usage=completion['usage']), 0))
+        events.append((None, '[DONE]', 0))
+        self.send_event_stream(events)
+
+    # Anthropic Message Batches
+
+    def create_message_batch(self) -> None:
+        body = self.read_json()
+        batch = {
+            'id': f"msgbatch_{uuid.uuid4().hex[:24]}",
+            'created_at': time.time(),
+            'requests': body.get('requests', []),
+            'results': None
+        }
+        with self.provider.lock:
+            self.provider.batches[batch['id']] = batch
+        self.send_json(200, self.message_batch_object(batch))
+
+    def get_message_batch(self, batch_id: str) -> None:
+        batch = self.provider.batches[batch_id]
+        self.send_json(200, self.message_batch_object(batch))
+
+    def get_message_batch_results(self, batch_id: str) -> None:
+        batch = self.provider.batches[batch_id]
+        if not self.batch_finished(batch):
+            self.send_json(400, {'error': {'type': 'invalid_request_error', 'message': 'Batch still processing'}})
+            return
+        lines = [json.dumps(entry) for entry in self.message_batch_results(batch)]
+        self.send_body(200, "\n".join(lines).encode('utf-8'), 'application/binary')
+
+    def message_batch_results(self, batch: Dict[str, Any]) -> list:
+        """Generate (once) and return a batch's per-request results."""
+        with self.provider.lock:
+            if batch['results'] is not None:
+                return batch['results']
+        results = []
+        for request in batch['requests']:
+            if self.provider.should_fail():
+                result = {'type': 'errored', 'error': {
+                    'type': 'error', 'error': {'type': 'api_error', 'message': 'Simulated failure'}
+                }}
+            else:
+                result = {'type': 'succeeded', 'message': self.provider.anthropic_message(request['params'])}
+            results.append({'custom_id': request['custom_id'], 'result': result})
+        with self.provider.lock:
+            batch['results'] = results
+        return results
+
+    def message_batch_object(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        """Describe a batch as a Message Batch object."""
+        finished = self.batch_finished(batch)
+        total = len(batch['requests'])
+        counts = {'processing': total, 'succeeded': 0, 'errored': 0, 'canceled': 0, 'expired': 0}
+        if finished:
+            results = self.message_batch_results(batch)
+            errored = sum(1 for entry in results if entry['result']['type'] == 'errored')
+            counts.update(processing=0, succeeded=total - errored, errored=errored)
+        return {
+            'id': batch['id'],
+            'type': 'message_batch',
+            'processing_status': 'ended' if finished else 'in_progress',
+            'request_counts': counts,
+            'created_at': iso_time(batch['created_at']),
+            'expires_at': iso_time(batch['created_at'] + 24 * 3600),
+            'ended_at': iso_time(batch['created_at'] + self.provider.batch_delay) if finished else None,
+            'cancel_initiated_at': None,
+            'archived_at': None,
+            'results_url': (f"http://{self.headers.get('Host')}/v1/messages/batches/{batch['id']}/results"
+                            if finished else None)
+        }
+
+    # OpenAI Files and Batch API
+
+    def create_file(self) -> None:
+        content_type = self.headers.get('Content-Type', '')
+        message = BytesParser(policy=policy.default).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + self.read_body()
+        )
+        fields, upload = {}, None
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if part.get_filename():
+                upload = (part.get_filename(), part.get_payload(decode=True))
+            else:
+                fields[name] = part.get_content().strip()
+        if upload is None:
+            self.send_json(400, {'error': {'message': 'Missing file', 'type': 'invalid_request_error'}})
+            return
+        self.send_json(200, self.provider.add_file(upload[1], upload[0], fields.get('purpose', 'batch')))
+
+    def get_file_content(self, file_id: str) -> None:
+        stored = self.provider.files[file_id]
+        self.send_body(200, stored['content'], 'application/octet-stream')
+
+    def create_openai_batch(self) -> None:
+        body = self.read_json()
+        input_file = self.provider.files[body['input_file_id']]
+        requests = [json.loads(line) for line in input_file['content'].decode('utf-8').splitlines() if line.strip()]
+        batch = {
+            'id': f"batch_{uuid.uuid4().hex[:24]}",
+            'created_at': time.time(),
+            'input_file_id': body['input_file_id'],
+            'endpoint': body.get('endpoint', '/v1/chat/completions'),
+            'requests': requests,
+            'output_file_id': None,
+            'error_file_id': None,
+            'failed': 0
+        }
+        with self.provider.lock:
+            self.provider.batches[batch['id']] = batch
+        self.send_json(200, self.openai_batch_object(batch))
+
+    def get_openai_batch(self, batch_id: str) -> None:
+        batch = self.provider.batches[batch_id]
+        if self.batch_finished(batch) and batch['output_file_id'] is None:
+            self.write_openai_batch_output(batch)
+        self.send_json(200, self.openai_batch_object(batch))
+
+    def write_openai_batch_output(self, batch: Dict[str, Any]) -> None:
+        """Generate the output and error files of a finished batch."""
+        output, errors = [], []
+        for request in batch['requests']:
+            entry = {'id': f"batch_req_{uuid.uuid4().hex[:24]}", 'custom_id': request['custom_id']}
+            if self.provider.should_fail():
+                entry.update(response=None, error={'code': 'server_error', 'message': 'Simulated failure'})
+                errors.append(entry)
+            else:
+                entry.update(response={
+                    'status_code': 200,
+                    'request_id': uuid.uuid4().hex,
+                    'body': self.provider.openai_completion(request['body'])
+                }, error=None)
+                output.append(entry)
+
+        def to_file(entries, name):
+            content = "\n".join(json.dumps(entry) for entry in entries).encode('utf-8')
+            return self.provider.add_file(content, name, 'batch_output')['id']
+
+        batch['output_file_id'] = to_file(output, f"{batch['id']}_output.jsonl")
+        batch['error_file_id'] = to_file(errors, f"{batch['id']}_errors.jsonl") if errors else None
+        batch['failed'] = len(errors)
+
+    def openai_batch_object(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        """Describe a batch as an OpenAI Batch object."""
+        finished = batch['output_file_id'] is not None
+        total = len(batch['requests'])
+        return {
+            'id': batch['id'],
+            'object': 'batch',
+            'endpoint': batch['endpoint'],
+            'input_file_id': batch['input_file_id'],
+            'completion_window': '24h',
+            'status': 'completed' if finished else 'in_progress',
+            'created_at': int(batch['created_at']),
+            'in_progress_at': int(batch['created_at']),
+            'completed_at': int(batch['created_at'] + self.provider.batch_delay) if finished else None,
+            'expires_at': int(batch['created_at'] + 24 * 3600),
+            'output_file_id': batch['output_file_id'],
+            'error_file_id': batch['error_file_id'],
+            'request_counts': {
+                'total': total,
+                'completed': total - batch['failed'] if finished else 0,
+                'failed': batch['failed']
+            }
+        }
+
+
+def make_server(host: str, port: int, provider: FakeProvider) -> Tuple[ThreadingHTTPServer, str]:
+    """Create (but do not start) a fake provider server.
+
+    Returns:
+        The server and its base URL
+    """
+    handler = type('BoundFakeProviderHandler', (FakeProviderHandler,), {'provider': provider})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--batch-delay', type=float, default=2.0, help='Seconds until a batch completes')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    parser.add_argument('--latency', type=float, default=0.0, help='Median seconds per message/completion')
+    parser.add_argument('--latency-sigma', type=float, default=0.0, help='Spread of the log-normal latency')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Seconds in the retry-after header of a 429')
+    parser.add_argument('--seed', type=int, help='Seed for reproducible error and latency draws')
+    args = parser.parse_args()
+
+    provider = FakeProvider(
+        args.batch_delay, args.error_rate, args.seed,
+        latency=args.latency, latency_sigma=args.latency_sigma,
+        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after
+    )
+    server, base_url = make_server(args.host, args.port, provider)
+    print(f"Fake provider listening on {base_url} (OpenAI base URL {base_url}/v1)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Load test /api/analyze end to end against the local fake provider.
+
+Starts the fake provider and the Flask app in this process (or targets an
+app already running at --app-url whose provider base URL points at a fake
+provider), logs in N concurrent sessions and has each one upload a sample
+of a synthetic DOCX resume corpus, submit an analysis job and poll it to
+completion (or, with --events, follow their result event streams).
+Reports throughput, job latency and time-to-first-result percentiles and
+how the provider calls ended:
+
+    python benchmarks/load_test.py --sessions 8 --requests 3 --resumes 10 \
+        --latency 1.5 --latency-sigma 0.5 --rate-limit-rate 0.05
+
+Pass --chunk-bytes to send files at least that large through the resumable
+chunked upload endpoints, as the page does for large files.
+
+Pass --direct to drive the desktop app's loop instead of the web app: each
+session streams its resumes one at a time through AIAnalyzer, as
+resume_screener.py does.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_condensation import synthetic_resume
+from fake_provider import FakeProvider, make_server
+from hedged_analyzer import percentile
+
+
+CRITERIA = {
+    'job_title': 'Senior Data Analyst',
+    'skills': 'SQL, Python, Tableau, PostgreSQL, Spark',
+    'experience': '5+ years in analytics',
+    'education': "Bachelor's in statistics, economics or computer science",
+    'additional_notes': ''
+}
+
+
+def docx_bytes(text: str) -> bytes:
+    """Render resume text as a DOCX file."""
+    from docx import Document
+    document = Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_corpus(size: int, seed: int):
+    """Return (filename, DOCX bytes, text) for synthetic resumes."""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(size):
+        text = synthetic_resume(rng, index)[0]
+        corpus.append((f"candidate_{index:04d}.docx", docx_bytes(text), text))
+    return corpus
+
+
+def start_app(provider_url: str) -> str:
+    """Serve the Flask app in a background thread, talking to the fake provider."""
+    os.environ['ANTHROPIC_BASE_URL'] = provider_url
+    os.environ['OPENAI_BASE_URL'] = provider_url + '/v1'
+    # Every request should reach the provider, and limits stay per process
+    os.environ['ANALYSIS_CACHE_PATH'] = ''
+    os.environ['RATE_LIMIT_STATE_PATH'] = ''
+    scratch = tempfile.mkdtemp()
+    os.environ.setdefault('JOB_STORE_PATH', os.path.join(scratch, 'jobs.sqlite3'))
+    os.environ.setdefault('UPLOAD_STAGING_DIR', os.path.join(scratch, 'staging'))
+    os.environ.setdefault('UPLOAD_PARTIAL_DIR', os.path.join(scratch, 'partial'))
+    os.environ.setdefault('REQUISITION_STORE_PATH', os.path.join(scratch, 'requisitions.sqlite3'))
+    os.environ.setdefault('SEARCH_INDEX_DIR', os.path.join(scratch, 'search_index'))
+
+    from werkzeug.serving import make_server as make_app_server
+    import app as web_app
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_app_server('127.0.0.1', 0, web_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def request_json(opener, url: str, payload, timeout: float):
+    """POST JSON (or GET when payload is None) and return (status, decoded body)."""
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with opener.open(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b'{}')
+    except urllib.error.HTTPError as e:
+        try:
+            return e.code, json.loads(e.read() or b'{}')
+        except ValueError:
+            return e.code, {}
+
+
+def stage_files(opener, app_url: str, files, timeout: float, chunk_bytes: int = 0):
+    """Stage (filename, bytes) pairs the way the page does, skipping files the server holds.
+
+    Files of at least chunk_bytes (when non-zero) go through the chunked
+    upload endpoints, the rest in one multipart request.
+
+    Returns:
+        The analysis request's file entries and the bytes actually uploaded
+    """
+    hashes = [hashlib.sha256(content).hexdigest() for _, content in files]
+    _, body = request_json(opener, app_url + '/api/upload/check', {'hashes': hashes}, timeout)
+    known = set(body.get('known', []))
+    missing = [(name, content) for (name, content), digest in zip(files, hashes) if digest not in known]
+    large = [(name, content) for name, content in missing if chunk_bytes and len(content) >= chunk_bytes]
+    small = [(name, content) for name, content in missing if not (chunk_bytes and len(content) >= chunk_bytes)]
+    uploaded = {}
+    for name, content in large:
+        uploaded[name] = upload_chunked(opener, app_url, name, content, timeout)['id']
+    if small:
+        for (name, content), staged in zip(small, upload(opener, app_url, small, timeout)):
+            uploaded[name] = staged['id']
+    entries = [
+        {'file_id': uploaded.get(name, digest), 'original_name': name}
+        for (name, _), digest in zip(files, hashes)
+    ]
+    return entries, sum(len(content) for _, content in missing)
+
+
+def upload(opener, app_url: str, files, timeout: float):
+    """Upload (filename, bytes) pairs as one multipart request; return the staged files."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for filename, content in files:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="files"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8') + content + b'\r\n'
+        )
+    body = b''.join(parts) + f'--{boundary}--\r\n'.encode('utf-8')
+    request = urllib.request.Request(
+        app_url + '/api/upload', data=body,
+        headers={'Content-Type': f'multipart/form-data; boundary={boundary}'}
+    )
+    with opener.open(request, timeout=timeout) as response:
+        return json.loads(response.read())['files']
+
+
+def upload_chunked(opener, app_url: str, name: str, content: bytes, timeout: float, parallel: int = 4):
+    """Upload one file through the chunked endpoints, several chunks at a time; return the staged file."""
+    status, upload_info = request_json(
+        opener, app_url + '/api/uploads',
+        {'filename': name, 'size': len(content), 'sha256': hashlib.sha256(content).hexdigest()}, timeout
+    )
+    if status != 200:
+        raise RuntimeError(f"Chunked upload of {name} failed: {upload_info.get('error', status)}")
+    if 'file' in upload_info:
+        return upload_info['file']
+
+    upload_url = f"{app_url}/api/uploads/{upload_info['upload_id']}"
+    chunk_size = upload_info['chunk_size']
+
+    def put_chunk(offset: int) -> None:
+        chunk = content[offset:offset + chunk_size]
+        request = urllib.request.Request(
+            f"{upload_url}/chunks/{offset}", data=chunk, method='PUT',
+            headers={
+                'Content-Type': 'application/octet-stream',
+                'X-Chunk-SHA256': hashlib.sha256(chunk).hexdigest()
+            }
+        )
+        with opener.open(request, timeout=timeout) as response:
+            response.read()
+
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        list(pool.map(put_chunk, range(0, len(content), chunk_size)))
+
+    status, body = request_json(opener, upload_url + '/complete', {}, timeout)
+    if status != 200:
+        raise RuntimeError(f"Chunked upload of {name} failed: {body.get('error', status)}")
+    return body['file']
+
+
+def follow_events(opener, url: str, timeout: float, on_result):
+    """Read a job's event stream until its "done" event and return that payload.
+
+    The server closes long streams; like a browser, reconnect until done.
+    """
+    while True:
+        with opener.open(urllib.request.Request(url), timeout=timeout) as response:
+            event = None
+            for raw_line in response:
+                line = raw_line.decode('utf-8').rstrip('\r\n')
+                if line.startswith('event: '):
+                    event = line[len('event: '):]
+                elif line.startswith('data: '):
+                    if event == 'result':
+                        on_result()
+                    elif event == 'done':
+                        return json.loads(line[len('data: '):])
+
+
+def run_session(session: int, args, app_url: str, corpus):
+    """Log in one session and submit its analysis requests; return one record per request."""
+    rng = random.Random(args.seed * 1000 + session)
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+    status, body = request_json(opener, app_url + '/login', {'password': args.password}, args.timeout)
+    if status != 200:
+        raise RuntimeError(f"Login failed for session {session}: {body.get('error', status)}")
+
+    records = []
+    for _ in range(args.requests):
+        sample = rng.sample(corpus, min(args.resumes, len(corpus)))
+        start = time.perf_counter()
+        first_result = []
+
+        def saw_result():
+            if not first_result:
+                first_result.append(time.perf_counter() - start)
+
+        try:
+            entries, uploaded_bytes = stage_files(
+                opener, app_url, [(name, content) for name, content, _ in sample], args.timeout,
+                args.chunk_bytes
+            )
+            payload = {
+                'api_key': 'fake-key',
+                'provider': args.provider,
+                'mode': 'criteria',
+                'files': entries,
+                'concurrency': args.concurrency,
+                **CRITERIA
+            }
+            status, body = request_json(opener, app_url + '/api/analyze', payload, args.timeout)
+            job_url = f"{app_url}/api/jobs/{body.get('job_id')}"
+            if status == 202 and args.events:
+                body = follow_events(opener, job_url + '/events', args.timeout, saw_result)
+                status = 200
+            while status == 202 or body.get('status') in ('queued', 'running'):
+                time.sleep(args.poll_interval)
+                status, body = request_json(opener, job_url, None, args.timeout)
+                if body.get('completed'):
+                    saw_result()
+            if body.get('status') == 'failed':
+                status = None
+        except OSError as e:
+            status, body = None, {'error': str(e)}
+        records.append({
+            'seconds': time.perf_counter() - start,
+            'first_result': first_result[0] if first_result else None,
+            'bytes': sum(len(content) for _, content, _ in sample),
+            'uploaded_bytes': uploaded_bytes,
+            'status': status,
+            'analyzed': body.get('analyzed', 0),
+            'failed': body.get('errors', 0) if status == 200 else len(sample)
+        })
+    return records
+
+
+def run_direct_session(session: int, args, provider_url: str, corpus):
+    """Stream resumes one at a time through AIAnalyzer, like the desktop app."""
+    from ai_analyzer import AIAnalyzer
+
+    rng = random.Random(args.seed * 1000 + session)
+    base_url = provider_url + '/v1' if args.provider == 'openai' else provider_url
+    analyzer = AIAnalyzer('fake-key', args.provider, base_url=base_url)
+    records = []
+    for _ in range(args.requests):
+        sample = rng.sample(corpus, min(args.resumes, len(corpus)))
+        start = time.perf_counter()
+        results = []
+        for _, _, text in sample:
+            for event in analyzer.analyze_resume_stream(text, CRITERIA):
+                if event['type'] == 'result':
+                    results.append(event['result'])
+        failed = sum('error' in result for result in results)
+        records.append({
+            'seconds': time.perf_counter() - start,
+            'status': 200,
+            'analyzed': len(results) - failed,
+            'failed': failed
+        })
+    return records
+
+
+def report(args, records, wall_time: float, provider_stats):
+    """Print throughput, latency percentiles and outcome counts."""
+    latencies = [record['seconds'] for record in records]
+    analyzed = sum(record['analyzed'] for record in records)
+    failed = sum(record['failed'] for record in records)
+    http_errors = sum(record['status'] != 200 for record in records)
+
+    target = "desktop loop" if args.direct else "/api/analyze"
+    print(f"{target}: {args.sessions} sessions x {args.requests} requests x {args.resumes} resumes, "
+          f"provider {args.provider}, median latency {args.latency:g} s")
+    print(f"  wall time         {wall_time:8.2f} s")
+    print(f"  throughput        {len(records) / wall_time:8.2f} requests/s"
+          f"   {analyzed / wall_time:8.2f} resumes/s")
+    print(f"  job latency       p50 {percentile(latencies, 0.50):6.2f} s"
+          f"   p95 {percentile(latencies, 0.95):6.2f} s"
+          f"   p99 {percentile(latencies, 0.99):6.2f} s"
+          f"   max {max(latencies):6.2f} s")
+    first = [record['first_result'] for record in records if record.get('first_result') is not None]
+    if first:
+        print(f"  first result      p50 {percentile(first, 0.50):6.2f} s"
+              f"   p95 {percentile(first, 0.95):6.2f} s"
+              f"   ({'event stream' if args.events else 'polling'})")
+    total_bytes = sum(record.get('bytes', 0) for record in records)
+    if total_bytes:
+        uploaded_bytes = sum(record.get('uploaded_bytes', 0) for record in records)
+        print(f"  uploads           {uploaded_bytes / 1e6:.1f} of {total_bytes / 1e6:.1f} MB sent"
+              f" (the rest already staged)")
+    print(f"  resumes           {analyzed} analyzed, {failed} failed, {http_errors} failed requests")
+    if provider_stats:
+        print(f"  fake provider     {provider_stats['requests']} calls, "
+              f"{provider_stats['rate_limited']} rate limited, {provider_stats['errors']} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=4, help='concurrent logged-in sessions')
+    parser.add_argument('--requests', type=int, default=3, help='analysis requests per session')
+    parser.add_argument('--resumes', type=int, default=10, help='resumes per request')
+    parser.add_argument('--corpus-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=5, help='analysis concurrency per request')
+    parser.add_argument('--provider', default='anthropic', choices=['anthropic', 'openai'])
+    parser.add_argument('--latency', type=float, default=1.0, help='median seconds per provider call')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='spread of the log-normal latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of provider calls that fail')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='fraction of provider calls answered with 429')
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--app-url', help='target a running app instead of starting one')
+    parser.add_argument('--password', default=os.environ.get('APP_PASSWORD', 'admin123'))
+    parser.add_argument('--direct', action='store_true', help='drive the desktop analysis loop instead of the web app')
+    parser.add_argument('--events', action='store_true', help='follow job event streams instead of polling')
+    parser.add_argument('--chunk-bytes', type=int, default=0,
+                        help='upload files at least this large in resumable chunks (0 never does)')
+    parser.add_argument('--poll-interval', type=float, default=0.25, help='seconds between job status polls')
+    parser.add_argument('--timeout', type=float, default=600.0)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    provider = FakeProvider(
+        error_rate=args.error_rate, seed=args.seed, latency=args.latency,
+        latency_sigma=args.latency_sigma, rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after
+    )
+    provider_server, provider_url = make_server('127.0.0.1', 0, provider)
+    threading.Thread(target=provider_server.serve_forever, daemon=True).start()
+
+    print(f"Building {args.corpus_size} synthetic resumes...")
+    corpus = build_corpus(args.corpus_size, args.seed)
+
+    if args.direct:
+        session_target, target_url = run_direct_session, provider_url
+    else:
+        session_target, target_url = run_session, args.app_url or start_app(provider_url)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        futures = [
+            executor.submit(session_target, session, args, target_url, corpus)
+            for session in range(args.sessions)
+        ]
+        records = [record for future in futures for record in future.result()]
+    wall_time = time.perf_counter() - start
+
+    # A separately started app may use another provider; only report ours if it was used
+    provider_stats = dict(provider.stats) if provider.stats['requests'] else None
+    report(args, records, wall_time, provider_stats)
+    provider_server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Offline bulk screening through the providers' asynchronous batch APIs.
+
+Batch requests are billed at a discount and finish within 24 hours, which
+suits overnight screening of high-volume roles. Submitted jobs and their
+provider batch IDs are kept in a local SQLite store, so results can be
+collected from a later process:
+
+    python bulk_screening.py submit --job-description jd.txt resumes/*.pdf
+    python bulk_screening.py status <job_id>
+    python bulk_screening.py results <job_id> --wait --output ranked.json
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ai_analyzer import AIAnalyzer, TEXT_MAX_TOKENS, rank_results
+
+
+# Provider statuses after which a batch will not change any more
+FINISHED_STATUSES = {
+    "anthropic": {"ended"},
+    "openai": {"completed", "failed", "expired", "cancelled"}
+}
+
+
+class BulkJobStore:
+    """SQLite store of submitted bulk screening jobs."""
+
+    def __init__(self, path: str):
+        """Initialize the store, creating the database if needed.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bulk_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    batch_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    criteria TEXT NOT NULL,
+                    filenames TEXT NOT NULL,
+                    request_counts TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def save(self, job: Dict[str, Any]) -> None:
+        """Insert or replace a job record."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO bulk_jobs (job_id, provider, model, batch_id, status, "
+                "criteria, filenames, request_counts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job['job_id'], job['provider'], job['model'], job['batch_id'],
+                    job['status'], json.dumps(job['criteria']), json.dumps(job['filenames']),
+                    json.dumps(job.get('request_counts')), job['created_at'], time.time()
+                )
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job record, or None if it does not exist."""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM bulk_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        for field in ('criteria', 'filenames', 'request_counts'):
+            job[field] = json.loads(job[field]) if job[field] else None
+        return job
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction and close it afterwards."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+class BulkScreener:
+    """Submit resumes to a provider batch API and collect ranked results."""
+
+    def __init__(self, analyzer: AIAnalyzer, store: BulkJobStore):
+        """Initialize the screener.
+
+        Args:
+            analyzer: Analyzer whose client, model and prompts are used
+            store: Where job records and batch IDs are persisted
+        """
+        self.analyzer = analyzer
+        self.store = store
+
+    def submit(self, resumes: List[Tuple[str, str]], criteria: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit one batch request per resume.
+
+        Args:
+            resumes: (filename, resume_text) pairs
+            criteria: Dictionary containing screening criteria including job description
+
+        Returns:
+            The stored job record
+        """
+        if not resumes:
+            raise ValueError("No resumes to submit")
+
+        requests = [
+            (f"resume-{index}", self._request_params(resume_text, criteria))
+            for index, (_, resume_text) in enumerate(resumes)
+        ]
+
+        if self.analyzer.provider == "anthropic":
+            batch = self.analyzer.client.beta.messages.batches.create(requests=[
+                {"custom_id": custom_id, "params": params} for custom_id, params in requests
+            ])
+            status = batch.processing_status
+            request_counts = batch.request_counts.to_dict()
+        else:
+            lines = [
+                json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": params
+                })
+                for custom_id, params in requests
+            ]
+            input_file = self.analyzer.client.files.create(
+                file=("resume_screening.jsonl", "\n".join(lines).encode('utf-8')),
+                purpose="batch"
+            )
+            batch = self.analyzer.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            status = batch.status
+            request_counts = batch.request_counts.to_dict() if batch.request_counts else None
+
+        job = {
+            'job_id': str(uuid.uuid4()),
+            'provider': self.analyzer.provider,
+            'model': self.analyzer.model,
+            'batch_id': batch.id,
+            'status': status,
+            'criteria': criteria,
+            'filenames': [filename for filename, _ in resumes],
+            'request_counts': request_counts,
+            'created_at': time.time()
+        }
+        self.store.save(job)
+        return job
+
+    def refresh(self, job_id: str) -> Dict[str, Any]:
+        """Poll the provider for a job's batch status and store it."""
+        job = self._get_job(job_id)
+
+        if job['provider'] == "anthropic":
+            batch = self.analyzer.client.beta.messages.batches.retrieve(job['batch_id'])
+            job['status'] = batch.processing_status
+            job['request_counts'] = batch.request_counts.to_dict()
+        else:
+            batch = self.analyzer.client.batches.retrieve(job['batch_id'])
+            job['status'] = batch.status
+            job['request_counts'] = batch.request_counts.to_dict() if batch.request_counts else None
+
+        self.store.save(job)
+        return job
+
+    def is_finished(self, job: Dict[str, Any]) -> bool:
+        """Check whether a job's batch has stopped processing."""
+        return job['status'] in FINISHED_STATUSES[job['provider']]
+
+    def wait(
+        self,
+        job_id: str,
+        poll_interval: float = 60,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Poll until the job's batch finishes.
+
+        Args:
+            job_id: The job to wait for
+            poll_interval: Seconds between status checks
+            timeout: Give up after this many seconds, or None to wait indefinitely
+
+        Returns:
+            The finished job record
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        while True:
+            job = self.refresh(job_id)
+            if self.is_finished(job):
+                return job
+            if deadline is not None and time.time() >= deadline:
+                raise TimeoutError(f"Bulk job {job_id} still {job['status']} after {timeout} seconds")
+            time.sleep(poll_interval)
+
+    def results(self, job_id: str) -> List[Dict[str, Any]]:
+        """Fetch, parse and rank the results of a finished job.
+
+        Returns:
+            Analysis results ranked by overall score, with a row carrying an
+            'error' key for every resume that did not succeed
+        """
+        job = self.refresh(job_id)
+        if not self.is_finished(job):
+            raise RuntimeError(f"Bulk job {job_id} is still {job['status']}")
+
+        if job['provider'] == "anthropic":
+            responses = self._anthropic_responses(job)
+        else:
+            responses = self._openai_responses(job)
+
+        results = []
+        for index, filename in enumerate(job['filenames']):
+            response_text, error = responses.get(f"resume-{index}", (None, "No result returned"))
+            if error:
+                result = {'error': error, 'overall_score': 0, 'analysis': "Failed to analyze resume"}
+            else:
+                result = self.analyzer._parse_analysis_response(response_text)
+            result['filename'] = filename
+            results.append(result)
+
+        return rank_results(results)
+
+    def _request_params(self, resume_text: str, criteria: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the per-resume request body sent inside a batch."""
+        prompt = self.analyzer._build_analysis_prompt(resume_text, criteria, "text")
+        return self.analyzer._completion_params(prompt, TEXT_MAX_TOKENS)
+
+    def _get_job(self, job_id: str) -> Dict[str, Any]:
+        """Load a job record, raising if it is unknown."""
+        job = self.store.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown bulk job: {job_id}")
+        return job
+
+    def _anthropic_responses(self, job: Dict[str, Any]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """Map custom_id to (response_text, error) for a finished Anthropic batch."""
+        responses = {}
+        for entry in self.analyzer.client.beta.messages.batches.results(job['batch_id']):
+            if entry.result.type == "succeeded":
+                responses[entry.custom_id] = (entry.result.message.content[0].text, None)
+            else:
+                # Errored entries wrap the API error body; others are canceled/expired
+                error = getattr(getattr(entry.result, 'error', None), 'error', None)
+                message = getattr(error, 'message', None) or entry.result.type
+                responses[entry.custom_id] = (None, message)
+        return responses
+
+    def _openai_responses(self, job: Dict[str, Any]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """Map custom_id to (response_text, error) for a finished OpenAI batch."""
+        batch = self.analyzer.client.batches.retrieve(job['batch_id'])
+        responses = {}
+
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = self.analyzer.client.files.content(file_id).text
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get('response') or {}
+                if entry.get('error') or response.get('status_code') != 200:
+                    error = entry.get('error') or (response.get('body') or {}).get('error') or {}
+                    responses[entry['custom_id']] = (None, error.get('message') or "Request failed")
+                else:
+                    text = response['body']['choices'][0]['message']['content']
+                    responses[entry['custom_id']] = (text, None)
+
+        return responses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline bulk resume screening via provider batch APIs")
+    parser.add_argument('--store', default=os.environ.get('BULK_JOBS_PATH', os.path.join('cache', 'bulk_jobs.sqlite3')),
+                        help='SQLite file holding submitted jobs')
+    parser.add_argument('--api-key', help='Provider API key (defaults to ANTHROPIC_API_KEY / OPENAI_API_KEY)')
+    parser.add_argument('--base-url', help='Alternative API endpoint, e.g. a local stand-in server')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    submit = commands.add_parser('submit', help='Parse resumes and submit a batch')
+    submit.add_argument('files', nargs='+', help='Resume files (PDF/DOCX)')
+    submit.add_argument('--provider', default='anthropic', choices=['anthropic', 'openai'])
+    submit.add_argument('--model', help='Model name (defaults to the provider default)')
+    submit.add_argument('--job-description', help='File containing the job description')
+    submit.add_argument('--job-title', help='Job title for criteria-based screening')
+    submit.add_argument('--skills', default='')
+    submit.add_argument('--experience', default='')
+    submit.add_argument('--education', default='')
+    submit.add_argument('--additional-notes', default='')
+
+    status = commands.add_parser('status', help='Show the status of a job')
+    status.add_argument('job_id')
+
+    results = commands.add_parser('results', help='Fetch ranked results of a finished job')
+    results.add_argument('job_id')
+    results.add_argument('--wait', action='store_true', help='Poll until the batch finishes')
+    results.add_argument('--poll-interval', type=float, default=60)
+    results.add_argument('--output', help='Write the ranked results to this JSON file')
+
+    args = parser.parse_args()
+    store = BulkJobStore(args.store)
+
+    if args.command == 'submit':
+        if args.job_description:
+            with open(args.job_description, 'r', encoding='utf-8') as f:
+                criteria = {'job_description': f.read().strip()}
+        elif args.job_title:
+            criteria = {
+                'job_title': args.job_title,
+                'skills': args.skills,
+                'experience': args.experience,
+                'education': args.education,
+                'additional_notes': args.additional_notes
+            }
+        else:
+            parser.error('submit needs --job-description or --job-title')
+        provider, model = args.provider, args.model
+    else:
+        job = store.get(args.job_id)
+        if job is None:
+            parser.error(f"unknown job {args.job_id}")
+        provider, model = job['provider'], job['model']
+
+    analyzer = AIAnalyzer(args.api_key, provider, model=model, base_url=args.base_url)
+    screener = BulkScreener(analyzer, store)
+
+    if args.command == 'submit':
+        from resume_parser import ResumeParser
+
+        resumes = [None] * len(args.files)
+        for outcome in ResumeParser.parse_many((os.path.basename(path), path) for path in args.files):
+            if outcome['error']:
+                print(f"Skipping {outcome['filename']}: {outcome['error']}", file=sys.stderr)
+            else:
+                resumes[outcome['index']] = (outcome['filename'], outcome['text'])
+        resumes = [resume for resume in resumes if resume is not None]
+
+        job = screener.submit(resumes, criteria)
+        print(f"Submitted {len(resumes)} resume(s) as job {job['job_id']} (batch {job['batch_id']})")
+
+    elif args.command == 'status':
+        job = screener.refresh(args.job_id)
+        print(f"{job['job_id']}: {job['status']} {json.dumps(job['request_counts'])}")
+
+    elif args.command == 'results':
+        if args.wait:
+            screener.wait(args.job_id, poll_interval=args.poll_interval)
+        ranked = screener.results(args.job_id)
+
+        for rank, result in enumerate(ranked, 1):
+            if 'error' in result:
+                print(f"  -  {result['filename']}: {result['error']}")
+            else:
+                print(f"{rank:3}. {result['filename']}: {result['overall_score']}% "
+                      f"({result.get('interview_recommendation', 'N/A')})")
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(ranked, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from ai_analyzer import AIAnalyzer, DEFAULT_CONCURRENCY, ResultCallback
+
+
+# Fast-tier overall scores inside this band are re-analyzed by the strong model
+DEFAULT_ESCALATION_BAND = (45, 75)
+
+TIERS = ("fast", "strong")
+
+
+class CascadeAnalyzer:
+    """Screen with a small fast model and escalate only uncertain candidates.
+
+    Every resume is analyzed by the fast analyzer first. Results that failed,
+    whose overall score falls inside the escalation band, or (optionally)
+    whose recommendation is "Maybe" are analyzed again by the strong
+    analyzer, whose result replaces the fast one. Clear passes and clear
+    rejections keep the fast result.
+
+    Each result gets a "tier" entry naming the model tier that produced it.
+    """
+
+    def __init__(
+        self,
+        fast: AIAnalyzer,
+        strong: AIAnalyzer,
+        band: tuple = DEFAULT_ESCALATION_BAND,
+        escalate_maybe: bool = True
+    ):
+        """Initialize the cascade.
+
+        Args:
+            fast: Analyzer for the small first-tier model
+            strong: Analyzer for the large model
+            band: (low, high) overall scores, inclusive, treated as uncertain
+            escalate_maybe: Also escalate results recommending "Maybe"
+        """
+        self.fast = fast
+        self.strong = strong
+        self.band = band
+        self.escalate_maybe = escalate_maybe
+
+    def analyze_resumes(
+        self,
+        resume_texts: List[str],
+        criteria: Dict[str, Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        refresh: bool = False,
+        on_result: Optional[ResultCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """Analyze resumes through the cascade.
+
+        Blocking wrapper around analyze_resumes_async.
+
+        Args:
+            resume_texts: The text content of each resume
+            criteria: Dictionary containing screening criteria including job description
+            concurrency: Maximum number of provider requests in flight per tier
+            refresh: Skip cached results and re-analyze every resume
+            on_result: Called with (index, final result) as each resume
+                finishes; escalated resumes are reported once the strong
+                model answers
+
+        Returns:
+            List of analysis results in the same order as resume_texts
+        """
+        return asyncio.run(
+            self.analyze_resumes_async(resume_texts, criteria, concurrency, refresh, on_result)
+        )
+
+    async def analyze_resumes_async(
+        self,
+        resume_texts: List[str],
+        criteria: Dict[str, Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        refresh: bool = False,
+        on_result: Optional[ResultCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """Async version of analyze_resumes."""
+        def fast_done(index: int, result: Dict[str, Any]) -> None:
+            result['tier'] = 'fast'
+            if on_result and not self.needs_escalation(result):
+                on_result(index, result)
+
+        results = await self.fast.analyze_resumes_async(
+            resume_texts, criteria, concurrency, refresh, fast_done
+        )
+
+        escalate = [index for index, result in enumerate(results) if self.needs_escalation(result)]
+        if not escalate:
+            return results
+
+        def strong_done(position: int, strong_result: Dict[str, Any]) -> None:
+            index = escalate[position]
+            results[index] = self._merge(results[index], strong_result)
+            if on_result:
+                on_result(index, results[index])
+
+        await self.strong.analyze_resumes_async(
+            [resume_texts[index] for index in escalate], criteria, concurrency, refresh, strong_done
+        )
+        return results
+
+    def needs_escalation(self, result: Dict[str, Any]) -> bool:
+        """Check whether a fast-tier result is too uncertain to keep."""
+        if 'error' in result:
+            return True
+        low, high = self.band
+        if low <= result.get('overall_score', 0) <= high:
+            return True
+        recommendation = str(result.get('interview_recommendation') or result.get('recommendation') or '')
+        return self.escalate_maybe and recommendation.strip().lower().startswith('maybe')
+
+    def _merge(self, fast_result: Dict[str, Any], strong_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the result to keep for an escalated resume."""
+        if 'error' in strong_result and 'error' not in fast_result:
+            # Keep the fast answer rather than nothing
+            fast_result['escalation_error'] = strong_result['error']
+            return fast_result
+        strong_result['tier'] = 'strong'
+        strong_result['fast_score'] = fast_result.get('overall_score', 0)
+        usage = self._combined_usage(fast_result.get('usage'), strong_result.get('usage'))
+        if usage:
+            strong_result['usage'] = usage
+        return strong_result
+
+    @staticmethod
+    def tier_counts(results: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Count results per tier, and how many were escalated."""
+        counts = {tier: 0 for tier in TIERS}
+        counts['escalated'] = 0
+        for result in results:
+            tier = result.get('tier')
+            if tier in counts:
+                counts[tier] += 1
+            if tier == 'strong' or 'escalation_error' in result:
+                counts['escalated'] += 1
+        return counts
+
+    @staticmethod
+    def _combined_usage(
+        first: Optional[Dict[str, int]],
+        second: Optional[Dict[str, int]]
+    ) -> Optional[Dict[str, int]]:
+        """Add up the token usage of both tiers for one resume."""
+        if not first or not second:
+            return first or second
+        return {key: first.get(key, 0) + second.get(key, 0) for key in set(first) | set(second)}
@@ -0,0 +1,212 @@
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+
+# Default resume budget; below the old 4000 character cut (~1000 tokens)
+# since cleanup and section budgeting keep the useful parts
+DEFAULT_RESUME_TOKENS = 800
+
+# Share of the budget each kind of section may use before leftovers are
+# handed out; kinds not listed only get leftovers
+SECTION_WEIGHTS = {
+    "header": 0.06,
+    "summary": 0.08,
+    "experience": 0.42,
+    "skills": 0.14,
+    "education": 0.10,
+    "certifications": 0.06,
+    "projects": 0.08,
+    "other": 0.06
+}
+
+# Order in which sections receive budget left over after the first pass
+SECTION_PRIORITY = [
+    "experience", "skills", "education", "summary", "projects",
+    "certifications", "header", "other", "personal"
+]
+
+SECTION_HEADINGS = {
+    "summary": {
+        "summary", "profile", "objective", "about", "about me", "professional summary",
+        "career summary", "career objective", "professional profile", "personal statement"
+    },
+    "experience": {
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history", "relevant experience",
+        "professional background"
+    },
+    "skills": {
+        "skills", "technical skills", "key skills", "core skills", "core competencies",
+        "competencies", "expertise", "areas of expertise", "technologies", "tools",
+        "skills and abilities"
+    },
+    "education": {
+        "education", "academic background", "academic qualifications", "qualifications",
+        "education and training", "academics"
+    },
+    "certifications": {
+        "certifications", "certificates", "licenses", "licenses and certifications",
+        "courses", "training"
+    },
+    "projects": {"projects", "key projects", "selected projects", "personal projects"},
+    "other": {"awards", "achievements", "publications", "languages", "volunteer", "volunteering"},
+    "personal": {
+        "interests", "hobbies", "hobbies and interests", "references", "personal details",
+        "personal information"
+    }
+}
+HEADING_KINDS = {heading: kind for kind, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# Page numbers left by PDF extraction; they also mark page breaks
+PAGE_NUMBER_PATTERN = re.compile(r'^(page\s*)?\d+\s*((of|/)\s*\d+)?$', re.IGNORECASE)
+
+# Lines that carry no information for screening
+BOILERPLATE_PATTERNS = [
+    PAGE_NUMBER_PATTERN,
+    re.compile(r'^(curriculum vitae|resume|r[ée]sum[ée]|cv)$', re.IGNORECASE),
+    re.compile(r'^references (are )?available (up)?on request\.?$', re.IGNORECASE),
+    re.compile(r'^[\W_]+$')
+]
+
+TRUNCATION_MARK = "[...]"
+
+# A repeated line is taken for a page header or footer, and its later
+# copies dropped, only when it is this short and either sits within
+# PAGE_EDGE_LINES of a page number or occurs HEADER_REPEATS times or more;
+# other repeats (a bullet or skill shared by two roles) are evidence
+MAX_HEADER_CHARS = 80
+PAGE_EDGE_LINES = 2
+HEADER_REPEATS = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of text (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def clean_lines(text: str) -> List[str]:
+    """Normalize whitespace and drop boilerplate and page headers and footers.
+
+    Headers and footers from PDF extraction are short lines repeated at
+    page breaks; only their first occurrence is kept. Content that merely
+    repeats is kept in full (see MAX_HEADER_CHARS).
+    """
+    normalized = [re.sub(r'\s+', ' ', raw_line).strip() for raw_line in text.splitlines()]
+    normalized = [line for line in normalized if line]
+    page_breaks = [i for i, line in enumerate(normalized) if PAGE_NUMBER_PATTERN.match(line)]
+    counts = Counter(line.lower() for line in normalized)
+
+    def page_header(i: int, line: str) -> bool:
+        if len(line) > MAX_HEADER_CHARS or line.endswith(':'):
+            return False
+        return (
+            counts[line.lower()] >= HEADER_REPEATS
+            or any(abs(i - page_break) <= PAGE_EDGE_LINES for page_break in page_breaks)
+        )
+
+    lines = []
+    seen = set()
+    for i, line in enumerate(normalized):
+        if any(pattern.match(line) for pattern in BOILERPLATE_PATTERNS):
+            continue
+        key = line.lower()
+        if key in seen and page_header(i, line):
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def heading_kind(line: str) -> Optional[str]:
+    """Return the section kind a heading line starts, or None for body lines."""
+    if len(line) > 40:
+        return None
+    normalized = re.sub(r'[^a-z& ]', '', line.lower()).replace('&', 'and')
+    return HEADING_KINDS.get(re.sub(r'\s+', ' ', normalized).strip())
+
+
+def split_sections(lines: List[str]) -> List[Tuple[str, List[str]]]:
+    """Group lines into (kind, lines) sections, starting with the header."""
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in lines:
+        kind = heading_kind(line)
+        if kind:
+            sections.append((kind, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(kind, section_lines) for kind, section_lines in sections if section_lines]
+
+
+def condense_resume(text: str, max_tokens: Optional[int] = DEFAULT_RESUME_TOKENS) -> str:
+    """Fit resume text into a token budget, keeping the most useful content.
+
+    The text is cleaned of whitespace runs and boilerplate, then split into
+    sections. Each section first gets a share of the budget by kind
+    (experience gets the most), and whatever is left goes to the sections
+    still missing lines, in priority order. Sections keep their leading
+    lines, which in most resumes are the most recent roles and degrees.
+
+    Args:
+        text: Extracted resume text
+        max_tokens: Token budget, or None to only clean the text
+
+    Returns:
+        The condensed text, with [...] where lines were left out
+    """
+    lines = clean_lines(text)
+    cleaned = "\n".join(lines)
+    if max_tokens is None or estimate_tokens(cleaned) <= max_tokens:
+        return cleaned
+
+    # Work in characters, matching estimate_tokens
+    budget = max_tokens * 4
+    sections = split_sections(lines)
+    kept: List[List[str]] = [[] for _ in sections]
+    positions = [0] * len(sections)
+
+    def fill(index: int, allowance: int) -> int:
+        """Keep lines of one section within allowance; return the characters used."""
+        section_lines = sections[index][1]
+        used = 0
+        while positions[index] < len(section_lines):
+            line = section_lines[positions[index]]
+            cost = len(line) + 1
+            if used + cost > allowance:
+                # A long paragraph is cut at a word boundary rather than dropped
+                room = allowance - used - len(TRUNCATION_MARK) - 2
+                if room >= 80:
+                    kept[index].append(line[:room].rsplit(' ', 1)[0] + " " + TRUNCATION_MARK)
+                    used += room + len(TRUNCATION_MARK) + 2
+                    positions[index] = len(section_lines)
+                break
+            kept[index].append(line)
+            used += cost
+            positions[index] += 1
+        return used
+
+    counts: Dict[str, int] = {}
+    for kind, _ in sections:
+        counts[kind] = counts.get(kind, 0) + 1
+    total_weight = sum(SECTION_WEIGHTS.get(kind, 0) for kind, _ in sections) or 1.0
+
+    # Reserve room for a truncation mark per section
+    remaining = budget - len(sections) * (len(TRUNCATION_MARK) + 1)
+    shares = [
+        int(remaining * SECTION_WEIGHTS.get(kind, 0) / total_weight / counts[kind])
+        for kind, _ in sections
+    ]
+    for index, share in enumerate(shares):
+        remaining -= fill(index, share)
+
+    for kind in SECTION_PRIORITY:
+        for index, (section_kind, _) in enumerate(sections):
+            if section_kind == kind and remaining > 0:
+                remaining -= fill(index, remaining)
+
+    output = []
+    for index, (_, section_lines) in enumerate(sections):
+        output.extend(kept[index])
+        if positions[index] < len(section_lines):
+            output.append(TRUNCATION_MARK)
+    return "\n".join(output)
@@ -0,0 +1,239 @@
+import asyncio
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+from ai_analyzer import AIAnalyzer, DEFAULT_CONCURRENCY, ResultCallback
+
+
+# Seconds to wait for the first request before sending a hedged one
+DEFAULT_HEDGE_AFTER = 20.0
+
+# A provider failing this many times in a row is skipped for the cooldown
+FAILURE_THRESHOLD = 3
+FAILURE_COOLDOWN = 60.0
+
+ROUTE_PATHS = ("cached", "primary", "hedge", "failover", "failed")
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Return the nearest-rank percentile of values, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class HedgedAnalyzer:
+    """Analyze resumes across several providers to cut tail latency.
+
+    Each resume goes to the first healthy analyzer. If no answer arrives
+    within hedge_after seconds, the same request is sent to the next
+    analyzer (or again to the same one when there is only one) and the
+    first successful answer wins; the slower request is cancelled. A request
+    that fails is retried on the next analyzer straight away, and an
+    analyzer that keeps failing is skipped for a while.
+
+    Every result gets a "route" entry saying which path produced it.
+    """
+
+    def __init__(
+        self,
+        analyzers: List[AIAnalyzer],
+        hedge_after: float = DEFAULT_HEDGE_AFTER,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        failure_cooldown: float = FAILURE_COOLDOWN
+    ):
+        """Initialize the hedged analyzer.
+
+        Args:
+            analyzers: Analyzers in order of preference, e.g. one per provider
+            hedge_after: Seconds before a slow request is hedged
+            failure_threshold: Consecutive failures that take an analyzer out
+                of rotation
+            failure_cooldown: Seconds an analyzer stays out of rotation
+        """
+        if not analyzers:
+            raise ValueError("HedgedAnalyzer needs at least one analyzer")
+        self.analyzers = analyzers
+        self.hedge_after = hedge_after
+        self.failure_threshold = failure_threshold
+        self.failure_cooldown = failure_cooldown
+
+        self._failures = [0] * len(analyzers)
+        self._unhealthy_until = [0.0] * len(analyzers)
+        self._paths = {path: 0 for path in ROUTE_PATHS}
+        self._latencies: List[float] = []
+
+    def analyze_resumes(
+        self,
+        resume_texts: List[str],
+        criteria: Dict[str, Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        refresh: bool = False,
+        on_result: Optional[ResultCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """Analyze several resumes concurrently with hedging and failover.
+
+        Blocking wrapper around analyze_resumes_async.
+
+        Args:
+            resume_texts: The text content of each resume
+            criteria: Dictionary containing screening criteria including job description
+            concurrency: Maximum number of resumes in flight at once (a hedged
+                resume briefly has two requests in flight)
+            refresh: Skip cached results and re-analyze every resume
+            on_result: Called with (index, result) as each resume finishes
+
+        Returns:
+            List of analysis results in the same order as resume_texts
+        """
+        return asyncio.run(
+            self.analyze_resumes_async(resume_texts, criteria, concurrency, refresh, on_result)
+        )
+
+    async def analyze_resumes_async(
+        self,
+        resume_texts: List[str],
+        criteria: Dict[str, Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        refresh: bool = False,
+        on_result: Optional[ResultCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """Async version of analyze_resumes."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        clients = [analyzer._create_async_client() for analyzer in self.analyzers]
+
+        async def analyze_one(index: int, resume_text: str) -> Dict[str, Any]:
+            result = None if refresh else await self._cached(resume_text, criteria)
+            if result is None:
+                async with semaphore:
+                    result = await self._analyze_hedged(clients, resume_text, criteria)
+            if on_result:
+                on_result(index, result)
+            return result
+
+        try:
+            return await asyncio.gather(*(analyze_one(i, text) for i, text in enumerate(resume_texts)))
+        finally:
+            for client in clients:
+                await client.close()
+
+    def routing_summary(self) -> Dict[str, Any]:
+        """Return how many results each path produced and the latency percentiles."""
+        return {
+            'paths': dict(self._paths),
+            'latency_p50': percentile(self._latencies, 0.50),
+            'latency_p95': percentile(self._latencies, 0.95),
+            'latency_p99': percentile(self._latencies, 0.99)
+        }
+
+    async def _analyze_hedged(
+        self,
+        clients: List[Any],
+        resume_text: str,
+        criteria: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Run one resume through the primary analyzer, hedging or failing over as needed."""
+        start = time.monotonic()
+        order = self._routing_order()
+        backups = order[1:] or order[:1]
+        pending: Dict[asyncio.Task, Any] = {}
+
+        def launch(index: int, path: str) -> None:
+            analyzer = self.analyzers[index]
+            task = asyncio.create_task(
+                analyzer._analyze_resume_async(clients[index], resume_text, criteria)
+            )
+            pending[task] = (index, path)
+
+        launch(order[0], 'primary')
+        last_error = None
+        try:
+            while pending:
+                hedge_due = self.hedge_after - (time.monotonic() - start)
+                may_hedge = bool(backups) and not any(path == 'hedge' for _, path in pending.values())
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, hedge_due) if may_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Too slow: race a second request against the first
+                    launch(backups.pop(0), 'hedge')
+                    continue
+
+                for task in done:
+                    index, path = pending.pop(task)
+                    result = task.result()
+                    self._record_outcome(index, 'error' not in result)
+                    if 'error' not in result:
+                        return await self._finish(result, index, path, start, resume_text, criteria)
+                    last_error = result
+                    if backups and not pending:
+                        launch(backups.pop(0), 'failover')
+        finally:
+            # Cancel the losing request and let it unwind before moving on
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        self._paths['failed'] += 1
+        last_error['route'] = {'path': 'failed', 'seconds': round(time.monotonic() - start, 3)}
+        return last_error
+
+    async def _finish(
+        self,
+        result: Dict[str, Any],
+        index: int,
+        path: str,
+        start: float,
+        resume_text: str,
+        criteria: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Cache a winning result and record the path that produced it."""
+        analyzer = self.analyzers[index]
+        seconds = time.monotonic() - start
+        self._paths[path] += 1
+        self._latencies.append(seconds)
+
+        cache_key = analyzer._cache_key(resume_text, criteria)
+        if cache_key:
+            await analyzer._store_async(cache_key, result)
+
+        result['route'] = {
+            'path': path,
+            'provider': analyzer.provider,
+            'model': analyzer.model,
+            'seconds': round(seconds, 3)
+        }
+        return result
+
+    async def _cached(self, resume_text: str, criteria: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return a stored result from any of the analyzers, if there is one."""
+        for analyzer in self.analyzers:
+            cache_key = analyzer._cache_key(resume_text, criteria)
+            cached = await analyzer._cached_async(cache_key) if cache_key else None
+            if cached is not None:
+                self._paths['cached'] += 1
+                cached['route'] = {'path': 'cached', 'provider': analyzer.provider, 'model': analyzer.model}
+                return cached
+        return None
+
+    def _routing_order(self) -> List[int]:
+        """Return analyzer indices to try, healthy ones first, in preference order."""
+        now = time.monotonic()
+        indices = range(len(self.analyzers))
+        healthy = [i for i in indices if self._unhealthy_until[i] <= now]
+        return healthy + [i for i in indices if i not in healthy]
+
+    def _record_outcome(self, index: int, success: bool) -> None:
+        """Track consecutive failures and take failing analyzers out of rotation."""
+        if success:
+            self._failures[index] = 0
+            return
+        self._failures[index] += 1
+        if self._failures[index] >= self.failure_threshold:
+            self._unhealthy_until[index] = time.monotonic() + self.failure_cooldown
+            self._failures[index] = 0
@@ -0,0 +1,644 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Jobs whose owner has not checked in for this long are taken over by
+# another worker; owners check in every HEARTBEAT_INTERVAL seconds
+DEFAULT_STALE_AFTER = 60.0
+HEARTBEAT_INTERVAL = 15.0
+
+# Finished jobs are deleted after this long
+DEFAULT_RETENTION = 24 * 3600
+
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+FILE_STATUSES = ("pending", "done", "error", "screened_out")
+
+# Result fields kept in the slim rows returned by page_files; the rest
+# (strengths, detailed analysis, usage...) is loaded with file_result
+ROW_FIELDS = (
+    "filename", "overall_score", "skills_score", "experience_score", "education_score",
+    "qualifications_score", "interview_recommendation", "local_score", "tier", "error"
+)
+
+# page_files sort keys and the columns they order by
+SORT_COLUMNS = {
+    "score": "overall_score",
+    "local_score": "local_score",
+    "filename": "filename",
+    "position": "position"
+}
+
+# Within a score ordering, analyzed files come first, then failures; kept
+# in the indexed status_rank column so the index serves the ordering
+STATUS_RANKS = {"done": 0, "error": 1, "screened_out": 2, "pending": 3}
+
+# Sub-scores stored in their own columns so a batch can be re-weighted
+# without decoding every result
+SUB_SCORE_COLUMNS = ("skills_score", "experience_score", "education_score", "qualifications_score")
+
+# Added after the first release; created on older databases at startup
+FILE_COLUMNS = {
+    "overall_score": "REAL",
+    "local_score": "REAL",
+    "recommendation": "TEXT",
+    "row": "TEXT",
+    "finished_at": "REAL",
+    "status_rank": "INTEGER",
+    **{column: "REAL" for column in SUB_SCORE_COLUMNS}
+}
+
+
+def result_row(position: int, status: str, result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Return the slim listing row of one file's outcome."""
+    row = {field: result[field] for field in ROW_FIELDS if result and field in result}
+    row['position'] = position
+    row['status'] = status
+    return row
+
+
+def recommendation_key(result: Dict[str, Any]) -> Optional[str]:
+    """Normalize a recommendation ("Yes - strong fit") to its first word for filtering."""
+    recommendation = str(result.get('interview_recommendation') or result.get('recommendation') or '')
+    words = recommendation.strip().lower().split()
+    return words[0].strip('.,:;-') if words else None
+
+
+class JobStore:
+    """Durable SQLite store of analysis jobs and their per-file progress.
+
+    The database may be shared by several worker processes. A job keeps its
+    request until it finishes, so another worker can pick it up if the one
+    running it dies.
+    """
+
+    def __init__(self, path: str, retention: Optional[float] = DEFAULT_RETENTION):
+        """Initialize the store, creating the database if needed.
+
+        Args:
+            path: SQLite database file
+            retention: Seconds finished jobs are kept, or None to keep them
+        """
+        self.path = path
+        self.retention = retention
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    request TEXT,
+                    summary TEXT,
+                    error TEXT,
+                    owner TEXT,
+                    heartbeat REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_files (
+                    job_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    filename TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    PRIMARY KEY (job_id, position)
+                )
+            """)
+            existing = {column[1] for column in conn.execute("PRAGMA table_info(job_files)")}
+            for column, column_type in FILE_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE job_files ADD COLUMN {column} {column_type}")
+                    if column_type == "REAL" and column != "finished_at":
+                        # Fill in files stored before the column existed
+                        conn.execute(
+                            f"UPDATE job_files SET {column} = json_extract(result, '$.{column}') "
+                            "WHERE result IS NOT NULL"
+                            + ("" if column == "local_score" else " AND status = 'done'")
+                        )
+                    elif column == "status_rank":
+                        conn.execute(
+                            "UPDATE job_files SET status_rank = CASE status "
+                            + " ".join(f"WHEN '{status}' THEN {rank}" for status, rank in STATUS_RANKS.items())
+                            + f" ELSE {STATUS_RANKS['pending']} END"
+                        )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, heartbeat)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_job_files_score ON job_files (job_id, status, overall_score)"
+            )
+            # Score listings in either direction
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_job_files_rank "
+                "ON job_files (job_id, status_rank, overall_score DESC, position)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_job_files_rank_asc "
+                "ON job_files (job_id, status_rank, overall_score, position)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_job_files_recommendation "
+                "ON job_files (job_id, recommendation, overall_score)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_job_files_finished ON job_files (job_id, finished_at)"
+            )
+
+    def create(self, job_id: str, request: Dict[str, Any], filenames: List[str], owner: str) -> None:
+        """Store a new queued job with one pending entry per file."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, request, owner, heartbeat, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, json.dumps(request), owner, now, now, now)
+            )
+            conn.executemany(
+                "INSERT INTO job_files (job_id, position, filename, status, status_rank) "
+                "VALUES (?, ?, ?, 'pending', ?)",
+                [(job_id, position, filename, STATUS_RANKS['pending']) for position, filename in enumerate(filenames)]
+            )
+            self._purge(conn, now)
+
+    def set_running(self, job_id: str) -> None:
+        """Mark a job as started."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'running', heartbeat = ?, updated_at = ? WHERE id = ?",
+                (now, now, job_id)
+            )
+
+    def record_file(self, job_id: str, position: int, status: str, result: Dict[str, Any]) -> None:
+        """Store the outcome of one file of a job, with its sortable fields."""
+        now = time.time()
+
+        def number(name):
+            value = result.get(name) if status == 'done' else None
+            return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE job_files SET status = ?, status_rank = ?, result = ?, overall_score = ?, local_score = ?, "
+                "recommendation = ?, row = ?, finished_at = ?, "
+                + ", ".join(f"{column} = ?" for column in SUB_SCORE_COLUMNS)
+                + " WHERE job_id = ? AND position = ?",
+                (
+                    status,
+                    STATUS_RANKS[status],
+                    json.dumps(result, ensure_ascii=False),
+                    number('overall_score'),
+                    result.get('local_score'),
+                    recommendation_key(result) if status == 'done' else None,
+                    json.dumps(result_row(position, status, result), ensure_ascii=False),
+                    now,
+                    *(number(column) for column in SUB_SCORE_COLUMNS),
+                    job_id,
+                    position
+                )
+            )
+            conn.execute(
+                "UPDATE jobs SET heartbeat = ?, updated_at = ? WHERE id = ?",
+                (now, now, job_id)
+            )
+
+    def finish(self, job_id: str, summary: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        """Mark a job completed (or failed, when error is given) and drop its request."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, summary = ?, error = ?, request = NULL, owner = NULL, "
+                "updated_at = ? WHERE id = ?",
+                ('failed' if error else 'completed', json.dumps(summary or {}), error, now, job_id)
+            )
+
+    def touch(self, job_ids: List[str]) -> None:
+        """Record that the owner of these jobs is still alive."""
+        if not job_ids:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND status IN ('queued', 'running')",
+                [(now, job_id) for job_id in job_ids]
+            )
+
+    def claim_stale(self, owner: str, stale_after: float) -> List[Tuple[str, Dict[str, Any]]]:
+        """Take over unfinished jobs whose owner stopped checking in.
+
+        Returns:
+            (job id, request) for each job now owned by owner
+        """
+        now = time.time()
+        claim = f"{owner}/{uuid.uuid4().hex}"
+        with self._connect() as conn:
+            # One UPDATE, so two workers can never claim the same job
+            conn.execute(
+                "UPDATE jobs SET owner = ?, heartbeat = ? "
+                "WHERE status IN ('queued', 'running') AND heartbeat < ?",
+                (claim, now, now - stale_after)
+            )
+            rows = conn.execute("SELECT id, request FROM jobs WHERE owner = ?", (claim,)).fetchall()
+            conn.execute("UPDATE jobs SET owner = ? WHERE owner = ?", (owner, claim))
+        return [(job_id, json.loads(request)) for job_id, request in rows]
+
+    def get(self, job_id: str, files: bool = True) -> Optional[Dict[str, Any]]:
+        """Return a job's status, summary and files, or None if unknown.
+
+        With files=False the (possibly large) file results are not loaded;
+        use progress, page_files and file_result instead.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT status, summary, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            file_rows = conn.execute(
+                "SELECT position, filename, status, result FROM job_files "
+                "WHERE job_id = ? ORDER BY position",
+                (job_id,)
+            ).fetchall() if files else []
+        status, summary, error, created_at, updated_at = row
+        job = {
+            'id': job_id,
+            'status': status,
+            'summary': json.loads(summary) if summary else {},
+            'error': error,
+            'created_at': created_at,
+            'updated_at': updated_at
+        }
+        if files:
+            job['files'] = [
+                {
+                    'position': position,
+                    'filename': filename,
+                    'status': file_status,
+                    'result': json.loads(result) if result else None
+                }
+                for position, filename, file_status, result in file_rows
+            ]
+        return job
+
+    def progress(self, job_id: str) -> Dict[str, int]:
+        """Return how many files of a job are in each status."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM job_files WHERE job_id = ? GROUP BY status",
+                (job_id,)
+            ).fetchall()
+        counts = {status: 0 for status in FILE_STATUSES}
+        counts.update(dict(rows))
+        return counts
+
+    def finished_rows(self, job_id: str, since: float = 0.0) -> List[Dict[str, Any]]:
+        """Return the slim rows of files finished at or after since, oldest first.
+
+        Each row carries its finished_at time for the next call.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT position, filename, status, COALESCE(row, result), finished_at FROM job_files "
+                "WHERE job_id = ? AND status != 'pending' AND COALESCE(finished_at, 0) >= ? "
+                "ORDER BY finished_at, position",
+                (job_id, since)
+            ).fetchall()
+        return [
+            dict(self._row(position, filename, status, content), finished_at=finished_at or 0.0)
+            for position, filename, status, content, finished_at in rows
+        ]
+
+    def page_files(
+        self,
+        job_id: str,
+        sort: str = 'score',
+        descending: bool = True,
+        status: Optional[str] = None,
+        recommendation: Optional[str] = None,
+        min_score: Optional[float] = None,
+        search: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return one page of a job's files as slim rows, and how many match.
+
+        Args:
+            job_id: The job to list
+            sort: One of SORT_COLUMNS; score orders failures after analyzed files
+            descending: Highest (or last) first
+            status: Only files in this status; files not finished yet are
+                listed only when this is pending
+            recommendation: Only analyzed files with this recommendation (yes, no, maybe)
+            min_score: Only analyzed files scoring at least this
+            search: Only files whose name contains this text
+            offset: Rows to skip
+            limit: Rows to return
+
+        Returns:
+            The rows and the total number of matching files
+        """
+        where, params = self._filters(job_id, status, recommendation, min_score, search)
+        order = self._order(sort, descending)
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM job_files WHERE {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT position, filename, status, COALESCE(row, result) FROM job_files WHERE {where} "
+                f"ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [self._row(*row) for row in rows], total
+
+    def iter_results(
+        self,
+        job_id: str,
+        sort: str = 'score',
+        descending: bool = True,
+        status: Optional[str] = None,
+        recommendation: Optional[str] = None,
+        min_score: Optional[float] = None,
+        search: Optional[str] = None
+    ) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+        """Yield (position, status, full result) for a job's finished files one at a time.
+
+        Takes the same filters and ordering as page_files.
+        """
+        where, params = self._filters(job_id, status, recommendation, min_score, search)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"SELECT position, status, result FROM job_files "
+                f"WHERE {where} AND status != 'pending' ORDER BY {self._order(sort, descending)}",
+                params
+            )
+            for position, file_status, result in cursor:
+                yield position, file_status, json.loads(result)
+
+    def sub_scores(
+        self,
+        job_id: str,
+        recommendation: Optional[str] = None,
+        min_score: Optional[float] = None,
+        search: Optional[str] = None
+    ) -> List[Tuple[Any, ...]]:
+        """Return (position, skills, experience, education, qualifications) for each analyzed file.
+
+        Rows come in position order; scores a file did not report are None.
+        """
+        where, params = self._filters(job_id, 'done', recommendation, min_score, search)
+        with self._connect() as conn:
+            return conn.execute(
+                f"SELECT position, {', '.join(SUB_SCORE_COLUMNS)} FROM job_files "
+                f"WHERE {where} ORDER BY position",
+                params
+            ).fetchall()
+
+    def rows_at(self, job_id: str, positions: List[int], full: bool = False) -> Dict[int, Dict[str, Any]]:
+        """Return {position: slim row} (or the full result, with full=True) for some files of a job."""
+        found = {}
+        column = "result" if full else "COALESCE(row, result)"
+        with self._connect() as conn:
+            # Stay well under SQLite's limit on query parameters
+            for start in range(0, len(positions), 500):
+                batch = positions[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT position, filename, status, {column} FROM job_files "
+                    f"WHERE job_id = ? AND position IN ({', '.join('?' * len(batch))})",
+                    [job_id, *batch]
+                ).fetchall()
+                for position, filename, status, content in rows:
+                    found[position] = (
+                        json.loads(content) if full else self._row(position, filename, status, content)
+                    )
+        return found
+
+    def file_result(self, job_id: str, position: int) -> Optional[Dict[str, Any]]:
+        """Return the full stored outcome of one file, or None if unknown."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT filename, status, result FROM job_files WHERE job_id = ? AND position = ?",
+                (job_id, position)
+            ).fetchone()
+        if row is None:
+            return None
+        filename, status, result = row
+        return {
+            'position': position,
+            'filename': filename,
+            'status': status,
+            'result': json.loads(result) if result else None
+        }
+
+    def finished_files(self, job_id: str) -> Dict[int, Dict[str, Any]]:
+        """Return {position: stored outcome} for the files of a job that are done."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT position, status, result FROM job_files WHERE job_id = ? AND status != 'pending'",
+                (job_id,)
+            ).fetchall()
+        return {position: {'status': status, 'result': json.loads(result)} for position, status, result in rows}
+
+    @staticmethod
+    def _row(position: int, filename: str, status: str, content: Optional[str]) -> Dict[str, Any]:
+        """Decode a stored slim row, or build one from a full result stored before rows existed."""
+        data = json.loads(content) if content else None
+        row = data if data is not None and 'position' in data else result_row(position, status, data)
+        # Results do not always carry the name, and pending files have no result yet
+        row['filename'] = filename
+        return row
+
+    @staticmethod
+    def _filters(
+        job_id: str,
+        status: Optional[str],
+        recommendation: Optional[str],
+        min_score: Optional[float],
+        search: Optional[str]
+    ) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause and parameters of a file listing."""
+        clauses, params = ["job_id = ?"], [job_id]
+        # Filter on status_rank rather than status so the rank index applies
+        if status:
+            if status not in STATUS_RANKS:
+                raise ValueError(f"Unknown file status: {status}")
+            clauses.append("status_rank = ?")
+            params.append(STATUS_RANKS[status])
+        else:
+            clauses.append("status_rank < ?")
+            params.append(STATUS_RANKS['pending'])
+        if recommendation:
+            clauses.append("recommendation = ?")
+            params.append(recommendation.lower())
+        if min_score is not None:
+            clauses.append("overall_score >= ?")
+            params.append(min_score)
+        if search:
+            clauses.append("filename LIKE ? ESCAPE '\\'")
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        return " AND ".join(clauses), params
+
+    @staticmethod
+    def _order(sort: str, descending: bool) -> str:
+        """Build the ORDER BY clause of a file listing."""
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        direction = "DESC" if descending else "ASC"
+        order = f"{SORT_COLUMNS[sort]} {direction}, position"
+        if sort == 'score':
+            order = f"status_rank, {order}"
+        return order
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction and close it afterwards."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _purge(self, conn: sqlite3.Connection, now: float) -> None:
+        """Delete finished jobs older than the retention period."""
+        if self.retention is None:
+            return
+        cutoff = now - self.retention
+        conn.execute(
+            "DELETE FROM job_files WHERE job_id IN ("
+            "SELECT id FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?)",
+            (cutoff,)
+        )
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?",
+            (cutoff,)
+        )
+
+
+# Runner signature: (job id, request, finished files, report) -> summary,
+# where report(position, status, result) stores one file's outcome
+JobRunner = Callable[
+    [str, Dict[str, Any], Dict[int, Dict[str, Any]], Callable[[int, str, Dict[str, Any]], None]],
+    Optional[Dict[str, Any]]
+]
+
+
+class JobQueue:
+    """Run analysis jobs on a pool of background threads.
+
+    Jobs are recorded in a JobStore before they run, and every finished file
+    is stored as it completes, so a poller sees partial results. A background
+    thread keeps this worker's jobs marked alive and takes over jobs left
+    behind by a worker that stopped; those resume with the files that were
+    not finished yet.
+
+    Request fields named in secret_fields (API keys) are held in this
+    process's memory only, so a job taken over by another worker runs
+    without them.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        runner: JobRunner,
+        workers: int = 2,
+        stale_after: float = DEFAULT_STALE_AFTER,
+        secret_fields: Tuple[str, ...] = ()
+    ):
+        """Initialize the queue and start taking over abandoned jobs.
+
+        Args:
+            store: Where jobs and their progress are kept
+            runner: Function that executes one job
+            workers: Number of jobs run at once by this process
+            stale_after: Seconds without a heartbeat before a job is taken over
+            secret_fields: Request fields never written to the store
+        """
+        self.store = store
+        self.runner = runner
+        self.stale_after = stale_after
+        self.secret_fields = secret_fields
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='analysis-job')
+        self._lock = threading.Lock()
+        self._owned = set()
+        self._secrets: Dict[str, Dict[str, Any]] = {}
+        self._updated = threading.Condition()
+
+        self._monitor = threading.Thread(target=self._watch, daemon=True)
+        self._monitor.start()
+
+    def submit(self, request: Dict[str, Any], filenames: List[str]) -> str:
+        """Store a job and queue it; return its ID."""
+        job_id = uuid.uuid4().hex
+        secrets = {field: request[field] for field in self.secret_fields if field in request}
+        stored = {key: value for key, value in request.items() if key not in secrets}
+        with self._lock:
+            self._secrets[job_id] = secrets
+        self.store.create(job_id, stored, filenames, self.owner)
+        self._start(job_id, stored)
+        return job_id
+
+    def _start(self, job_id: str, request: Dict[str, Any]) -> None:
+        """Hand a job owned by this process to the worker pool."""
+        with self._lock:
+            self._owned.add(job_id)
+        self._executor.submit(self._run, job_id, request)
+
+    def _run(self, job_id: str, request: Dict[str, Any]) -> None:
+        """Execute one job and record how it ended."""
+        try:
+            self.store.set_running(job_id)
+            finished = self.store.finished_files(job_id)
+
+            def report(position: int, status: str, result: Dict[str, Any]) -> None:
+                self.store.record_file(job_id, position, status, result)
+                self._notify()
+
+            with self._lock:
+                secrets = self._secrets.get(job_id, {})
+            summary = self.runner(job_id, {**request, **secrets}, finished, report)
+            self.store.finish(job_id, summary)
+        except Exception as e:
+            print(f"Error running analysis job {job_id}: {e}")
+            self.store.finish(job_id, error=str(e))
+        finally:
+            with self._lock:
+                self._owned.discard(job_id)
+                self._secrets.pop(job_id, None)
+            self._notify()
+
+    def wait_for_update(self, timeout: float) -> None:
+        """Block until a job in this process records progress, or timeout passes."""
+        with self._updated:
+            self._updated.wait(timeout)
+
+    def _notify(self) -> None:
+        """Wake threads waiting for job progress."""
+        with self._updated:
+            self._updated.notify_all()
+
+    def _watch(self) -> None:
+        """Keep this worker's jobs alive and adopt abandoned ones."""
+        while True:
+            try:
+                with self._lock:
+                    owned = list(self._owned)
+                self.store.touch(owned)
+                for job_id, request in self.store.claim_stale(self.owner, self.stale_after):
+                    print(f"Resuming analysis job {job_id}")
+                    self._start(job_id, request)
+            except sqlite3.Error as e:
+                print(f"Error checking analysis jobs: {e}")
+            time.sleep(HEARTBEAT_INTERVAL)
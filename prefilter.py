@@ -0,0 +1,129 @@
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+# BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Keeps tokens such as c++, c#, node.js and .net in one piece
+TOKEN_PATTERN = re.compile(r"[a-z0-9.+#]*[a-z0-9+#]")
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by
+can could do does for from had has have having he her his how i if in into is
+it its may more most must my no not of on or our out over own per she should
+so some such than that the their them then there these they this those to
+under up us very was we were what when where which while who will with within
+would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text and split it into word tokens, dropping stopwords."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    return [token for token in tokens if token not in STOPWORDS]
+
+
+def criteria_query(criteria: Dict[str, Any]) -> str:
+    """Return the text resumes are matched against for a set of criteria.
+
+    The job description when there is one, otherwise the job title, required
+    skills and additional notes.
+    """
+    if criteria.get('job_description'):
+        return criteria['job_description']
+    parts = [criteria.get('job_title', ''), criteria.get('skills', ''), criteria.get('additional_notes', '')]
+    return "\n".join(part for part in parts if part)
+
+
+class LexicalRanker:
+    """Local BM25 scoring of resumes against a query, without any API calls.
+
+    Only query terms can contribute to a BM25 score, so the term-frequency
+    matrix is built over the query vocabulary alone: one row per resume, one
+    column per distinct query term.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        """Initialize the ranker.
+
+        Args:
+            k1: Term frequency saturation
+            b: Strength of document length normalization (0 to 1)
+        """
+        self.k1 = k1
+        self.b = b
+
+    def score(self, query: str, documents: List[str]) -> np.ndarray:
+        """Return the raw BM25 score of every document for the query."""
+        query_tokens = tokenize(query)
+        if not documents or not query_tokens:
+            return np.zeros(len(documents))
+
+        vocabulary: Dict[str, int] = {}
+        for token in query_tokens:
+            vocabulary.setdefault(token, len(vocabulary))
+        query_weights = np.bincount(
+            [vocabulary[token] for token in query_tokens], minlength=len(vocabulary)
+        )
+
+        # Sparse (document, term) occurrences, counted into a dense matrix
+        rows: List[int] = []
+        columns: List[int] = []
+        lengths = np.zeros(len(documents))
+        for row, document in enumerate(documents):
+            tokens = tokenize(document)
+            lengths[row] = len(tokens)
+            for token in tokens:
+                column = vocabulary.get(token)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+        term_frequencies = np.zeros((len(documents), len(vocabulary)))
+        np.add.at(term_frequencies, (rows, columns), 1)
+
+        document_frequencies = np.count_nonzero(term_frequencies, axis=0)
+        idf = np.log1p((len(documents) - document_frequencies + 0.5) / (document_frequencies + 0.5))
+
+        average_length = lengths.mean() or 1.0
+        norm = self.k1 * (1 - self.b + self.b * lengths / average_length)
+        saturated = term_frequencies * (self.k1 + 1) / (term_frequencies + norm[:, None])
+        return saturated @ (idf * query_weights)
+
+
+def local_scores(resume_texts: List[str], criteria: Dict[str, Any]) -> List[float]:
+    """Score resumes against the criteria on a 0-100 scale.
+
+    Scores are relative to the best match in the same pile, which scores 100.
+    """
+    scores = LexicalRanker().score(criteria_query(criteria), resume_texts)
+    best = scores.max() if len(scores) else 0
+    if best <= 0:
+        return [0.0] * len(resume_texts)
+    return [round(float(score), 1) for score in scores * 100 / best]
+
+
+def shortlist(
+    scores: List[float],
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None
+) -> List[int]:
+    """Pick which candidates go on to the AI analysis.
+
+    Args:
+        scores: Local scores from local_scores()
+        top_k: Keep at most this many of the best scored candidates
+        min_score: Keep only candidates scoring at least this much
+
+    Returns:
+        Indices of the kept candidates, in their original order
+    """
+    order = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+    if min_score is not None:
+        order = [i for i in order if scores[i] >= min_score]
+    if top_k is not None:
+        order = order[:max(0, top_k)]
+    return sorted(order)
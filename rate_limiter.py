@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+# Default provider limits (requests and tokens per minute) for the lowest
+# paid usage tiers; override with <PROVIDER>_RPM / <PROVIDER>_TPM
+DEFAULT_LIMITS = {
+    "anthropic": (50, 40000),
+    "openai": (500, 30000)
+}
+
+# Adaptive scaling of the configured limits: every rate-limit response cuts
+# the effective rate, every success slowly restores it
+MIN_RATE_SCALE = 0.1
+RATE_LIMITED_SCALE = 0.7
+SUCCESS_RECOVERY = 1.02
+
+
+class RateLimiter:
+    """Token-bucket limiter for provider requests/min and tokens/min.
+
+    Bucket levels live either in process memory or in a small SQLite file,
+    in which case every gunicorn worker using the same file draws from one
+    shared budget. A retry-after from the provider pauses all of them, and
+    rate-limit responses temporarily scale the limits down.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        state_path: Optional[str] = None
+    ):
+        """Initialize the limiter.
+
+        Args:
+            key: Name of the shared budget, e.g. provider, model and key hash
+            requests_per_minute: Request limit
+            tokens_per_minute: Token limit (input plus reserved output)
+            state_path: SQLite file shared between processes, or None to keep
+                the budget in this process only
+        """
+        self.key = key
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.state_path = state_path
+
+        self._lock = threading.Lock()
+        self._memory_state: Optional[Dict[str, float]] = None
+
+        if state_path:
+            directory = os.path.dirname(state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS rate_limits (
+                        key TEXT PRIMARY KEY,
+                        requests REAL NOT NULL,
+                        tokens REAL NOT NULL,
+                        updated_at REAL NOT NULL,
+                        blocked_until REAL NOT NULL,
+                        scale REAL NOT NULL
+                    )
+                """)
+
+    @classmethod
+    def from_env(
+        cls,
+        provider: str,
+        model: str,
+        api_key: str,
+        state_path: Optional[str] = None
+    ) -> "RateLimiter":
+        """Create a limiter for one API key using <PROVIDER>_RPM / <PROVIDER>_TPM.
+
+        Each API key has its own budget; the key itself is only stored hashed.
+        """
+        default_rpm, default_tpm = DEFAULT_LIMITS.get(provider, (60, 60000))
+        prefix = provider.upper()
+        key_hash = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+        return cls(
+            f"{provider}:{model}:{key_hash}",
+            float(os.environ.get(f"{prefix}_RPM", default_rpm)),
+            float(os.environ.get(f"{prefix}_TPM", default_tpm)),
+            state_path
+        )
+
+    def reserve(self, tokens: int) -> float:
+        """Try to take one request and `tokens` tokens from the budget.
+
+        Returns:
+            0 if the budget was taken, otherwise the seconds to wait before
+            trying again
+        """
+        def update(state: Dict[str, float], now: float) -> float:
+            request_capacity, token_capacity = self._capacities(state)
+            # Requests bigger than the whole bucket go through once it is full
+            needed = min(tokens, token_capacity)
+
+            wait = max(
+                state['blocked_until'] - now,
+                (1 - state['requests']) * 60 / request_capacity,
+                (needed - state['tokens']) * 60 / token_capacity,
+                0
+            )
+            if wait <= 0:
+                state['requests'] -= 1
+                state['tokens'] -= needed
+            return wait
+
+        return self._transact(update)
+
+    def acquire(self, tokens: int) -> None:
+        """Block until one request and `tokens` tokens are available."""
+        while True:
+            wait = self.reserve(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int) -> None:
+        """Wait without blocking the event loop until the budget is available."""
+        while True:
+            # reserve() can wait on the SQLite lock; keep that off the loop
+            wait = await asyncio.to_thread(self.reserve, tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def record_success(self, reserved_tokens: int, used_tokens: Optional[int] = None) -> None:
+        """Return over-reserved tokens and let the rate recover after a success."""
+        def update(state: Dict[str, float], now: float) -> None:
+            if used_tokens is not None and used_tokens < reserved_tokens:
+                _, token_capacity = self._capacities(state)
+                state['tokens'] = min(token_capacity, state['tokens'] + reserved_tokens - used_tokens)
+            state['scale'] = min(1.0, state['scale'] * SUCCESS_RECOVERY)
+
+        self._transact(update)
+
+    def record_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """Pause every user of this budget and scale the rate down.
+
+        Args:
+            retry_after: Seconds the provider asked us to wait, if it said
+        """
+        def update(state: Dict[str, float], now: float) -> None:
+            if retry_after:
+                state['blocked_until'] = max(state['blocked_until'], now + retry_after)
+            state['scale'] = max(MIN_RATE_SCALE, state['scale'] * RATE_LIMITED_SCALE)
+            request_capacity, token_capacity = self._capacities(state)
+            state['requests'] = min(state['requests'], request_capacity)
+            state['tokens'] = min(state['tokens'], token_capacity)
+
+        self._transact(update)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the current bucket levels and rate scale."""
+        def update(state: Dict[str, float], now: float) -> Dict[str, float]:
+            return {
+                'requests_available': round(state['requests'], 2),
+                'tokens_available': round(state['tokens']),
+                'rate_scale': round(state['scale'], 3),
+                'blocked_for': round(max(0.0, state['blocked_until'] - now), 2)
+            }
+
+        return self._transact(update)
+
+    def _capacities(self, state: Dict[str, float]) -> Tuple[float, float]:
+        """Return the scaled (requests, tokens) per-minute capacities."""
+        return (
+            max(1.0, self.requests_per_minute * state['scale']),
+            max(1.0, self.tokens_per_minute * state['scale'])
+        )
+
+    def _refill(self, state: Dict[str, float], now: float) -> None:
+        """Add the budget accrued since the last update."""
+        elapsed = max(0.0, now - state['updated_at'])
+        request_capacity, token_capacity = self._capacities(state)
+        state['requests'] = min(request_capacity, state['requests'] + elapsed * request_capacity / 60)
+        state['tokens'] = min(token_capacity, state['tokens'] + elapsed * token_capacity / 60)
+        state['updated_at'] = now
+
+    def _initial_state(self, now: float) -> Dict[str, float]:
+        """Return full buckets."""
+        return {
+            'requests': float(self.requests_per_minute),
+            'tokens': float(self.tokens_per_minute),
+            'updated_at': now,
+            'blocked_until': 0.0,
+            'scale': 1.0
+        }
+
+    def _transact(self, update: Any) -> Any:
+        """Refill, apply update(state, now) and save, atomically across processes."""
+        if not self.state_path:
+            with self._lock:
+                now = time.time()
+                if self._memory_state is None:
+                    self._memory_state = self._initial_state(now)
+                self._refill(self._memory_state, now)
+                return update(self._memory_state, now)
+
+        with self._connect() as conn:
+            # Take the write lock up front so concurrent workers serialize here
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute(
+                "SELECT requests, tokens, updated_at, blocked_until, scale FROM rate_limits WHERE key = ?",
+                (self.key,)
+            ).fetchone()
+            if row is None:
+                state = self._initial_state(now)
+            else:
+                state = dict(zip(('requests', 'tokens', 'updated_at', 'blocked_until', 'scale'), row))
+            self._refill(state, now)
+            result = update(state, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, requests, tokens, updated_at, blocked_until, scale) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.key, state['requests'], state['tokens'], state['updated_at'],
+                 state['blocked_until'], state['scale'])
+            )
+            conn.execute("COMMIT")
+            return result
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open an autocommit connection and close it afterwards."""
+        conn = sqlite3.connect(self.state_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
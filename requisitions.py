@@ -0,0 +1,471 @@
+import bisect
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from job_queue import ROW_FIELDS
+
+
+CANDIDATE_STATUSES = ("pending", "done", "error", "screened_out")
+
+
+def criteria_key(criteria: Dict[str, Any]) -> str:
+    """Return a short fingerprint of screening criteria; results scored under other criteria are stale."""
+    return hashlib.sha256(json.dumps(criteria, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+class RankedIndex:
+    """The analyzed candidates of one requisition, best first.
+
+    Entries are (-score, seq, file_id) tuples kept sorted, so ties keep the
+    order candidates were added in. A new candidate's place is found by
+    binary search in O(log n) comparisons; the insert itself only shifts
+    the tail of a list of small tuples, so merging a late applicant never
+    re-sorts or re-scores the others.
+    """
+
+    def __init__(self, entries: List[Tuple[float, int, str]], version: int):
+        """Build the index from (score, seq, file_id) entries stored at ranking version `version`."""
+        self.version = version
+        self._keys = sorted((-score, seq, file_id) for score, seq, file_id in entries)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def insert(self, score: float, seq: int, file_id: str) -> int:
+        """Add a candidate and return its 0-based rank."""
+        key = (-score, seq, file_id)
+        rank = bisect.bisect_left(self._keys, key)
+        self._keys.insert(rank, key)
+        return rank
+
+    def remove(self, score: float, seq: int, file_id: str) -> None:
+        """Drop a candidate, e.g. before inserting its re-analyzed score."""
+        key = (-score, seq, file_id)
+        rank = bisect.bisect_left(self._keys, key)
+        if rank < len(self._keys) and self._keys[rank] == key:
+            del self._keys[rank]
+
+    def rank(self, score: float, seq: int, file_id: str) -> Optional[int]:
+        """Return a candidate's 0-based rank, or None if it is not in the index."""
+        key = (-score, seq, file_id)
+        rank = bisect.bisect_left(self._keys, key)
+        return rank if rank < len(self._keys) and self._keys[rank] == key else None
+
+    def page(self, offset: int, limit: int) -> List[str]:
+        """Return the file IDs ranked offset to offset + limit - 1."""
+        return [file_id for _, _, file_id in self._keys[offset:offset + limit]]
+
+
+class RequisitionStore:
+    """SQLite store of job requisitions and the candidates screened for them.
+
+    A requisition keeps its criteria and every candidate it has seen, keyed
+    by file ID (the SHA-256 of the resume), so adding applicants later only
+    analyzes the new ones. Each candidate keeps its extracted text, which
+    lets stale candidates be re-scored after a criteria change without the
+    original file. The ranking of analyzed candidates is held in memory per
+    requisition and updated in place as results arrive; a ranking version
+    in the database tells each process when another one changed it.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the store, creating the database if needed.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, RankedIndex] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS requisitions (
+                    id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    criteria TEXT NOT NULL,
+                    criteria_key TEXT NOT NULL,
+                    ranking_version INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS candidates (
+                    requisition_id TEXT NOT NULL,
+                    file_id TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stale INTEGER NOT NULL DEFAULT 0,
+                    criteria_key TEXT,
+                    overall_score REAL,
+                    result TEXT,
+                    resume_text TEXT,
+                    job_id TEXT,
+                    added_at REAL NOT NULL,
+                    analyzed_at REAL,
+                    PRIMARY KEY (requisition_id, file_id)
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_candidates_status ON candidates (requisition_id, status, stale)"
+            )
+
+    def create(self, title: str, criteria: Dict[str, Any]) -> str:
+        """Store a new requisition with no candidates; return its ID."""
+        requisition_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO requisitions (id, title, criteria, criteria_key, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (requisition_id, title, json.dumps(criteria), criteria_key(criteria), now, now)
+            )
+        return requisition_id
+
+    def get(self, requisition_id: str) -> Optional[Dict[str, Any]]:
+        """Return a requisition with its criteria and candidate counts, or None if unknown."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, title, criteria, criteria_key, created_at, updated_at FROM requisitions WHERE id = ?",
+                (requisition_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            counts = conn.execute(
+                "SELECT status, COUNT(*), SUM(stale) FROM candidates WHERE requisition_id = ? GROUP BY status",
+                (requisition_id,)
+            ).fetchall()
+        return self._requisition(row, counts)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Return every requisition, most recently updated first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, title, criteria, criteria_key, created_at, updated_at FROM requisitions "
+                "ORDER BY updated_at DESC"
+            ).fetchall()
+            counts = conn.execute(
+                "SELECT requisition_id, status, COUNT(*), SUM(stale) FROM candidates "
+                "GROUP BY requisition_id, status"
+            ).fetchall()
+        by_requisition: Dict[str, List[Tuple[str, int, int]]] = {}
+        for requisition_id, status, count, stale in counts:
+            by_requisition.setdefault(requisition_id, []).append((status, count, stale))
+        return [self._requisition(row, by_requisition.get(row[0], [])) for row in rows]
+
+    def update(
+        self,
+        requisition_id: str,
+        title: Optional[str] = None,
+        criteria: Optional[Dict[str, Any]] = None
+    ) -> Optional[int]:
+        """Rename a requisition and/or change its criteria.
+
+        Candidates keep their results; those scored under other criteria are
+        marked stale (and become current again if the criteria change back).
+
+        Returns:
+            Number of stale candidates, or None if the requisition is unknown
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT criteria_key FROM requisitions WHERE id = ?", (requisition_id,)).fetchone()
+            if row is None:
+                return None
+            key = row[0]
+            if title is not None:
+                conn.execute("UPDATE requisitions SET title = ? WHERE id = ?", (title, requisition_id))
+            if criteria is not None:
+                key = criteria_key(criteria)
+                conn.execute(
+                    "UPDATE requisitions SET criteria = ?, criteria_key = ? WHERE id = ?",
+                    (json.dumps(criteria), key, requisition_id)
+                )
+                conn.execute(
+                    "UPDATE candidates SET stale = (criteria_key IS NOT ?) "
+                    "WHERE requisition_id = ? AND status != 'pending'",
+                    (key, requisition_id)
+                )
+            conn.execute("UPDATE requisitions SET updated_at = ? WHERE id = ?", (now, requisition_id))
+            return conn.execute(
+                "SELECT COUNT(*) FROM candidates WHERE requisition_id = ? AND stale = 1",
+                (requisition_id,)
+            ).fetchone()[0]
+
+    def delete(self, requisition_id: str) -> bool:
+        """Delete a requisition and its candidates; return False if it was unknown."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM candidates WHERE requisition_id = ?", (requisition_id,))
+            deleted = conn.execute("DELETE FROM requisitions WHERE id = ?", (requisition_id,)).rowcount
+        with self._lock:
+            self._indexes.pop(requisition_id, None)
+        return bool(deleted)
+
+    def add_candidates(self, requisition_id: str, files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Register uploaded files as candidates and return the ones that need analysis.
+
+        Files are identified by file_id, so a resume the requisition has
+        already seen (even under another name) is skipped; one whose
+        analysis failed is tried again.
+
+        Args:
+            requisition_id: Requisition to add to
+            files: [{'file_id': ..., 'original_name': ...}]
+
+        Returns:
+            The entries of files to analyze, without duplicates
+        """
+        now = time.time()
+        added = []
+        with self._connect() as conn:
+            for file_info in files:
+                file_id = file_info['file_id']
+                filename = file_info.get('original_name', 'Unknown')
+                row = conn.execute(
+                    "SELECT status FROM candidates WHERE requisition_id = ? AND file_id = ?",
+                    (requisition_id, file_id)
+                ).fetchone()
+                if row is None:
+                    conn.execute(
+                        "INSERT INTO candidates (requisition_id, file_id, filename, status, added_at) "
+                        "VALUES (?, ?, ?, 'pending', ?)",
+                        (requisition_id, file_id, filename, now)
+                    )
+                elif row[0] == 'error':
+                    conn.execute(
+                        "UPDATE candidates SET status = 'pending', filename = ? "
+                        "WHERE requisition_id = ? AND file_id = ?",
+                        (filename, requisition_id, file_id)
+                    )
+                else:
+                    continue
+                added.append(file_info)
+            if added:
+                conn.execute("UPDATE requisitions SET updated_at = ? WHERE id = ?", (now, requisition_id))
+        return added
+
+    def assign_job(self, requisition_id: str, file_ids: List[str], job_id: str) -> None:
+        """Note which job is analyzing some candidates."""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE candidates SET job_id = ? WHERE requisition_id = ? AND file_id = ?",
+                [(job_id, requisition_id, file_id) for file_id in file_ids]
+            )
+
+    def unfinished(self, requisition_id: str) -> List[Dict[str, Any]]:
+        """Return the candidates without a current result: stale, failed or still pending.
+
+        Each entry has file_id, original_name, status and job_id.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT file_id, filename, status, job_id FROM candidates "
+                "WHERE requisition_id = ? AND (stale = 1 OR status IN ('pending', 'error')) ORDER BY rowid",
+                (requisition_id,)
+            ).fetchall()
+        return [
+            {'file_id': file_id, 'original_name': filename, 'status': status, 'job_id': job_id}
+            for file_id, filename, status, job_id in rows
+        ]
+
+    def resume_texts(self, requisition_id: str, file_ids: List[str]) -> Dict[str, str]:
+        """Return {file_id: extracted text} for the candidates whose text is stored."""
+        texts = {}
+        with self._connect() as conn:
+            # Stay well under SQLite's limit on query parameters
+            for start in range(0, len(file_ids), 500):
+                batch = file_ids[start:start + 500]
+                texts.update(conn.execute(
+                    f"SELECT file_id, resume_text FROM candidates WHERE requisition_id = ? "
+                    f"AND resume_text IS NOT NULL AND file_id IN ({', '.join('?' * len(batch))})",
+                    [requisition_id, *batch]
+                ).fetchall())
+        return texts
+
+    def record(
+        self,
+        requisition_id: str,
+        file_id: str,
+        status: str,
+        result: Dict[str, Any],
+        scored_with: str,
+        resume_text: Optional[str] = None
+    ) -> Optional[int]:
+        """Store a candidate's analysis and merge it into the ranking.
+
+        A failed re-analysis of a candidate that already has a result keeps
+        the earlier result (still marked stale).
+
+        Args:
+            requisition_id: Requisition the candidate belongs to
+            file_id: The candidate's file ID
+            status: done, error or screened_out
+            result: The analysis, or the error
+            scored_with: criteria_key of the criteria the analysis used
+            resume_text: Extracted text, kept for later re-scoring
+
+        Returns:
+            The candidate's 0-based rank, or None if it is not ranked
+        """
+        score = result.get('overall_score') if status == 'done' else None
+        score = float(score) if isinstance(score, (int, float)) and not isinstance(score, bool) else 0.0
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT c.rowid, c.status, c.overall_score, r.criteria_key FROM candidates c "
+                "JOIN requisitions r ON r.id = c.requisition_id WHERE c.requisition_id = ? AND c.file_id = ?",
+                (requisition_id, file_id)
+            ).fetchone()
+            if row is None:
+                return None
+            seq, previous_status, previous_score, current_key = row
+            if status != 'done' and previous_status == 'done':
+                if resume_text is not None:
+                    conn.execute(
+                        "UPDATE candidates SET resume_text = ? WHERE requisition_id = ? AND file_id = ?",
+                        (resume_text, requisition_id, file_id)
+                    )
+                return None
+
+            conn.execute(
+                "UPDATE candidates SET status = ?, result = ?, overall_score = ?, criteria_key = ?, stale = ?, "
+                "resume_text = COALESCE(?, resume_text), analyzed_at = ? WHERE requisition_id = ? AND file_id = ?",
+                (
+                    status,
+                    json.dumps(result, ensure_ascii=False),
+                    score if status == 'done' else None,
+                    scored_with,
+                    int(scored_with != current_key),
+                    resume_text,
+                    now,
+                    requisition_id,
+                    file_id
+                )
+            )
+            conn.execute(
+                "UPDATE requisitions SET ranking_version = ranking_version + ?, updated_at = ? WHERE id = ?",
+                (int(status == 'done'), now, requisition_id)
+            )
+            if status != 'done':
+                return None
+
+            # Update this process's ranking in place if it was current;
+            # otherwise another process changed it, so read it again
+            version = conn.execute(
+                "SELECT ranking_version FROM requisitions WHERE id = ?", (requisition_id,)
+            ).fetchone()[0]
+            index = self._indexes.get(requisition_id)
+            if index is None or index.version != version - 1:
+                return self._load_index(conn, requisition_id, version).rank(score, seq, file_id)
+            if previous_status == 'done':
+                index.remove(previous_score or 0.0, seq, file_id)
+            index.version = version
+            return index.insert(score, seq, file_id)
+
+    def ranked(self, requisition_id: str, offset: int = 0, limit: int = 50) -> Tuple[List[Dict[str, Any]], int]:
+        """Return one page of the analyzed candidates, best first, and how many there are.
+
+        Rows carry the slim result fields plus file_id, rank (1-based) and stale.
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT ranking_version FROM requisitions WHERE id = ?", (requisition_id,)
+            ).fetchone()
+            if row is None:
+                return [], 0
+            index = self._indexes.get(requisition_id)
+            if index is None or index.version != row[0]:
+                index = self._load_index(conn, requisition_id, row[0])
+            file_ids = index.page(offset, limit)
+            total = len(index)
+            found = {}
+            if file_ids:
+                rows = conn.execute(
+                    f"SELECT file_id, stale, result FROM candidates WHERE requisition_id = ? "
+                    f"AND file_id IN ({', '.join('?' * len(file_ids))})",
+                    [requisition_id, *file_ids]
+                ).fetchall()
+                found = {file_id: (stale, result) for file_id, stale, result in rows}
+
+        page = []
+        for rank, file_id in enumerate(file_ids, offset + 1):
+            if file_id not in found:
+                continue
+            stale, result = found[file_id]
+            result = json.loads(result)
+            candidate = {field: result[field] for field in ROW_FIELDS if field in result}
+            candidate.update(file_id=file_id, rank=rank, stale=bool(stale), status='done')
+            page.append(candidate)
+        return page, total
+
+    def candidate(self, requisition_id: str, file_id: str) -> Optional[Dict[str, Any]]:
+        """Return one candidate's status, staleness and full result, or None if unknown."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT filename, status, stale, result FROM candidates WHERE requisition_id = ? AND file_id = ?",
+                (requisition_id, file_id)
+            ).fetchone()
+        if row is None:
+            return None
+        filename, status, stale, result = row
+        return {
+            'file_id': file_id,
+            'filename': filename,
+            'status': status,
+            'stale': bool(stale),
+            'result': json.loads(result) if result else None
+        }
+
+    def _load_index(self, conn: sqlite3.Connection, requisition_id: str, version: int) -> RankedIndex:
+        """Read a requisition's ranking from the database and keep it for later calls."""
+        rows = conn.execute(
+            "SELECT COALESCE(overall_score, 0), rowid, file_id FROM candidates "
+            "WHERE requisition_id = ? AND status = 'done'",
+            (requisition_id,)
+        ).fetchall()
+        index = RankedIndex(rows, version)
+        self._indexes[requisition_id] = index
+        return index
+
+    @staticmethod
+    def _requisition(row: Tuple[Any, ...], counts: List[Tuple[str, int, int]]) -> Dict[str, Any]:
+        """Build a requisition summary from its row and (status, count, stale) counts."""
+        requisition_id, title, criteria, key, created_at, updated_at = row
+        candidates = {status: 0 for status in CANDIDATE_STATUSES}
+        stale = 0
+        for status, count, stale_count in counts:
+            candidates[status] = count
+            stale += stale_count or 0
+        candidates['stale'] = stale
+        return {
+            'id': requisition_id,
+            'title': title,
+            'criteria': json.loads(criteria),
+            'criteria_key': key,
+            'candidates': candidates,
+            'created_at': created_at,
+            'updated_at': updated_at
+        }
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction and close it afterwards."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
@@ -0,0 +1,90 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Sub-scores every analysis reports, in weight vector order
+SUB_SCORES = ("skills_score", "experience_score", "education_score", "qualifications_score")
+
+
+def parse_weights(weights: Optional[Dict[str, Any]]) -> np.ndarray:
+    """Turn {sub-score: weight} into a weight vector that sums to 1.
+
+    Names may leave off the "_score" suffix ("skills" or "skills_score").
+    Sub-scores that are not named get weight 0; no weights at all means
+    equal weights.
+
+    Raises:
+        ValueError: If a name is unknown or a weight is negative, not a
+            number, or all weights are 0
+    """
+    if not weights:
+        return np.full(len(SUB_SCORES), 1.0 / len(SUB_SCORES))
+
+    vector = np.zeros(len(SUB_SCORES))
+    for name, weight in weights.items():
+        key = name if name.endswith('_score') else f"{name}_score"
+        if key not in SUB_SCORES:
+            raise ValueError(f"Unknown sub-score: {name}")
+        try:
+            weight = float(weight)
+        except (TypeError, ValueError):
+            raise ValueError(f"Weight for {name} must be a number")
+        if not np.isfinite(weight) or weight < 0:
+            raise ValueError(f"Weight for {name} must be zero or more")
+        vector[SUB_SCORES.index(key)] = weight
+
+    total = vector.sum()
+    if total <= 0:
+        raise ValueError("At least one weight must be above zero")
+    return vector / total
+
+
+def parse_weight_spec(spec: str) -> Dict[str, str]:
+    """Read weights written as "skills:3,experience:2" (as in a query string)."""
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, separator, weight = item.partition(':')
+        if not separator:
+            raise ValueError(f"Weights must look like skills:3,experience:1, not {item}")
+        weights[name.strip()] = weight.strip()
+    return weights
+
+
+def score_matrix(results: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Stack the sub-scores of analysis results into an (n, 4) array; missing scores count as 0."""
+    matrix = np.zeros((len(results), len(SUB_SCORES)))
+    for row, result in enumerate(results):
+        for column, name in enumerate(SUB_SCORES):
+            value = result.get(name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                matrix[row, column] = value
+    return matrix
+
+
+def rerank(matrix: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute weighted composite scores and the order they rank in.
+
+    Args:
+        matrix: (n, 4) sub-scores, rows in their current order
+        weights: Weight vector from parse_weights
+
+    Returns:
+        The composite score of each row (on the 0-100 scale of the
+        sub-scores) and the row indices from highest composite to lowest;
+        ties keep their current order
+    """
+    composite = np.nan_to_num(matrix) @ weights
+    order = np.argsort(-composite, kind='stable')
+    return composite, order
+
+
+def rerank_results(results: List[Dict[str, Any]], weights: np.ndarray) -> List[Dict[str, Any]]:
+    """Return results ordered by their weighted composite, each with a "weighted_score" entry."""
+    composite, order = rerank(score_matrix(results), weights)
+    ranked = []
+    for index in order:
+        result = results[index]
+        result['weighted_score'] = round(float(composite[index]), 1)
+        ranked.append(result)
+    return ranked
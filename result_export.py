@@ -0,0 +1,287 @@
+import csv
+import importlib.util
+import io
+import re
+import zipfile
+from typing import Any, Dict, Iterable, Iterator, List
+from xml.sax.saxutils import escape
+
+
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+
+MIMETYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+# Exported columns and their types; numbers stay numbers in xlsx and Parquet
+EXPORT_COLUMNS = [
+    ("Rank", "int"),
+    ("Filename", "text"),
+    ("Overall Score", "number"),
+    ("Match Score", "number"),
+    ("Interview Recommendation", "text"),
+    ("Skills Score", "number"),
+    ("Experience Score", "number"),
+    ("Education Score", "number"),
+    ("Qualifications Score", "number"),
+    ("Strengths", "text"),
+    ("Gaps & Concerns", "text"),
+    ("Interview Questions", "text"),
+    ("Summary", "text")
+]
+
+# Output is handed to the response in pieces of about this size
+FLUSH_BYTES = 64 * 1024
+
+# Rows per Parquet row group; one group is held in memory at a time
+PARQUET_ROW_GROUP = 1000
+
+XLSX_MAX_CELL_CHARS = 32767
+XLSX_COLUMN_LETTERS = [chr(ord('A') + index) for index in range(len(EXPORT_COLUMNS))]
+
+# Control characters are not allowed in XML
+ILLEGAL_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_RELATIONSHIP = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# Fixed parts of a one-sheet workbook; only the sheet itself is generated
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        f'<Relationships xmlns="{RELATIONSHIPS_NS}">'
+        f'<Relationship Id="rId1" Type="{OFFICE_RELATIONSHIP}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        f'<workbook xmlns="{SPREADSHEET_NS}" xmlns:r="{OFFICE_RELATIONSHIP}">'
+        '<sheets><sheet name="Results" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        f'<Relationships xmlns="{RELATIONSHIPS_NS}">'
+        f'<Relationship Id="rId1" Type="{OFFICE_RELATIONSHIP}/worksheet" Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{OFFICE_RELATIONSHIP}/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/styles.xml": (
+        f'<styleSheet xmlns="{SPREADSHEET_NS}">'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    )
+}
+
+
+def export_available(export_format: str) -> bool:
+    """Check whether a format can be written here (Parquet needs pyarrow)."""
+    if export_format == "parquet":
+        return importlib.util.find_spec("pyarrow") is not None
+    return export_format in EXPORT_FORMATS
+
+
+def export_rows(results: Iterable[Dict[str, Any]]) -> Iterator[List[Any]]:
+    """Turn analysis results into export rows, in order, skipping failed analyses."""
+    rank = 0
+    for result in results:
+        if 'error' in result:
+            continue
+        rank += 1
+        yield [
+            rank,
+            result.get('filename', 'Unknown'),
+            result.get('overall_score', 0),
+            result.get('local_score', ''),
+            result.get('interview_recommendation', result.get('recommendation', 'N/A')),
+            result.get('skills_score', 0),
+            result.get('experience_score', 0),
+            result.get('education_score', 0),
+            result.get('qualifications_score', 0),
+            '; '.join(result.get('strengths', [])),
+            '; '.join(result.get('weaknesses', [])),
+            '; '.join(result.get('interview_questions', [])),
+            result.get('summary', '')
+        ]
+
+
+def stream_export(export_format: str, rows: Iterable[List[Any]]) -> Iterator[bytes]:
+    """Encode export rows in the given format, yielding the file piece by piece.
+
+    Rows are read one at a time and written out every FLUSH_BYTES (or, for
+    Parquet, every row group), so memory use does not grow with the number
+    of rows and the first bytes go out before the last row is read.
+    """
+    if export_format == "xlsx":
+        return stream_xlsx(rows)
+    if export_format == "csv":
+        return stream_csv(rows)
+    if export_format == "parquet":
+        return stream_parquet(rows)
+    raise ValueError(f"Unknown export format: {export_format}")
+
+
+def write_export(path: str, export_format: str, results: Iterable[Dict[str, Any]]) -> None:
+    """Write analysis results to a file in the given format."""
+    with open(path, 'wb') as output:
+        for chunk in stream_export(export_format, export_rows(results)):
+            output.write(chunk)
+
+
+def stream_csv(rows: Iterable[List[Any]]) -> Iterator[bytes]:
+    """Yield a UTF-8 CSV of the rows, with a byte order mark so Excel reads it as UTF-8."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def stream_xlsx(rows: Iterable[List[Any]]) -> Iterator[bytes]:
+    """Yield an xlsx workbook with one sheet holding the rows.
+
+    The sheet XML is generated row by row straight into a zip stream that
+    is never seeked, so nothing is buffered on disk or held whole in memory.
+    Strings are written inline rather than through a shared strings table,
+    which would need every row before the first could be written.
+    """
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, XML_DECLARATION + content)
+        yield sink.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                f'{XML_DECLARATION}<worksheet xmlns="{SPREADSHEET_NS}"><sheetData>'.encode('utf-8')
+            )
+            sheet.write(_xlsx_row(1, [name for name, _ in EXPORT_COLUMNS], style=1))
+            for number, row in enumerate(rows, 2):
+                sheet.write(_xlsx_row(number, row))
+                if sink.pending >= FLUSH_BYTES:
+                    yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    # Closing the archive writes its central directory
+    yield sink.drain()
+
+
+def stream_parquet(rows: Iterable[List[Any]]) -> Iterator[bytes]:
+    """Yield a Parquet file of the rows, one row group at a time.
+
+    Needs the optional pyarrow package (pip install pyarrow).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"int": pa.int64(), "number": pa.float64(), "text": pa.string()}
+    schema = pa.schema([(name, types[kind]) for name, kind in EXPORT_COLUMNS])
+
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        group: List[List[Any]] = []
+        for row in rows:
+            group.append(row)
+            if len(group) >= PARQUET_ROW_GROUP:
+                writer.write_table(_parquet_table(pa, schema, group))
+                group = []
+                yield sink.drain()
+        if group:
+            writer.write_table(_parquet_table(pa, schema, group))
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _parquet_table(pa, schema, rows: List[List[Any]]):
+    """Build a pyarrow table from export rows, with blanks in non-numeric number cells."""
+    columns = []
+    for index, (_, kind) in enumerate(EXPORT_COLUMNS):
+        values = [row[index] for row in rows]
+        if kind == "text":
+            values = [None if value is None else str(value) for value in values]
+        else:
+            values = [value if _is_number(value) else None for value in values]
+        columns.append(values)
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _xlsx_row(number: int, values: List[Any], style: int = 0) -> bytes:
+    """Render one worksheet row as XML."""
+    style_attr = f' s="{style}"' if style else ''
+    cells = []
+    for column, value in zip(XLSX_COLUMN_LETTERS, values):
+        reference = f'{column}{number}'
+        if value is None or value == '':
+            continue
+        if _is_number(value):
+            cells.append(f'<c r="{reference}"{style_attr}><v>{value}</v></c>')
+        else:
+            text = ILLEGAL_XML_CHARS.sub('', str(value))[:XLSX_MAX_CELL_CHARS]
+            cells.append(
+                f'<c r="{reference}"{style_attr} t="inlineStr"><is><t xml:space="preserve">'
+                f'{escape(text)}</t></is></c>'
+            )
+    return f'<row r="{number}">{"".join(cells)}</row>'.encode('utf-8')
+
+
+def _is_number(value: Any) -> bool:
+    """Check for an int or float that is not a bool."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _StreamSink(io.RawIOBase):
+    """Write-only, unseekable file that collects written bytes until drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.pending = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        self.pending += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """Return and forget everything written since the last drain."""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.pending = 0
+        return data
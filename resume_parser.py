@@ -1,22 +1,111 @@
+import io
 import os
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
 import PyPDF2
 from docx import Document
 
+from search_index import SearchIndex
+from text_cache import TextCache
+
+
+# Bump when extraction output changes so cached text is not reused
+PARSER_VERSION = "1"
+
+# Process pool shared by every parse_many call in this process
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Return the shared extraction pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next batch starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _parse_in_worker(
+    file_content: bytes,
+    filename: str
+) -> Tuple[Optional[str], Optional[str], float]:
+    """Extract text in a pool worker.
+
+    Returns (text, error, seconds) instead of raising.
+    """
+    start = time.perf_counter()
+    try:
+        text = ResumeParser._extract_text(io.BytesIO(file_content), filename)
+    except Exception as e:
+        return None, str(e), time.perf_counter() - start
+
+    if not text:
+        return None, "No text could be extracted", time.perf_counter() - start
+    return text, None, time.perf_counter() - start
+
 
 class ResumeParser:
     """Parse text content from PDF and DOCX resume files."""
 
+    # Extracted text keyed by file content hash, shared by all instances
+    cache = TextCache.from_env(PARSER_VERSION)
+
+    # Archive of every parsed resume for similarity search, or None; the
+    # web app sets one up with SearchIndex.from_env
+    search_index: Optional[SearchIndex] = None
+
+    @classmethod
+    def _index(cls, text: Optional[str], filename: str) -> None:
+        """Add parsed text to the search index, if there is one; indexing never fails a parse."""
+        if cls.search_index is None or not text:
+            return
+        try:
+            cls.search_index.add(text, os.path.basename(filename))
+        except Exception as e:
+            print(f"Error adding {filename} to the search index: {e}")
+
+    @staticmethod
+    def _read_pdf(source: Any) -> str:
+        """Extract text from a PDF path or binary stream, raising on failure."""
+        pdf_reader = PyPDF2.PdfReader(source)
+        return "\n".join(page.extract_text() for page in pdf_reader.pages).strip()
+
+    @staticmethod
+    def _read_docx(source: Any) -> str:
+        """Extract text from a DOCX path or binary stream, raising on failure."""
+        doc = Document(source)
+        return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
+
+    @classmethod
+    def _extract_text(cls, source: Any, filename: str) -> str:
+        """Extract text based on the file extension, raising on failure."""
+        file_extension = os.path.splitext(filename)[1].lower()
+
+        if file_extension == '.pdf':
+            return cls._read_pdf(source)
+        elif file_extension in ['.docx', '.doc']:
+            return cls._read_docx(source)
+        raise ValueError(f"Unsupported file format: {file_extension}")
+
     @staticmethod
     def extract_text_from_pdf(file_path: str) -> Optional[str]:
         """Extract text from a PDF file."""
         try:
-            text = ""
             with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text.strip()
+                return ResumeParser._read_pdf(file)
         except Exception as e:
             print(f"Error reading PDF file {file_path}: {e}")
             return None
@@ -25,13 +114,7 @@ class ResumeParser:
     def extract_text_from_pdf_bytes(file_content: bytes) -> Optional[str]:
         """Extract text from PDF bytes in memory."""
         try:
-            import io
-            text = ""
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            return ResumeParser._read_pdf(io.BytesIO(file_content))
         except Exception as e:
             print(f"Error reading PDF from bytes: {e}")
             return None
@@ -40,11 +123,7 @@ class ResumeParser:
     def extract_text_from_docx(file_path: str) -> Optional[str]:
         """Extract text from a DOCX file."""
         try:
-            doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+            return ResumeParser._read_docx(file_path)
         except Exception as e:
             print(f"Error reading DOCX file {file_path}: {e}")
             return None
@@ -53,13 +132,7 @@ class ResumeParser:
     def extract_text_from_docx_bytes(file_content: bytes) -> Optional[str]:
         """Extract text from DOCX bytes in memory."""
         try:
-            import io
-            doc_file = io.BytesIO(file_content)
-            doc = Document(doc_file)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+            return ResumeParser._read_docx(io.BytesIO(file_content))
         except Exception as e:
             print(f"Error reading DOCX from bytes: {e}")
             return None
@@ -71,25 +144,119 @@ class ResumeParser:
             print(f"File not found: {file_path}")
             return None
 
+        with open(file_path, 'rb') as file:
+            file_content = file.read()
+        cache_key = cls.cache.key(file_content, file_path)
+        cached_text = cls.cache.get(cache_key)
+        if cached_text is not None:
+            cls._index(cached_text, file_path)
+            return cached_text
+
         file_extension = os.path.splitext(file_path)[1].lower()
+        start = time.perf_counter()
 
         if file_extension == '.pdf':
-            return cls.extract_text_from_pdf(file_path)
+            text = cls.extract_text_from_pdf(file_path)
         elif file_extension in ['.docx', '.doc']:
-            return cls.extract_text_from_docx(file_path)
+            text = cls.extract_text_from_docx(file_path)
         else:
             print(f"Unsupported file format: {file_extension}")
             return None
 
+        if text:
+            cls.cache.put(cache_key, text, time.perf_counter() - start)
+            cls._index(text, file_path)
+        return text
+
     @classmethod
     def parse_resume_from_bytes(cls, file_content: bytes, filename: str) -> Optional[str]:
         """Parse resume from bytes in memory."""
+        cache_key = cls.cache.key(file_content, filename)
+        cached_text = cls.cache.get(cache_key)
+        if cached_text is not None:
+            cls._index(cached_text, filename)
+            return cached_text
+
         file_extension = os.path.splitext(filename)[1].lower()
+        start = time.perf_counter()
 
         if file_extension == '.pdf':
-            return cls.extract_text_from_pdf_bytes(file_content)
+            text = cls.extract_text_from_pdf_bytes(file_content)
         elif file_extension in ['.docx', '.doc']:
-            return cls.extract_text_from_docx_bytes(file_content)
+            text = cls.extract_text_from_docx_bytes(file_content)
         else:
             print(f"Unsupported file format: {file_extension}")
             return None
+
+        if text:
+            cls.cache.put(cache_key, text, time.perf_counter() - start)
+            cls._index(text, filename)
+        return text
+
+    @classmethod
+    def parse_many(
+        cls,
+        files: Iterable[Tuple[str, Union[str, bytes]]]
+    ) -> Iterator[Dict[str, Any]]:
+        """Parse a batch of resumes in parallel across CPU cores.
+
+        Extraction runs in a process pool sized to the machine's cores and
+        shared by all calls, so PDF parsing is not serialized by the GIL.
+        Extracted text is added to the search index, if one is set.
+
+        Args:
+            files: (filename, source) pairs where source is a file path or the
+                raw file bytes. The filename's extension selects the parser.
+
+        Yields:
+            One dictionary per file, in completion order, with keys 'index'
+            (position in `files`), 'filename', 'text' and 'error'. Exactly one
+            of 'text' and 'error' is None.
+        """
+        pool = None
+        futures = {}
+
+        for index, (filename, source) in enumerate(files):
+            try:
+                if isinstance(source, bytes):
+                    file_content = source
+                else:
+                    with open(source, 'rb') as file:
+                        file_content = file.read()
+            except OSError as e:
+                yield {'index': index, 'filename': filename, 'text': None, 'error': str(e)}
+                continue
+
+            # Cached files are answered immediately without touching the pool
+            cache_key = cls.cache.key(file_content, filename)
+            cached_text = cls.cache.get(cache_key)
+            if cached_text is not None:
+                cls._index(cached_text, filename)
+                yield {'index': index, 'filename': filename, 'text': cached_text, 'error': None}
+                continue
+
+            if pool is None:
+                pool = _get_pool()
+            future = pool.submit(_parse_in_worker, file_content, filename)
+            futures[future] = (index, filename, cache_key)
+
+        for future in as_completed(futures):
+            index, filename, cache_key = futures[future]
+            try:
+                text, error, seconds = future.result()
+            except BrokenProcessPool as e:
+                _reset_pool(pool)
+                text, error = None, f"Parser process failed: {e}"
+            except Exception as e:
+                text, error = None, str(e)
+            else:
+                if text:
+                    cls.cache.put(cache_key, text, seconds)
+                    cls._index(text, filename)
+
+            yield {
+                'index': index,
+                'filename': filename,
+                'text': text,
+                'error': error
+            }
@@ -2,12 +2,14 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
 import threading
-from typing import List, Dict, Any
-import pandas as pd
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 from resume_parser import ResumeParser
 from ai_analyzer import AIAnalyzer
+from prefilter import local_scores, shortlist
+from result_export import EXPORT_FORMATS, export_available, write_export
+from reranker import SUB_SCORES, parse_weights, rerank_results
 
 
 class ResumeScreeningApp:
@@ -171,6 +173,18 @@ class ResumeScreeningApp:
 
         ttk.Button(upload_frame, text="Select Resume Files", command=self.select_files).pack(pady=5)
 
+        # Local keyword pre-ranking before the AI analysis
+        prefilter_frame = ttk.Frame(upload_frame)
+        prefilter_frame.pack(pady=5)
+
+        ttk.Label(prefilter_frame, text="Send only the top K to the AI:").pack(side=tk.LEFT, padx=5)
+        self.top_k_entry = ttk.Entry(prefilter_frame, width=6)
+        self.top_k_entry.pack(side=tk.LEFT, padx=5)
+
+        ttk.Label(prefilter_frame, text="Minimum match score (0-100):").pack(side=tk.LEFT, padx=5)
+        self.min_score_entry = ttk.Entry(prefilter_frame, width=6)
+        self.min_score_entry.pack(side=tk.LEFT, padx=5)
+
         # Analyze Button
         ttk.Button(frame, text="Analyze Resumes", command=self.start_analysis).pack(fill='x', pady=10)
 
@@ -179,8 +193,22 @@ class ResumeScreeningApp:
         frame = ttk.Frame(self.tab_results, padding="20")
         frame.pack(fill='both', expand=True)
 
+        # Sub-score weights; re-ranking uses the stored scores, so it needs no new analysis
+        weights_frame = ttk.LabelFrame(frame, text="Re-rank by Weights", padding="10")
+        weights_frame.pack(side=tk.TOP, fill='x', pady=(0, 10))
+
+        self.weight_vars = {}
+        for name in SUB_SCORES:
+            label = name.replace('_score', '').capitalize()
+            ttk.Label(weights_frame, text=f"{label}:").pack(side=tk.LEFT)
+            self.weight_vars[name] = tk.StringVar(value="1")
+            ttk.Spinbox(
+                weights_frame, from_=0, to=10, increment=0.5, width=5, textvariable=self.weight_vars[name]
+            ).pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Button(weights_frame, text="Re-rank", command=self.rerank_by_weights).pack(side=tk.LEFT)
+
         # Results table
-        columns = ('Rank', 'Name', 'Score', 'Skills', 'Experience', 'Education', 'Recommendation')
+        columns = ('Rank', 'Name', 'Score', 'Match', 'Skills', 'Experience', 'Education', 'Recommendation')
         self.results_tree = ttk.Treeview(frame, columns=columns, show='headings', height=15)
 
         for col in columns:
@@ -273,37 +301,77 @@ class ResumeScreeningApp:
 
         provider = self.provider_var.get()
 
+        try:
+            top_k = self.top_k_entry.get().strip()
+            top_k = int(top_k) if top_k else None
+            min_score = self.min_score_entry.get().strip()
+            min_score = float(min_score) if min_score else None
+        except ValueError:
+            messagebox.showerror("Error", "Top K and minimum match score must be numbers")
+            return
+
         # Disable button and show progress
         self.status_bar.config(text="Analyzing resumes... Please wait")
         self.root.update()
 
         # Run analysis in thread
-        thread = threading.Thread(target=self.analyze_resumes, args=(api_key, criteria, provider))
+        thread = threading.Thread(
+            target=self.analyze_resumes, args=(api_key, criteria, provider, top_k, min_score)
+        )
         thread.start()
 
-    def analyze_resumes(self, api_key: str, criteria: Dict[str, Any], provider: str):
+    def analyze_resumes(
+        self,
+        api_key: str,
+        criteria: Dict[str, Any],
+        provider: str,
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None
+    ):
         """Analyze all resumes (runs in background thread)."""
         try:
             self.analyzer = AIAnalyzer(api_key, provider)
             parser = ResumeParser()
             self.analysis_results = []
 
-            for i, resume_path in enumerate(self.resumes, 1):
+            # Parse all resumes in parallel before analysis
+            self.root.after(0, lambda: self.status_bar.config(
+                text=f"Parsing {len(self.resumes)} resume(s)..."
+            ))
+            resume_texts = {}
+            for outcome in parser.parse_many(
+                (os.path.basename(path), path) for path in self.resumes
+            ):
+                if outcome['text']:
+                    resume_texts[outcome['index']] = outcome['text']
+
+            # Rank locally by keyword match and keep the shortlist for the AI
+            indices = sorted(resume_texts)
+            scores = local_scores([resume_texts[index] for index in indices], criteria)
+            kept = [indices[i] for i in shortlist(scores, top_k=top_k, min_score=min_score)]
+            match_scores = dict(zip(indices, scores))
+            skipped = len(indices) - len(kept)
+
+            for i, index in enumerate(kept, 1):
                 self.root.after(0, lambda idx=i: self.status_bar.config(
-                    text=f"Analyzing resume {idx}/{len(self.resumes)}..."
+                    text=f"Analyzing resume {idx}/{len(kept)}..."
                 ))
 
-                # Parse resume
-                resume_text = parser.parse_resume(resume_path)
-                if not resume_text:
-                    continue
+                resume_path = self.resumes[index]
 
-                # Analyze with AI
-                result = self.analyzer.analyze_resume(resume_text, criteria)
+                # Analyze with AI, showing the score as soon as it streams in
+                for event in self.analyzer.analyze_resume_stream(resume_texts[index], criteria):
+                    if event['type'] == 'field' and event['field'] == 'overall_score':
+                        self.root.after(0, lambda idx=i, score=event['value']: self.status_bar.config(
+                            text=f"Analyzing resume {idx}/{len(kept)}... score {score}%, writing details"
+                        ))
+                    elif event['type'] == 'result':
+                        result = event['result']
 
                 # Add metadata
                 result['filename'] = os.path.basename(resume_path)
                 result['filepath'] = resume_path
+                result['local_score'] = match_scores[index]
 
                 self.analysis_results.append(result)
 
@@ -314,6 +382,7 @@ class ResumeScreeningApp:
             self.root.after(0, self.display_results)
             self.root.after(0, lambda: self.status_bar.config(
                 text=f"Analysis complete! {len(self.analysis_results)} resumes analyzed"
+                     + (f", {skipped} skipped by keyword pre-filter" if skipped else "")
             ))
 
         except Exception as e:
@@ -331,13 +400,31 @@ class ResumeScreeningApp:
             self.results_tree.insert('', tk.END, values=(
                 rank,
                 result.get('filename', 'Unknown'),
-                f"{result.get('overall_score', 0)}%",
+                f"{result.get('overall_score', 0)}%"
+                + (f" ({result['weighted_score']})" if 'weighted_score' in result else ""),
+                result.get('local_score', ''),
                 f"{result.get('skills_score', 0)}%",
                 f"{result.get('experience_score', 0)}%",
                 f"{result.get('education_score', 0)}%",
                 result.get('recommendation', 'N/A')
             ))
 
+    def rerank_by_weights(self):
+        """Re-order the results by the weighted sum of their sub-scores."""
+        if not self.analysis_results:
+            messagebox.showwarning("Warning", "No results to re-rank")
+            return
+
+        try:
+            weights = parse_weights({name: var.get() for name, var in self.weight_vars.items()})
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        self.analysis_results = rerank_results(self.analysis_results, weights)
+        self.display_results()
+        self.status_bar.config(text=f"Re-ranked {len(self.analysis_results)} candidate(s) by custom weights")
+
     def on_result_select(self, event):
         """Handle result selection."""
         selection = self.results_tree.selection()
@@ -432,44 +519,27 @@ STRENGTHS:
             messagebox.showwarning("Warning", "No results to export")
             return
 
-        # Prepare data
-        data = []
-        for result in self.analysis_results:
-            data.append({
-                'Rank': 0,  # Will be filled
-                'Filename': result.get('filename', 'Unknown'),
-                'Overall Score': result.get('overall_score', 0),
-                'Interview Recommendation': result.get('interview_recommendation', result.get('recommendation', 'N/A')),
-                'Skills Score': result.get('skills_score', 0),
-                'Experience Score': result.get('experience_score', 0),
-                'Education Score': result.get('education_score', 0),
-                'Qualifications Score': result.get('qualifications_score', 0),
-                'Strengths': '; '.join(result.get('strengths', [])),
-                'Gaps & Concerns': '; '.join(result.get('weaknesses', [])),
-                'Interview Questions': '; '.join(result.get('interview_questions', [])),
-                'Summary': result.get('summary', '')
-            })
-
-        # Add rank
-        for i, row in enumerate(data, 1):
-            row['Rank'] = i
-
-        df = pd.DataFrame(data)
-
         # Save file
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         default_filename = f"resume_screening_results_{timestamp}.xlsx"
 
+        filetypes = [("Excel Files", "*.xlsx"), ("CSV Files", "*.csv")]
+        if export_available("parquet"):
+            filetypes.append(("Parquet Files", "*.parquet"))
         filepath = filedialog.asksaveasfilename(
             title="Save Results",
             defaultextension=".xlsx",
             initialfile=default_filename,
-            filetypes=[("Excel Files", "*.xlsx")]
+            filetypes=filetypes
         )
 
         if filepath:
+            export_format = os.path.splitext(filepath)[1].lstrip('.').lower()
+            if export_format not in EXPORT_FORMATS:
+                export_format = 'xlsx'
             try:
-                df.to_excel(filepath, index=False)
+                # Rows are written as they are encoded; no DataFrame in between
+                write_export(filepath, export_format, self.analysis_results)
                 messagebox.showinfo("Success", f"Results exported to {filepath}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to export: {str(e)}")
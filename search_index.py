@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Archive-wide similarity search over every resume the app has parsed.
+
+Resumes are added as ResumeParser extracts them, so past screenings can be
+searched with a new job description without calling the AI again. To add an
+existing archive of files and try a query from the command line:
+
+    python search_index.py index path/to/resumes
+    python search_index.py search "Senior data analyst, SQL and Tableau" --top-k 10
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from prefilter import tokenize
+
+
+# Word unigrams and bigrams are hashed into 2**20 buckets
+FEATURE_BITS = 20
+N_FEATURES = 1 << FEATURE_BITS
+FEATURE_MASK = N_FEATURES - 1
+
+# Flat files holding the vectors of all resumes, appended to in order
+FEATURES_FILE = "features.i4"   # hashed feature IDs of every resume, back to back
+WEIGHTS_FILE = "weights.f4"     # the weight of each of those features
+OFFSETS_FILE = "offsets.i8"     # where each resume's features start, plus the end of the last
+DF_FILE = "df.i4"               # how many resumes contain each feature
+DATABASE_FILE = "documents.sqlite3"
+
+DEFAULT_TOP_K = 20
+
+# Feature entries scored per step of a search; bounds the temporary arrays
+SCAN_BLOCK = 1 << 20
+
+
+def text_key(text: str) -> str:
+    """Return the key a resume is stored under: a hash of its text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def hashed_features(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Turn text into a sparse unit vector of hashed word unigrams and bigrams.
+
+    Returns:
+        Sorted distinct feature IDs and their weights (1 + log of the count,
+        scaled to unit length); both empty when the text has no words
+    """
+    tokens = tokenize(text)
+    grams = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+    if not grams:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    ids = np.fromiter(
+        (zlib.crc32(gram.encode('utf-8')) & FEATURE_MASK for gram in grams), dtype=np.int32, count=len(grams)
+    )
+    features, counts = np.unique(ids, return_counts=True)
+    weights = 1 + np.log(counts)
+    weights /= np.linalg.norm(weights)
+    return features, weights.astype(np.float32)
+
+
+class SearchIndex:
+    """Top-k cosine search of a job description against an archive of resumes.
+
+    Each distinct resume text is stored once, as a sparse vector of hashed
+    word unigrams and bigrams appended to flat files that searches read
+    through np.memmap, so the archive is never loaded into memory. A search
+    scores every resume in one vectorized pass over those files, with the
+    query's terms weighted by how rare they are in the archive.
+
+    The file name and first line of each resume are kept in SQLite. Its
+    write lock also serializes appends from several processes, and a resume
+    only counts once its row is committed; anything a failed write left at
+    the end of the files is cut off by the next write.
+    """
+
+    def __init__(self, directory: str):
+        """Initialize the index, creating its files if needed.
+
+        Args:
+            directory: Where the vector files and the database are kept
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._view: Optional[Tuple[int, np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    row INTEGER PRIMARY KEY,
+                    key TEXT NOT NULL UNIQUE,
+                    filename TEXT,
+                    title TEXT,
+                    added_at REAL NOT NULL
+                )
+            """)
+        if not os.path.exists(self._path(DF_FILE)):
+            with open(self._path(DF_FILE), 'wb') as file:
+                file.truncate(N_FEATURES * 4)
+
+    @classmethod
+    def from_env(cls, default_directory: str) -> Optional["SearchIndex"]:
+        """Create an index in SEARCH_INDEX_DIR, or default_directory.
+
+        Returns None when SEARCH_INDEX_DIR is set to an empty string.
+        """
+        directory = os.environ.get('SEARCH_INDEX_DIR', default_directory)
+        return cls(directory) if directory else None
+
+    def add(self, text: str, filename: str = '') -> bool:
+        """Index one resume's text; return False if it was already indexed or has no words."""
+        return self.add_many([(text, filename)]) == 1
+
+    def add_many(self, resumes: Iterable[Tuple[str, str]]) -> int:
+        """Index several resumes at once, given as (text, filename) pairs.
+
+        Returns:
+            How many were added; texts already indexed are skipped
+        """
+        pending: Dict[str, Tuple[str, str]] = {}
+        for text, filename in resumes:
+            if text:
+                pending.setdefault(text_key(text), (text, filename))
+        if not pending:
+            return 0
+        # Cheap check first, so texts parsed again are not vectorized again
+        known = self._known(list(pending))
+        pending = {key: item for key, item in pending.items() if key not in known}
+
+        vectors = []
+        for key, (text, filename) in pending.items():
+            features, weights = hashed_features(text)
+            if len(features):
+                vectors.append((key, filename, self._title(text), features, weights))
+        if not vectors:
+            return 0
+
+        now = time.time()
+        with self._connect() as conn:
+            # Take the write lock before touching the files
+            conn.execute("BEGIN IMMEDIATE")
+            known = self._known([key for key, *_ in vectors], conn)
+            vectors = [vector for vector in vectors if vector[0] not in known]
+            if not vectors:
+                return 0
+            count = self._count(conn)
+            end = self._truncate(count)
+
+            offsets = end + np.cumsum([len(features) for *_, features, _ in vectors], dtype=np.int64)
+            all_features = np.concatenate([features for *_, features, _ in vectors])
+            with open(self._path(FEATURES_FILE), 'ab') as file:
+                file.write(all_features.tobytes())
+            with open(self._path(WEIGHTS_FILE), 'ab') as file:
+                file.write(np.concatenate([weights for *_, weights in vectors]).tobytes())
+            with open(self._path(OFFSETS_FILE), 'ab') as file:
+                file.write(offsets.tobytes())
+
+            # Counts may run slightly ahead if the commit below fails, which
+            # only nudges the rarity weights
+            document_frequencies = np.memmap(self._path(DF_FILE), dtype=np.int32, mode='r+')
+            features, counts = np.unique(all_features, return_counts=True)
+            document_frequencies[features] += counts.astype(np.int32)
+            del document_frequencies
+
+            conn.executemany(
+                "INSERT INTO documents (row, key, filename, title, added_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (count + index, key, filename, title, now)
+                    for index, (key, filename, title, _, _) in enumerate(vectors)
+                ]
+            )
+        return len(vectors)
+
+    def search(self, query: str, top_k: int = DEFAULT_TOP_K) -> List[Dict[str, Any]]:
+        """Find the resumes most similar to a query, such as a job description.
+
+        Returns:
+            Up to top_k hits, best first, each with key, filename, title,
+            added_at and score (cosine similarity, 0 to 1)
+        """
+        features, weights = hashed_features(query)
+        count, offsets, document_features, document_weights, document_frequencies = self._open()
+        if not count or not len(features) or top_k < 1:
+            return []
+
+        # Rare terms count for more; the resume side stays unweighted so
+        # adding resumes never changes the stored vectors
+        weights = weights * (1 + np.log((1 + count) / (1 + document_frequencies[features])))
+        query_vector = np.zeros(N_FEATURES, dtype=np.float32)
+        query_vector[features] = weights / np.linalg.norm(weights)
+
+        # Score SCAN_BLOCK feature entries at a time, cut at resume boundaries
+        scores = np.empty(count, dtype=np.float32)
+        first = 0
+        while first < count:
+            last = int(np.searchsorted(offsets, offsets[first] + SCAN_BLOCK, side='right')) - 1
+            last = min(count, max(last, first + 1))
+            start, stop = offsets[first], offsets[last]
+            contributions = query_vector[document_features[start:stop]] * document_weights[start:stop]
+            scores[first:last] = np.add.reduceat(contributions, offsets[first:last] - start)
+            first = last
+
+        top_k = min(top_k, count)
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+
+        rows = [int(row) for row in best]
+        with self._connect() as conn:
+            found = {
+                row: (key, filename, title, added_at)
+                for row, key, filename, title, added_at in conn.execute(
+                    f"SELECT row, key, filename, title, added_at FROM documents "
+                    f"WHERE row IN ({', '.join('?' * len(rows))})",
+                    rows
+                )
+            }
+        hits = []
+        for row in rows:
+            key, filename, title, added_at = found[row]
+            hits.append({
+                'key': key,
+                'filename': filename,
+                'title': title,
+                'added_at': added_at,
+                'score': round(float(scores[row]), 4)
+            })
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        """Report how many resumes are indexed and the size of the vector files."""
+        with self._connect() as conn:
+            count = self._count(conn)
+        size = sum(
+            os.path.getsize(self._path(name))
+            for name in (FEATURES_FILE, WEIGHTS_FILE, OFFSETS_FILE, DF_FILE)
+            if os.path.exists(self._path(name))
+        )
+        return {'documents': count, 'bytes': size}
+
+    def _open(self) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return (count, offsets, features, weights, document frequencies) mapped for reading.
+
+        The files are mapped again only when resumes were added since the
+        last call, by this or another process.
+        """
+        with self._connect() as conn:
+            count = self._count(conn)
+        with self._lock:
+            if self._view is not None and self._view[0] == count:
+                return self._view
+            document_frequencies = np.memmap(self._path(DF_FILE), dtype=np.int32, mode='r')
+            if not count:
+                empty = np.zeros(0, dtype=np.int64)
+                return 0, empty, empty, empty, document_frequencies
+            offsets = np.memmap(self._path(OFFSETS_FILE), dtype=np.int64, mode='r', shape=(count + 1,))
+            end = int(offsets[count])
+            features = np.memmap(self._path(FEATURES_FILE), dtype=np.int32, mode='r', shape=(end,))
+            weights = np.memmap(self._path(WEIGHTS_FILE), dtype=np.float32, mode='r', shape=(end,))
+            self._view = (count, offsets, features, weights, document_frequencies)
+            return self._view
+
+    def _truncate(self, count: int) -> int:
+        """Cut the vector files back to the first count resumes and return where their features end."""
+        offsets_path = self._path(OFFSETS_FILE)
+        with open(offsets_path, 'ab') as file:
+            if file.tell() < 8:
+                file.truncate(0)
+                file.write(np.zeros(1, dtype=np.int64).tobytes())
+        with open(offsets_path, 'r+b') as file:
+            file.truncate((count + 1) * 8)
+            file.seek(count * 8)
+            end = int(np.frombuffer(file.read(8), dtype=np.int64)[0])
+        for name, item_size in ((FEATURES_FILE, 4), (WEIGHTS_FILE, 4)):
+            with open(self._path(name), 'ab') as file:
+                file.truncate(end * item_size)
+        return end
+
+    def _known(self, keys: List[str], conn: Optional[sqlite3.Connection] = None) -> set:
+        """Return which of the keys are indexed already."""
+        if conn is None:
+            with self._connect() as conn:
+                return self._known(keys, conn)
+        known = set()
+        # Stay well under SQLite's limit on query parameters
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            known.update(row[0] for row in conn.execute(
+                f"SELECT key FROM documents WHERE key IN ({', '.join('?' * len(batch))})", batch
+            ))
+        return known
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection) -> int:
+        """Return the number of committed resumes (rows are numbered from 0)."""
+        return conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM documents").fetchone()[0]
+
+    @staticmethod
+    def _title(text: str) -> str:
+        """Return the first non-empty line of a resume, usually the candidate's name."""
+        for line in text.splitlines():
+            if line.strip():
+                return line.strip()[:120]
+        return ''
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction and close it afterwards."""
+        conn = sqlite3.connect(self._path(DATABASE_FILE), timeout=30)
+        # The index can be rebuilt from the resumes, so commits skip the fsync
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search every resume parsed so far by similarity to a job description")
+    parser.add_argument('--index', default=os.environ.get('SEARCH_INDEX_DIR') or os.path.join('cache', 'search_index'),
+                        help='Directory holding the index')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    index_command = commands.add_parser('index', help='Parse and index PDF/DOCX resumes under directories')
+    index_command.add_argument('paths', nargs='+')
+
+    search_command = commands.add_parser('search', help='Find the resumes most similar to a job description')
+    search_command.add_argument('query', help='Job description text, or @file to read it from a file')
+    search_command.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+
+    args = parser.parse_args()
+    index = SearchIndex(args.index)
+
+    if args.command == 'index':
+        from resume_parser import ResumeParser
+
+        files = []
+        for path in args.paths:
+            for root, _, names in os.walk(path):
+                files.extend(
+                    os.path.join(root, name) for name in names
+                    if os.path.splitext(name)[1].lower() in ('.pdf', '.docx', '.doc')
+                )
+        before = index.stats()['documents']
+        ResumeParser.search_index = index
+        failed = 0
+        for outcome in ResumeParser.parse_many((os.path.basename(file), file) for file in files):
+            if outcome['error']:
+                failed += 1
+                print(f"Could not parse {files[outcome['index']]}: {outcome['error']}")
+        added = index.stats()['documents'] - before
+        print(f"Indexed {added} new resume(s) from {len(files)} file(s), {failed} failed")
+    else:
+        query = args.query
+        if query.startswith('@'):
+            with open(query[1:], encoding='utf-8') as file:
+                query = file.read()
+        start = time.perf_counter()
+        hits = index.search(query, top_k=args.top_k)
+        elapsed = time.perf_counter() - start
+        for rank, hit in enumerate(hits, 1):
+            print(f"{rank:3d}. {hit['score']:.3f}  {hit['filename']}  {hit['title']}")
+        print(f"{len(hits)} hit(s) from {index.stats()['documents']} resume(s) in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
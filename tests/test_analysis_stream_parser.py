@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from ai_analyzer import AIAnalyzer, AnalysisStreamParser
+
+
+RESPONSE = """OVERALL SCORE: 82%
+INTERVIEW RECOMMENDATION: Yes - strong fit
+
+SKILLS MATCH: 78/100
+EXPERIENCE ASSESSMENT: 85
+EDUCATION ASSESSMENT: 70 out of 100
+KEY QUALIFICATIONS MATCH: 90
+
+STRENGTHS:
+- Eight years of SQL reporting
+• Led the data warehouse migration
+1. Mentors junior analysts
+
+GAPS & CONCERNS:
+- No Tableau certification
+This line is not a bullet
+
+INTERVIEW QUESTIONS:
+- How did you plan the migration?
+2. Which KPIs did you own?
+
+SUMMARY:
+A strong analyst
+with leadership experience.
+"""
+
+
+@pytest.fixture
+def extract_score():
+    return AIAnalyzer('test-key')._extract_score
+
+
+def parse(extract_score, chunks):
+    """Feed chunks to a parser and return (result, fields in completion order)."""
+    parser = AnalysisStreamParser(extract_score)
+    completed = []
+    for chunk in chunks:
+        completed += parser.feed(chunk)
+    completed += parser.close()
+    return parser.result, completed
+
+
+def test_parses_every_field(extract_score):
+    result, _ = parse(extract_score, [RESPONSE])
+    assert result['overall_score'] == 82
+    assert result['skills_score'] == 78
+    assert result['experience_score'] == 85
+    assert result['education_score'] == 70
+    assert result['qualifications_score'] == 90
+    assert result['interview_recommendation'] == result['recommendation'] == 'Yes - strong fit'
+    assert result['strengths'] == [
+        'Eight years of SQL reporting', 'Led the data warehouse migration', 'Mentors junior analysts'
+    ]
+    assert result['weaknesses'] == ['No Tableau certification']
+    assert result['interview_questions'] == ['How did you plan the migration?', 'Which KPIs did you own?']
+    assert result['summary'] == 'A strong analyst with leadership experience.'
+    assert result['detailed_analysis'] == RESPONSE
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 64])
+def test_chunk_boundaries_do_not_change_the_result(extract_score, size):
+    whole, whole_completed = parse(extract_score, [RESPONSE])
+    chunked, chunked_completed = parse(extract_score, [RESPONSE[i:i + size] for i in range(0, len(RESPONSE), size)])
+    assert chunked == whole
+    assert chunked_completed == whole_completed
+
+
+def test_score_is_final_only_once_its_line_ends(extract_score):
+    parser = AnalysisStreamParser(extract_score)
+    assert parser.feed("OVERALL SCORE: 8") == []
+    assert parser.feed("2\nSKILLS") == ['overall_score']
+    assert parser.result['overall_score'] == 82
+
+
+def test_lists_complete_when_the_next_section_starts(extract_score):
+    parser = AnalysisStreamParser(extract_score)
+    assert parser.feed("STRENGTHS:\n- SQL\n- Python\n") == []
+    assert parser.feed("GAPS & CONCERNS:\n") == ['strengths']
+    assert parser.result['strengths'] == ['SQL', 'Python']
+
+
+def test_close_completes_unterminated_last_line_and_open_section(extract_score):
+    parser = AnalysisStreamParser(extract_score)
+    parser.feed("SUMMARY:\nGood fit")
+    assert parser.close() == ['summary']
+    assert parser.result['summary'] == 'Good fit'
+
+
+def test_fields_complete_in_response_order(extract_score):
+    _, completed = parse(extract_score, [RESPONSE])
+    assert completed == [
+        'overall_score', 'interview_recommendation', 'recommendation', 'skills_score', 'experience_score',
+        'education_score', 'qualifications_score', 'strengths', 'weaknesses', 'interview_questions', 'summary'
+    ]
+
+
+def test_missing_fields_keep_defaults(extract_score):
+    result, _ = parse(extract_score, ["OVERALL SCORE: [0-100]\n"])
+    assert result['overall_score'] == 0
+    assert result['strengths'] == []
+    assert result['summary'] == ''
+
+
+def test_stream_ends_every_resume_with_a_result_when_analysis_raises():
+    analyzer = AIAnalyzer('test-key')
+
+    async def failing_stream(client, resume_text, criteria, refresh):
+        if resume_text == 'bad':
+            raise RuntimeError('provider went away')
+        yield {"type": "result", "result": {"overall_score": 50}}
+
+    analyzer._analyze_resume_stream_async = failing_stream
+
+    async def collect():
+        return [event async for event in analyzer.analyze_resumes_stream_async(['good', 'bad'], {})]
+
+    events = asyncio.run(asyncio.wait_for(collect(), timeout=5))
+    results = {event['index']: event['result'] for event in events if event['type'] == 'result'}
+    assert results[0] == {"overall_score": 50}
+    assert results[1]['error'] == 'provider went away'
@@ -0,0 +1,102 @@
+import pytest
+
+from condenser import TRUNCATION_MARK, clean_lines, condense_resume, estimate_tokens, heading_kind, split_sections
+
+
+def resume(jobs=6, bullets=5):
+    """Build a resume with every section kind and a PDF page break after each job."""
+    lines = ["Jane Doe", "jane@example.com", "", "SUMMARY", "Data analyst with ten years of reporting work.",
+             "", "WORK EXPERIENCE"]
+    for job in range(jobs):
+        lines.append(f"Analyst {job} - Company {job} ({2024 - job})")
+        lines += [f"  •  Built report {job}.{n} for the finance team, cutting manual work by {n + 10}%."
+                  for n in range(bullets)]
+        lines += ["", f"Page {job + 1} of {jobs}", "Jane Doe - Resume", ""]
+    lines += ["SKILLS", "SQL, Python, Tableau", "", "EDUCATION", "BSc Statistics, 2012",
+              "", "CERTIFICATIONS", "Google Data Analytics", "", "HOBBIES", "Chess"]
+    return "\n".join(lines)
+
+
+def test_clean_lines_normalizes_whitespace_and_drops_boilerplate():
+    text = "  Jane   Doe \n\nCurriculum Vitae\nPage 2 of 3\n3\n-----\nReferences available upon request\nSQL"
+    assert clean_lines(text) == ["Jane Doe", "SQL"]
+
+
+def test_clean_lines_drops_header_repeated_at_page_breaks():
+    text = "Jane Doe - Resume\nLed the audit\nPage 1 of 2\nJane Doe - Resume\nRan the budget"
+    assert clean_lines(text) == ["Jane Doe - Resume", "Led the audit", "Ran the budget"]
+
+
+def test_clean_lines_drops_lines_repeated_three_times():
+    text = "Confidential\nLed the audit\nConfidential\nRan the budget\nConfidential"
+    assert clean_lines(text) == ["Confidential", "Led the audit", "Ran the budget"]
+
+
+def test_clean_lines_keeps_content_shared_by_two_roles():
+    shared = ["• Managed a team of 5 engineers", "Python", "Acme Corp, Bangkok"]
+    text = "\n".join(["Engineer (2020)", *shared, "• Shipped the app", "Lead (2022)", *shared, "• Hired the team"])
+    assert clean_lines(text) == text.split("\n")
+
+
+def test_clean_lines_keeps_long_repeated_lines_at_page_breaks():
+    long_line = "Owned the quarterly planning process for six regional offices and their vendor contracts"
+    text = f"{long_line}\nPage 1 of 2\n{long_line}"
+    assert clean_lines(text) == [long_line, long_line]
+
+
+def test_clean_lines_keeps_repeated_labels():
+    text = "Responsibilities:\nA\nPage 1 of 2\nResponsibilities:\nB"
+    assert clean_lines(text) == ["Responsibilities:", "A", "Responsibilities:", "B"]
+
+
+@pytest.mark.parametrize("line, kind", [
+    ("WORK EXPERIENCE", "experience"),
+    ("Skills & Abilities", "skills"),
+    ("Education:", "education"),
+    ("Hobbies and Interests", "personal"),
+    ("Built the data warehouse", None),
+    ("Experience " + "x" * 40, None)
+])
+def test_heading_kind(line, kind):
+    assert heading_kind(line) == kind
+
+
+def test_split_sections_starts_with_header():
+    sections = split_sections(["Jane Doe", "SKILLS", "SQL", "EDUCATION", "BSc"])
+    assert sections == [("header", ["Jane Doe"]), ("skills", ["SKILLS", "SQL"]), ("education", ["EDUCATION", "BSc"])]
+
+
+def test_condense_returns_cleaned_text_within_budget():
+    text = "Jane Doe\n\nSKILLS\nSQL,   Python"
+    assert condense_resume(text, 800) == "Jane Doe\nSKILLS\nSQL, Python"
+    assert condense_resume(resume(), None) == "\n".join(clean_lines(resume()))
+
+
+@pytest.mark.parametrize("max_tokens", [150, 300, 600])
+def test_condense_stays_within_budget(max_tokens):
+    condensed = condense_resume(resume(jobs=9, bullets=7), max_tokens)
+    assert estimate_tokens(condensed) <= max_tokens
+
+
+def test_condense_keeps_every_section_and_the_latest_role():
+    condensed = condense_resume(resume(jobs=9, bullets=7), 300)
+    for fact in ["Jane Doe", "Analyst 0 - Company 0", "SQL, Python, Tableau", "BSc Statistics", "Google Data Analytics"]:
+        assert fact in condensed
+    # Older roles are what gets left out, marked as such
+    assert "Analyst 8" not in condensed
+    assert TRUNCATION_MARK in condensed
+
+
+def test_condense_gives_leftover_budget_to_experience():
+    tight = condense_resume(resume(jobs=9, bullets=7), 300)
+    roomy = condense_resume(resume(jobs=9, bullets=7), 600)
+    assert roomy.count("Built report") > tight.count("Built report")
+
+
+def test_condense_cuts_long_paragraph_at_word_boundary():
+    paragraph = " ".join(f"word{n}" for n in range(400))
+    condensed = condense_resume(f"SUMMARY\n{paragraph}", 200)
+    cut = condensed.split("\n")[1]
+    assert cut.endswith(" " + TRUNCATION_MARK)
+    assert paragraph.startswith(cut[:-len(TRUNCATION_MARK) - 1])
+    assert cut[:-len(TRUNCATION_MARK) - 1].split(" ")[-1] in paragraph.split(" ")
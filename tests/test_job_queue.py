@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+
+import pytest
+
+from job_queue import JobQueue, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs.sqlite3'))
+
+
+def abandon(store, job_id):
+    """Make a job look like its owner stopped checking in long ago."""
+    with sqlite3.connect(store.path) as conn:
+        conn.execute("UPDATE jobs SET heartbeat = 0 WHERE id = ?", (job_id,))
+
+
+def wait_until_finished(store, job_id):
+    for _ in range(500):
+        job = store.get(job_id, files=False)
+        if job['status'] in ('completed', 'failed'):
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_claim_stale_takes_over_only_abandoned_jobs(store):
+    store.create('alive', {'n': 1}, ['a.pdf'], 'worker-1')
+    store.create('abandoned', {'n': 2}, ['b.pdf'], 'worker-1')
+    abandon(store, 'abandoned')
+
+    assert store.claim_stale('worker-2', stale_after=60) == [('abandoned', {'n': 2})]
+    with sqlite3.connect(store.path) as conn:
+        assert conn.execute("SELECT owner FROM jobs WHERE id = 'abandoned'").fetchone() == ('worker-2',)
+    # Its heartbeat is fresh again, so nobody else claims it
+    assert store.claim_stale('worker-3', stale_after=60) == []
+
+
+def test_claim_stale_skips_finished_jobs(store):
+    store.create('done', {}, ['a.pdf'], 'worker-1')
+    store.finish('done', {'paths': {}})
+    abandon(store, 'done')
+    assert store.claim_stale('worker-2', stale_after=60) == []
+
+
+def test_touch_keeps_a_job_from_being_claimed(store):
+    store.create('job', {}, ['a.pdf'], 'worker-1')
+    abandon(store, 'job')
+    store.touch(['job'])
+    assert store.claim_stale('worker-2', stale_after=60) == []
+
+
+def test_finish_drops_the_request(store):
+    store.create('job', {'files': [{'file_id': 'x'}]}, ['a.pdf'], 'worker-1')
+    store.finish('job', error='boom')
+    with sqlite3.connect(store.path) as conn:
+        assert conn.execute("SELECT request FROM jobs WHERE id = 'job'").fetchone() == (None,)
+    job = store.get('job', files=False)
+    assert (job['status'], job['error']) == ('failed', 'boom')
+
+
+def test_finished_files_survive_for_a_resumed_job(store):
+    store.create('job', {}, ['a.pdf', 'b.pdf', 'c.pdf'], 'worker-1')
+    store.record_file('job', 1, 'done', {'overall_score': 70})
+    store.record_file('job', 2, 'error', {'error': 'unreadable'})
+    assert store.finished_files('job') == {
+        1: {'status': 'done', 'result': {'overall_score': 70}},
+        2: {'status': 'error', 'result': {'error': 'unreadable'}}
+    }
+    assert store.progress('job') == {'pending': 1, 'done': 1, 'error': 1, 'screened_out': 0}
+
+
+def test_retention_purges_old_finished_jobs(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'), retention=0)
+    store.create('old', {}, ['a.pdf'], 'worker-1')
+    store.finish('old')
+    store.create('new', {}, ['b.pdf'], 'worker-1')
+    assert store.get('old') is None
+    assert store.get('new') is not None
+
+
+def test_queue_runs_job_and_keeps_secrets_out_of_the_store(store):
+    seen = {}
+
+    def runner(job_id, request, done, report):
+        seen.update(request)
+        report(0, 'done', {'overall_score': 88})
+        return {'analyzed': 1}
+
+    queue = JobQueue(store, runner, workers=1, secret_fields=('api_key',))
+    job_id = queue.submit({'api_key': 'sk-secret', 'files': ['a']}, ['a.pdf'])
+    with sqlite3.connect(store.path) as conn:
+        stored = conn.execute("SELECT request FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+    job = wait_until_finished(store, job_id)
+
+    assert 'sk-secret' not in (stored or '')
+    assert seen == {'api_key': 'sk-secret', 'files': ['a']}
+    assert (job['status'], job['summary']) == ('completed', {'analyzed': 1})
+    assert store.file_result(job_id, 0)['result'] == {'overall_score': 88}
+
+
+def test_queue_resumes_abandoned_job_with_its_finished_files(store):
+    store.create('job', {'files': ['a', 'b']}, ['a.pdf', 'b.pdf'], 'dead-worker')
+    store.record_file('job', 0, 'done', {'overall_score': 60})
+    abandon(store, 'job')
+    calls = []
+
+    def runner(job_id, request, done, report):
+        calls.append((job_id, request, sorted(done)))
+        report(1, 'done', {'overall_score': 75})
+
+    JobQueue(store, runner, workers=1)
+    job = wait_until_finished(store, 'job')
+
+    assert calls == [('job', {'files': ['a', 'b']}, [0])]
+    assert job['status'] == 'completed'
+    assert store.progress('job')['done'] == 2
+
+
+def test_runner_error_fails_the_job(store):
+    def runner(job_id, request, done, report):
+        raise ValueError('Anthropic API key not found')
+
+    queue = JobQueue(store, runner, workers=1)
+    job = wait_until_finished(store, queue.submit({}, ['a.pdf']))
+    assert (job['status'], job['error']) == ('failed', 'Anthropic API key not found')
@@ -0,0 +1,122 @@
+import sqlite3
+
+import pytest
+
+from job_queue import JobStore
+
+
+FILES = [
+    # (filename, status, result)
+    ('alice.pdf', 'done', {'overall_score': 72, 'skills_score': 80, 'interview_recommendation': 'Yes - good fit'}),
+    ('bob.pdf', 'error', {'error': 'Failed to parse resume'}),
+    ('carol.docx', 'done', {'overall_score': 91, 'skills_score': 60, 'interview_recommendation': 'Yes'}),
+    ('dave.pdf', 'screened_out', {'local_score': 3.5}),
+    ('erin.pdf', None, None),
+    ('frank_50%.pdf', 'done', {'overall_score': 45, 'interview_recommendation': 'No.'}),
+    ('grace.pdf', 'done', {'overall_score': 72, 'interview_recommendation': 'Maybe'})
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    store.create('job', {}, [filename for filename, _, _ in FILES], 'worker')
+    for position, (_, status, result) in enumerate(FILES):
+        if status:
+            store.record_file('job', position, status, result)
+    return store
+
+
+def names(rows):
+    return [row['filename'] for row in rows]
+
+
+def test_score_sort_puts_analyzed_first_then_errors_then_screened_out(store):
+    rows, total = store.page_files('job')
+    assert names(rows) == ['carol.docx', 'alice.pdf', 'grace.pdf', 'frank_50%.pdf', 'bob.pdf', 'dave.pdf']
+    assert total == 6
+
+
+def test_ascending_score_keeps_status_order_and_position_ties(store):
+    rows, _ = store.page_files('job', descending=False)
+    assert names(rows) == ['frank_50%.pdf', 'alice.pdf', 'grace.pdf', 'carol.docx', 'bob.pdf', 'dave.pdf']
+
+
+@pytest.mark.parametrize("sort, descending, expected", [
+    ('filename', False, ['alice.pdf', 'bob.pdf', 'carol.docx', 'dave.pdf', 'frank_50%.pdf', 'grace.pdf']),
+    ('position', True, ['grace.pdf', 'frank_50%.pdf', 'dave.pdf', 'carol.docx', 'bob.pdf', 'alice.pdf'])
+])
+def test_other_sorts(store, sort, descending, expected):
+    assert names(store.page_files('job', sort=sort, descending=descending)[0]) == expected
+
+
+def test_unknown_sort_or_status_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.page_files('job', sort='salary')
+    with pytest.raises(ValueError):
+        store.page_files('job', status='lost')
+
+
+def test_pending_files_only_listed_on_request(store):
+    rows, total = store.page_files('job', status='pending')
+    assert rows == [{'position': 4, 'status': 'pending', 'filename': 'erin.pdf'}]
+    assert total == 1
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({'status': 'error'}, ['bob.pdf']),
+    ({'recommendation': 'yes'}, ['carol.docx', 'alice.pdf']),
+    ({'recommendation': 'NO'}, ['frank_50%.pdf']),
+    ({'min_score': 72}, ['carol.docx', 'alice.pdf', 'grace.pdf']),
+    ({'search': 'A'}, ['carol.docx', 'alice.pdf', 'grace.pdf', 'frank_50%.pdf', 'dave.pdf']),
+    ({'search': '50%'}, ['frank_50%.pdf']),
+    ({'search': '_'}, ['frank_50%.pdf']),
+    ({'search': 'docx', 'min_score': 95}, [])
+])
+def test_filters(store, filters, expected):
+    rows, total = store.page_files('job', **filters)
+    assert names(rows) == expected
+    assert total == len(expected)
+
+
+def test_paging_reports_the_full_total(store):
+    rows, total = store.page_files('job', offset=2, limit=2)
+    assert names(rows) == ['grace.pdf', 'frank_50%.pdf']
+    assert total == 6
+
+
+def test_rows_are_slim_and_named(store):
+    rows, _ = store.page_files('job', status='done', limit=1)
+    assert rows == [{
+        'overall_score': 91, 'skills_score': 60, 'interview_recommendation': 'Yes',
+        'position': 2, 'status': 'done', 'filename': 'carol.docx'
+    }]
+    assert store.rows_at('job', [1, 4]) == {
+        1: {'error': 'Failed to parse resume', 'position': 1, 'status': 'error', 'filename': 'bob.pdf'},
+        4: {'position': 4, 'status': 'pending', 'filename': 'erin.pdf'}
+    }
+
+
+def test_iter_results_streams_full_results_in_listing_order(store):
+    results = list(store.iter_results('job', recommendation='yes'))
+    assert [(position, status) for position, status, _ in results] == [(2, 'done'), (0, 'done')]
+    assert results[0][2] == FILES[2][2]
+
+
+def test_sub_scores_of_analyzed_files(store):
+    assert store.sub_scores('job', min_score=70) == [
+        (0, 80, None, None, None), (2, 60, None, None, None), (6, None, None, None, None)
+    ]
+
+
+def test_score_listing_uses_the_rank_index(store):
+    where, params = store._filters('job', None, None, None, None)
+    with sqlite3.connect(store.path) as conn:
+        plan = conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM job_files WHERE {where} "
+            f"ORDER BY {store._order('score', True)} LIMIT 50",
+            params
+        ).fetchall()
+    details = ' '.join(row[-1] for row in plan)
+    assert 'idx_job_files_rank' in details
+    assert 'TEMP B-TREE' not in details
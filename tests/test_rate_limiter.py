@@ -0,0 +1,116 @@
+import pytest
+
+import rate_limiter
+from rate_limiter import MIN_RATE_SCALE, RATE_LIMITED_SCALE, SUCCESS_RECOVERY, RateLimiter
+
+
+class Clock:
+    """Stand-in for time.time that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def limiter(request, tmp_path, clock):
+    state_path = str(tmp_path / 'limits.sqlite3') if request.param == 'sqlite' else None
+    return RateLimiter('test', requests_per_minute=60, tokens_per_minute=6000, state_path=state_path)
+
+
+def test_reserve_takes_from_full_buckets(limiter):
+    assert limiter.reserve(1000) == 0
+    snapshot = limiter.snapshot()
+    assert snapshot['requests_available'] == 59
+    assert snapshot['tokens_available'] == 5000
+
+
+def test_reserve_reports_wait_until_tokens_refill(limiter, clock):
+    assert limiter.reserve(6000) == 0
+    # 6000 tokens a minute refill at 100 per second
+    assert limiter.reserve(500) == pytest.approx(5.0)
+    clock.now += 5
+    assert limiter.reserve(500) == 0
+
+
+def test_waiting_reservation_takes_nothing(limiter):
+    limiter.reserve(6000)
+    limiter.reserve(500)
+    assert limiter.snapshot()['requests_available'] == 59
+
+
+def test_refill_stops_at_capacity(limiter, clock):
+    limiter.reserve(3000)
+    clock.now += 3600
+    snapshot = limiter.snapshot()
+    assert snapshot['requests_available'] == 60
+    assert snapshot['tokens_available'] == 6000
+
+
+def test_request_larger_than_bucket_waits_for_full_bucket(limiter, clock):
+    limiter.reserve(3000)
+    assert limiter.reserve(10000) == pytest.approx(30.0)
+    clock.now += 30
+    assert limiter.reserve(10000) == 0
+    assert limiter.snapshot()['tokens_available'] == 0
+
+
+def test_request_limit_applies_independently_of_tokens(limiter):
+    for _ in range(60):
+        assert limiter.reserve(1) == 0
+    # One request a second
+    assert limiter.reserve(1) == pytest.approx(1.0)
+
+
+def test_record_success_returns_unused_tokens(limiter):
+    limiter.reserve(2000)
+    limiter.record_success(2000, used_tokens=500)
+    assert limiter.snapshot()['tokens_available'] == 5500
+
+
+def test_rate_limited_blocks_for_retry_after_and_scales_down(limiter, clock):
+    limiter.record_rate_limited(retry_after=12)
+    assert limiter.reserve(1) == pytest.approx(12.0)
+    snapshot = limiter.snapshot()
+    assert snapshot['rate_scale'] == RATE_LIMITED_SCALE
+    # Buckets shrink to the scaled capacity
+    assert snapshot['tokens_available'] == 6000 * RATE_LIMITED_SCALE
+    clock.now += 12
+    assert limiter.reserve(1) == 0
+
+
+def test_rate_scale_has_a_floor_and_recovers_on_success(limiter):
+    for _ in range(20):
+        limiter.record_rate_limited()
+    assert limiter.snapshot()['rate_scale'] == MIN_RATE_SCALE
+
+    limiter.record_success(10)
+    assert limiter.snapshot()['rate_scale'] == pytest.approx(MIN_RATE_SCALE * SUCCESS_RECOVERY, abs=1e-3)
+
+
+def test_shared_state_file_is_one_budget(tmp_path, clock):
+    state_path = str(tmp_path / 'limits.sqlite3')
+    first = RateLimiter('shared', 60, 6000, state_path)
+    second = RateLimiter('shared', 60, 6000, state_path)
+    other = RateLimiter('other', 60, 6000, state_path)
+
+    first.reserve(4000)
+    assert second.reserve(4000) == pytest.approx(20.0)
+    assert other.reserve(4000) == 0
+
+
+def test_from_env_reads_limits_and_hashes_key(monkeypatch):
+    monkeypatch.setenv('ANTHROPIC_RPM', '5')
+    monkeypatch.setenv('ANTHROPIC_TPM', '700')
+    limiter = RateLimiter.from_env('anthropic', 'model', 'sk-secret')
+    assert (limiter.requests_per_minute, limiter.tokens_per_minute) == (5, 700)
+    assert 'sk-secret' not in limiter.key
@@ -0,0 +1,209 @@
+import random
+
+import pytest
+
+from requisitions import RankedIndex, RequisitionStore, criteria_key
+
+
+CRITERIA = {'job_title': 'Data Engineer', 'required_skills': 'Python, SQL'}
+NEW_CRITERIA = {'job_title': 'Data Engineer', 'required_skills': 'Python, Spark'}
+KEY = criteria_key(CRITERIA)
+
+
+def test_criteria_key_ignores_key_order():
+    assert criteria_key({'a': 1, 'b': 2}) == criteria_key({'b': 2, 'a': 1})
+    assert criteria_key(CRITERIA) != criteria_key(NEW_CRITERIA)
+
+
+def test_index_sorts_best_first_and_breaks_ties_by_seq():
+    index = RankedIndex([(70, 1, 'a'), (90, 2, 'b'), (70, 0, 'c'), (50, 3, 'd')], version=4)
+    assert index.version == 4
+    assert len(index) == 4
+    assert index.page(0, 10) == ['b', 'c', 'a', 'd']
+
+
+def test_insert_returns_rank():
+    index = RankedIndex([(90, 0, 'a'), (70, 1, 'b')], version=0)
+    assert index.insert(80, 2, 'c') == 1
+    assert index.insert(95, 3, 'd') == 0
+    assert index.insert(70, 4, 'e') == 4
+    assert index.insert(10, 5, 'f') == 5
+    assert index.page(0, 10) == ['d', 'a', 'c', 'b', 'e', 'f']
+
+
+def test_insert_matches_full_sort():
+    rng = random.Random(7)
+    entries = [(rng.randint(0, 100), seq, f"f{seq}") for seq in range(300)]
+    index = RankedIndex([], version=0)
+    for score, seq, file_id in entries:
+        index.insert(score, seq, file_id)
+    assert index.page(0, 300) == RankedIndex(entries, version=0).page(0, 300)
+
+
+def test_rank_and_remove():
+    index = RankedIndex([(90, 0, 'a'), (70, 1, 'b'), (50, 2, 'c')], version=0)
+    assert index.rank(70, 1, 'b') == 1
+    assert index.rank(70, 9, 'b') is None
+    assert index.rank(10, 9, 'z') is None
+
+    index.remove(70, 1, 'b')
+    assert index.page(0, 10) == ['a', 'c']
+    assert index.rank(70, 1, 'b') is None
+    # Removing a candidate that is not there changes nothing
+    index.remove(90, 5, 'a')
+    assert index.page(0, 10) == ['a', 'c']
+
+
+def test_page_slices():
+    index = RankedIndex([(100 - seq, seq, f"f{seq}") for seq in range(5)], version=0)
+    assert index.page(1, 2) == ['f1', 'f2']
+    assert index.page(4, 10) == ['f4']
+    assert index.page(10, 10) == []
+
+
+@pytest.fixture
+def store(tmp_path):
+    return RequisitionStore(str(tmp_path / 'requisitions.sqlite3'))
+
+
+def add(store, requisition_id, *file_ids):
+    return store.add_candidates(
+        requisition_id, [{'file_id': file_id, 'original_name': f"{file_id}.pdf"} for file_id in file_ids]
+    )
+
+
+def score(store, requisition_id, file_id, overall_score, key=KEY):
+    return store.record(
+        requisition_id, file_id, 'done',
+        {'filename': f"{file_id}.pdf", 'overall_score': overall_score, 'summary': 'long text'},
+        key, resume_text=f"resume of {file_id}"
+    )
+
+
+def ranking(store, requisition_id):
+    rows, total = store.ranked(requisition_id, 0, 100)
+    assert total == len(rows)
+    return [row['file_id'] for row in rows]
+
+
+def test_create_get_and_unknown(store):
+    requisition_id = store.create('Data Engineer', CRITERIA)
+    requisition = store.get(requisition_id)
+    assert requisition['title'] == 'Data Engineer'
+    assert requisition['criteria'] == CRITERIA
+    assert requisition['criteria_key'] == KEY
+    assert requisition['candidates'] == {'pending': 0, 'done': 0, 'error': 0, 'screened_out': 0, 'stale': 0}
+
+    assert store.get('missing') is None
+    assert store.update('missing', title='x') is None
+    assert store.ranked('missing') == ([], 0)
+    assert store.record('missing', 'a', 'done', {'overall_score': 1}, KEY) is None
+
+
+def test_add_candidates_skips_known_files_and_retries_errors(store):
+    requisition_id = store.create('Role', CRITERIA)
+    assert [f['file_id'] for f in add(store, requisition_id, 'a', 'b')] == ['a', 'b']
+    store.record(requisition_id, 'b', 'error', {'error': 'boom'}, KEY)
+
+    again = add(store, requisition_id, 'a', 'b', 'c')
+    assert [f['file_id'] for f in again] == ['b', 'c']
+    assert [c['file_id'] for c in store.unfinished(requisition_id)] == ['a', 'b', 'c']
+
+
+def test_record_merges_into_ranking(store):
+    requisition_id = store.create('Role', CRITERIA)
+    add(store, requisition_id, 'a', 'b', 'c', 'd')
+    assert score(store, requisition_id, 'a', 60) == 0
+    assert score(store, requisition_id, 'b', 80) == 0
+    assert score(store, requisition_id, 'c', 70) == 1
+    # A tie ranks after the candidate added earlier
+    assert score(store, requisition_id, 'd', 70) == 2
+    assert store.record(requisition_id, 'x', 'done', {'overall_score': 99}, KEY) is None
+
+    rows, total = store.ranked(requisition_id, 1, 2)
+    assert total == 4
+    assert [(row['rank'], row['file_id']) for row in rows] == [(2, 'c'), (3, 'd')]
+    assert rows[0]['filename'] == 'c.pdf'
+    assert rows[0]['stale'] is False
+    assert 'summary' not in rows[0]
+    assert store.candidate(requisition_id, 'c')['result']['summary'] == 'long text'
+
+
+def test_rescoring_moves_candidate(store):
+    requisition_id = store.create('Role', CRITERIA)
+    add(store, requisition_id, 'a', 'b', 'c')
+    for file_id, overall_score in [('a', 90), ('b', 80), ('c', 70)]:
+        score(store, requisition_id, file_id, overall_score)
+
+    assert score(store, requisition_id, 'a', 75) == 1
+    assert ranking(store, requisition_id) == ['b', 'a', 'c']
+
+
+def test_failed_reanalysis_keeps_earlier_result(store):
+    requisition_id = store.create('Role', CRITERIA)
+    add(store, requisition_id, 'a')
+    score(store, requisition_id, 'a', 85)
+
+    assert store.record(requisition_id, 'a', 'error', {'error': 'timeout'}, KEY) is None
+    candidate = store.candidate(requisition_id, 'a')
+    assert candidate['status'] == 'done'
+    assert candidate['result']['overall_score'] == 85
+    assert ranking(store, requisition_id) == ['a']
+
+
+def test_screened_out_candidates_are_not_ranked(store):
+    requisition_id = store.create('Role', CRITERIA)
+    add(store, requisition_id, 'a', 'b')
+    score(store, requisition_id, 'a', 40)
+    assert store.record(requisition_id, 'b', 'screened_out', {'local_score': 1.0}, KEY) is None
+    assert ranking(store, requisition_id) == ['a']
+    assert store.get(requisition_id)['candidates']['screened_out'] == 1
+
+
+def test_criteria_change_marks_candidates_stale(store):
+    requisition_id = store.create('Role', CRITERIA)
+    add(store, requisition_id, 'a', 'b', 'c')
+    score(store, requisition_id, 'a', 90)
+    score(store, requisition_id, 'b', 60)
+
+    assert store.update(requisition_id, title='Renamed') == 0
+    assert store.update(requisition_id, criteria=NEW_CRITERIA) == 2
+    requisition = store.get(requisition_id)
+    assert requisition['title'] == 'Renamed'
+    assert requisition['candidates']['stale'] == 2
+
+    rows, _ = store.ranked(requisition_id)
+    assert [(row['file_id'], row['stale']) for row in rows] == [('a', True), ('b', True)]
+    # Stale and pending candidates need analysis; their text is kept for it
+    assert [c['file_id'] for c in store.unfinished(requisition_id)] == ['a', 'b', 'c']
+    assert store.resume_texts(requisition_id, ['a', 'b', 'c']) == {'a': 'resume of a', 'b': 'resume of b'}
+
+    # Re-scoring under the new criteria makes a candidate current again
+    score(store, requisition_id, 'b', 95, criteria_key(NEW_CRITERIA))
+    rows, _ = store.ranked(requisition_id)
+    assert [(row['file_id'], row['stale']) for row in rows] == [('b', False), ('a', True)]
+
+    # Changing the criteria back flips staleness again
+    assert store.update(requisition_id, criteria=CRITERIA) == 1
+    assert not store.candidate(requisition_id, 'a')['stale']
+    assert store.candidate(requisition_id, 'b')['stale']
+
+
+def test_other_store_sees_ranking_changes(tmp_path):
+    path = str(tmp_path / 'requisitions.sqlite3')
+    first = RequisitionStore(path)
+    second = RequisitionStore(path)
+    requisition_id = first.create('Role', CRITERIA)
+    add(first, requisition_id, 'a', 'b', 'c')
+    score(first, requisition_id, 'a', 50)
+    assert ranking(second, requisition_id) == ['a']
+
+    # Each store's in-memory ranking is behind the other's updates
+    score(first, requisition_id, 'b', 70)
+    assert score(second, requisition_id, 'c', 60) == 1
+    assert ranking(first, requisition_id) == ['b', 'c', 'a']
+    assert ranking(second, requisition_id) == ['b', 'c', 'a']
+
+    assert second.delete(requisition_id)
+    assert not first.delete(requisition_id)
+    assert first.ranked(requisition_id) == ([], 0)
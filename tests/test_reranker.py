@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from reranker import SUB_SCORES, parse_weight_spec, parse_weights, rerank, rerank_results, score_matrix
+
+
+def test_no_weights_means_equal_weights():
+    assert parse_weights(None) == pytest.approx([0.25] * 4)
+    assert parse_weights({}) == pytest.approx([0.25] * 4)
+
+
+def test_weights_are_normalized_and_accept_short_names():
+    weights = parse_weights({'skills': 3, 'experience_score': '1'})
+    assert weights == pytest.approx([0.75, 0.25, 0, 0])
+
+
+@pytest.mark.parametrize("weights, message", [
+    ({'salary': 1}, 'Unknown sub-score'),
+    ({'skills': 'lots'}, 'must be a number'),
+    ({'skills': None}, 'must be a number'),
+    ({'skills': -1}, 'zero or more'),
+    ({'skills': float('nan')}, 'zero or more'),
+    ({'skills': float('inf')}, 'zero or more'),
+    ({'skills': 0, 'education': 0}, 'above zero')
+])
+def test_invalid_weights(weights, message):
+    with pytest.raises(ValueError, match=message):
+        parse_weights(weights)
+
+
+def test_weight_spec():
+    assert parse_weight_spec(' skills:3, experience : 2 ,,') == {'skills': '3', 'experience': '2'}
+    assert parse_weight_spec('') == {}
+    with pytest.raises(ValueError):
+        parse_weight_spec('skills=3')
+
+
+def test_score_matrix_treats_missing_and_non_numeric_scores_as_zero():
+    matrix = score_matrix([
+        {'skills_score': 80, 'experience_score': 60.5, 'education_score': True},
+        {'qualifications_score': '90'}
+    ])
+    assert matrix.tolist() == [[80, 60.5, 0, 0], [0, 0, 0, 0]]
+    assert score_matrix([]).shape == (0, len(SUB_SCORES))
+
+
+def test_rerank_orders_by_weighted_composite():
+    matrix = np.array([
+        [90, 10, 50, 50],
+        [40, 95, 50, 50],
+        [70, 70, 50, 50]
+    ])
+    composite, order = rerank(matrix, parse_weights({'skills': 1}))
+    assert composite.tolist() == [90, 40, 70]
+    assert order.tolist() == [0, 2, 1]
+
+    composite, order = rerank(matrix, parse_weights({'experience': 1}))
+    assert order.tolist() == [1, 2, 0]
+
+    composite, _ = rerank(matrix, parse_weights({'skills': 1, 'experience': 1}))
+    assert composite.tolist() == [50, 67.5, 70]
+
+
+def test_rerank_keeps_current_order_for_ties_and_ignores_nan():
+    matrix = np.array([[50, 50, 50, 50], [np.nan, 100, 100, 100], [50, 50, 50, 50]])
+    composite, order = rerank(matrix, parse_weights(None))
+    assert composite.tolist() == [50, 75, 50]
+    assert order.tolist() == [1, 0, 2]
+
+
+def test_rerank_results_adds_rounded_weighted_score():
+    results = [
+        {'filename': 'a', 'skills_score': 61, 'experience_score': 62},
+        {'filename': 'b', 'skills_score': 90, 'experience_score': 20}
+    ]
+    ranked = rerank_results(results, parse_weights({'skills': 2, 'experience': 1}))
+    assert [(r['filename'], r['weighted_score']) for r in ranked] == [('b', 66.7), ('a', 61.3)]
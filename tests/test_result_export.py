@@ -0,0 +1,75 @@
+import csv
+import os
+
+import pytest
+
+import result_export
+from result_export import EXPORT_COLUMNS, export_available, export_rows, stream_export, write_export
+
+
+RESULTS = [
+    {
+        'filename': 'alice.pdf', 'overall_score': 88.5, 'local_score': 4.2,
+        'interview_recommendation': 'Yes', 'skills_score': 90, 'experience_score': 85,
+        'education_score': 80, 'qualifications_score': 75,
+        'strengths': ['SQL', 'Tableau'], 'weaknesses': ['No Python'],
+        'interview_questions': ['Describe a dashboard <you> built & why'],
+        'summary': 'Strong analyst\x07 with retail experience'
+    },
+    {'filename': 'broken.pdf', 'error': 'Failed to parse resume'},
+    {'filename': 'bob.pdf', 'overall_score': 61, 'recommendation': 'Maybe', 'summary': 'x' * 40000}
+]
+
+HEADER = [name for name, _ in EXPORT_COLUMNS]
+
+
+def test_export_rows_rank_and_skip_errors():
+    rows = list(export_rows(RESULTS))
+    assert [row[:3] for row in rows] == [[1, 'alice.pdf', 88.5], [2, 'bob.pdf', 61]]
+    assert rows[0][9:11] == ['SQL; Tableau', 'No Python']
+    assert rows[1][3] == ''
+    assert rows[1][4] == 'Maybe'
+
+
+def test_csv_export(tmp_path):
+    path = tmp_path / 'results.csv'
+    write_export(str(path), 'csv', RESULTS)
+    with open(path, encoding='utf-8-sig', newline='') as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == HEADER
+    assert [row[1] for row in rows[1:]] == ['alice.pdf', 'bob.pdf']
+
+
+def test_xlsx_export_opens_in_openpyxl(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    path = tmp_path / 'results.xlsx'
+    write_export(str(path), 'xlsx', RESULTS)
+
+    sheet = openpyxl.load_workbook(path, read_only=True).active
+    rows = [list(row) for row in sheet.iter_rows(values_only=True)]
+    assert rows[0] == HEADER
+    assert rows[1][:9] == [1, 'alice.pdf', 88.5, 4.2, 'Yes', 90, 85, 80, 75]
+    assert rows[1][11] == 'Describe a dashboard <you> built & why'
+    # Control characters are dropped and long text is cut to Excel's cell limit
+    assert rows[1][12] == 'Strong analyst with retail experience'
+    assert rows[2][:3] == [2, 'bob.pdf', 61]
+    assert rows[2][3] is None
+    assert len(rows[2][12]) == result_export.XLSX_MAX_CELL_CHARS
+
+
+def test_exports_stream_in_pieces(monkeypatch):
+    monkeypatch.setattr(result_export, 'FLUSH_BYTES', 256)
+    # Random summaries, so the xlsx deflate stream cannot shrink them away
+    results = [
+        {'filename': f"resume_{index}.pdf", 'overall_score': index, 'summary': os.urandom(1024).hex()}
+        for index in range(200)
+    ]
+    for export_format in ('csv', 'xlsx'):
+        assert len(list(stream_export(export_format, export_rows(results)))) > 3
+
+
+def test_unknown_format():
+    assert not export_available('pdf')
+    assert export_available('csv') and export_available('xlsx')
+    with pytest.raises(ValueError):
+        stream_export('pdf', [])
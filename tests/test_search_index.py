@@ -0,0 +1,152 @@
+import os
+
+import numpy as np
+import pytest
+
+import search_index
+from search_index import (
+    FEATURES_FILE, OFFSETS_FILE, WEIGHTS_FILE, SearchIndex, hashed_features, text_key
+)
+
+
+RESUMES = [
+    ("Alice Wong\nData analyst with SQL, Tableau and Excel reporting for retail sales", "alice.pdf"),
+    ("Bob Chan\nBackend engineer building Python and Django services on AWS", "bob.pdf"),
+    ("Carol Lee\nRegistered nurse with ICU and emergency care experience", "carol.docx"),
+    ("Dave Smith\nAccountant preparing tax returns, audits and payroll", "dave.pdf"),
+    ("Erin Park\nMachine learning engineer, PyTorch models and Python data pipelines", "erin.pdf")
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / 'index'))
+    assert index.add_many(RESUMES) == len(RESUMES)
+    return index
+
+
+def filenames(hits):
+    return [hit['filename'] for hit in hits]
+
+
+def test_hashed_features_are_sorted_unit_vectors():
+    features, weights = hashed_features("python python sql")
+    assert list(features) == sorted(set(features))
+    assert len(features) == len(weights) == 4
+    assert np.linalg.norm(weights) == pytest.approx(1.0)
+    features, weights = hashed_features("  ...  ")
+    assert len(features) == len(weights) == 0
+
+
+def test_each_resume_finds_itself_first(index):
+    for text, filename in RESUMES:
+        hits = index.search(text, top_k=3)
+        assert hits[0]['filename'] == filename
+        assert hits[0]['key'] == text_key(text)
+        assert hits[0]['score'] == pytest.approx(1.0, abs=0.01)
+        assert hits[0]['score'] >= hits[1]['score'] >= hits[2]['score']
+
+
+def test_search_returns_title_and_ranks_by_similarity(index):
+    hits = index.search("Python engineer", top_k=2)
+    assert sorted(filenames(hits)) == ['bob.pdf', 'erin.pdf']
+    assert hits[0]['title'] in ('Bob Chan', 'Erin Park')
+    assert 0 < hits[1]['score'] <= hits[0]['score'] <= 1
+    assert isinstance(hits[0]['added_at'], float)
+
+
+def test_search_limits(index, tmp_path):
+    assert len(index.search("python", top_k=100)) == len(RESUMES)
+    assert index.search("python", top_k=0) == []
+    assert index.search("", top_k=5) == []
+    assert SearchIndex(str(tmp_path / 'empty')).search("python") == []
+
+
+def test_duplicates_and_empty_texts_are_skipped(index):
+    text, _ = RESUMES[0]
+    assert not index.add(text, 'alice_copy.pdf')
+    assert not index.add('', 'blank.pdf')
+    assert not index.add('!!! ---', 'symbols.pdf')
+    assert index.add_many([("New person\nWelder", 'a.pdf'), ("New person\nWelder", 'b.pdf')]) == 1
+    assert index.stats()['documents'] == len(RESUMES) + 1
+    assert filenames(index.search(text, top_k=1)) == ['alice.pdf']
+
+
+def test_stats_counts_documents_and_bytes(index, tmp_path):
+    stats = index.stats()
+    assert stats['documents'] == len(RESUMES)
+    assert stats['bytes'] > search_index.N_FEATURES * 4
+    assert SearchIndex(str(tmp_path / 'empty')).stats()['documents'] == 0
+
+
+def test_blocked_scan_matches_single_pass(index, monkeypatch):
+    query = "Python data engineer with SQL"
+    expected = index.search(query, top_k=5)
+    monkeypatch.setattr(search_index, 'SCAN_BLOCK', 3)
+    assert index.search(query, top_k=5) == expected
+
+
+def test_other_instance_sees_new_resumes(index):
+    other = SearchIndex(index.directory)
+    assert other.search("welder", top_k=1)[0]['filename'] != 'frank.pdf'
+    index.add("Frank Moore\nCertified welder and pipe fitter", 'frank.pdf')
+    assert other.search("welder", top_k=1)[0]['filename'] == 'frank.pdf'
+
+
+def test_partial_write_is_ignored_and_cut_off(index):
+    expected = index.search("Python engineer", top_k=5)
+    # A writer that failed before committing leaves extra data at the end
+    for name, junk in ((FEATURES_FILE, 7), (WEIGHTS_FILE, 7), (OFFSETS_FILE, 2)):
+        with open(os.path.join(index.directory, name), 'ab') as file:
+            file.write(b'\xff' * 4 * junk)
+
+    reopened = SearchIndex(index.directory)
+    assert reopened.stats()['documents'] == len(RESUMES)
+    assert reopened.search("Python engineer", top_k=5) == expected
+
+    assert reopened.add("Grace Kim\nPython and Go engineer", 'grace.pdf')
+    sizes = {name: os.path.getsize(os.path.join(index.directory, name))
+             for name in (FEATURES_FILE, WEIGHTS_FILE, OFFSETS_FILE)}
+    offsets = np.fromfile(os.path.join(index.directory, OFFSETS_FILE), dtype=np.int64)
+    assert len(offsets) == len(RESUMES) + 2
+    assert sizes[FEATURES_FILE] == sizes[WEIGHTS_FILE] == offsets[-1] * 4
+    for text, filename in RESUMES + [("Grace Kim\nPython and Go engineer", 'grace.pdf')]:
+        assert reopened.search(text, top_k=1)[0]['filename'] == filename
+
+
+def test_failed_commit_leaves_index_usable(index, monkeypatch):
+    expected = index.search("nurse", top_k=5)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    # Fail after the vectors are appended but before the rows are committed
+    monkeypatch.setattr(search_index.np, 'memmap', fail)
+    features_path = os.path.join(index.directory, FEATURES_FILE)
+    size = os.path.getsize(features_path)
+    with pytest.raises(RuntimeError):
+        index.add("Henry Ford\nNurse practitioner", 'henry.pdf')
+    monkeypatch.undo()
+    assert os.path.getsize(features_path) > size
+
+    assert index.stats()['documents'] == len(RESUMES)
+    assert index.search("nurse", top_k=5) == expected
+    assert index.add("Henry Ford\nNurse practitioner", 'henry.pdf')
+    assert index.search("Henry Ford nurse practitioner", top_k=1)[0]['filename'] == 'henry.pdf'
+
+
+def test_truncated_offsets_file_is_rebuilt(tmp_path):
+    index = SearchIndex(str(tmp_path / 'index'))
+    with open(os.path.join(index.directory, OFFSETS_FILE), 'wb') as file:
+        file.write(b'\x01\x02\x03')
+    assert index.add(*RESUMES[0])
+    assert filenames(index.search(RESUMES[0][0], top_k=1)) == ['alice.pdf']
+
+
+def test_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv('SEARCH_INDEX_DIR', '')
+    assert SearchIndex.from_env(str(tmp_path / 'default')) is None
+    monkeypatch.setenv('SEARCH_INDEX_DIR', str(tmp_path / 'configured'))
+    assert SearchIndex.from_env(str(tmp_path / 'default')).directory == str(tmp_path / 'configured')
+    monkeypatch.delenv('SEARCH_INDEX_DIR')
+    assert SearchIndex.from_env(str(tmp_path / 'default')).directory == str(tmp_path / 'default')
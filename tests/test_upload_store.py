@@ -0,0 +1,125 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from upload_store import ChunkedUploads, UploadStore
+
+
+DATA = bytes(range(256)) * 400  # 102400 bytes
+HALF = len(DATA) // 2
+
+
+def sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return UploadStore(str(tmp_path / 'staging'))
+
+
+@pytest.fixture
+def uploads(tmp_path, store):
+    return ChunkedUploads(str(tmp_path / 'partial'), store, max_bytes=len(DATA) * 2)
+
+
+def send(uploads, upload_id, offset, data, checksum=True):
+    return uploads.write_chunk(upload_id, offset, len(data), io.BytesIO(data), sha(data) if checksum else None)
+
+
+def test_put_stores_file_under_its_hash(store):
+    file_id, size = store.put(io.BytesIO(DATA))
+    assert (file_id, size) == (sha(DATA), len(DATA))
+    with open(store.path(file_id), 'rb') as f:
+        assert f.read() == DATA
+    assert store.has(file_id)
+    assert not store.has('0' * 64)
+    assert store.path('../etc/passwd') is None
+
+
+def test_chunks_in_any_order_complete_into_the_store(uploads, store):
+    upload_id = uploads.create('resume.pdf', len(DATA), sha(DATA))
+    assert send(uploads, upload_id, HALF, DATA[HALF:]) == len(DATA) - HALF
+    assert uploads.info(upload_id)['missing'] == [[0, HALF]]
+    assert send(uploads, upload_id, 0, DATA[:HALF]) == len(DATA)
+
+    assert uploads.complete(upload_id) == (sha(DATA), len(DATA))
+    assert store.has(sha(DATA))
+    assert uploads.info(upload_id) is None
+
+
+def test_received_ranges_merge(uploads):
+    upload_id = uploads.create('resume.pdf', len(DATA))
+    for offset in (0, 1000, 3000):
+        send(uploads, upload_id, offset, DATA[offset:offset + 1000])
+    info = uploads.info(upload_id)
+    assert info['received'] == [[0, 2000], [3000, 1000]]
+    assert info['missing'] == [[2000, 1000], [4000, len(DATA) - 4000]]
+    assert info['received_bytes'] == 3000
+
+
+def test_complete_refuses_missing_bytes(uploads):
+    upload_id = uploads.create('resume.pdf', len(DATA))
+    send(uploads, upload_id, 0, DATA[:HALF])
+    with pytest.raises(ValueError, match='missing'):
+        uploads.complete(upload_id)
+
+
+def test_corrupt_resend_keeps_the_received_chunk(uploads):
+    upload_id = uploads.create('resume.pdf', len(DATA), sha(DATA))
+    send(uploads, upload_id, 0, DATA[:HALF])
+    with pytest.raises(ValueError, match='checksum'):
+        uploads.write_chunk(upload_id, 0, HALF, io.BytesIO(b'x' * HALF), sha(DATA[:HALF]))
+    with pytest.raises(ValueError, match='ended after'):
+        uploads.write_chunk(upload_id, 0, HALF, io.BytesIO(b'x' * 10))
+
+    send(uploads, upload_id, HALF, DATA[HALF:])
+    assert uploads.complete(upload_id)[0] == sha(DATA)
+
+
+def test_failed_chunk_is_not_counted(uploads):
+    upload_id = uploads.create('resume.pdf', len(DATA))
+    with pytest.raises(ValueError):
+        uploads.write_chunk(upload_id, 0, HALF, io.BytesIO(DATA[:HALF]), sha(b'other'))
+    assert uploads.info(upload_id)['received'] == []
+
+
+def test_whole_file_mismatch_discards_the_upload(uploads, store):
+    upload_id = uploads.create('resume.pdf', len(DATA), sha(b'something else'))
+    send(uploads, upload_id, 0, DATA)
+    with pytest.raises(ValueError, match='File checksum'):
+        uploads.complete(upload_id)
+    assert uploads.info(upload_id) is None
+    assert not store.has(sha(DATA))
+
+
+@pytest.mark.parametrize("offset, length", [(-1, 10), (0, 0), (len(DATA) - 5, 10)])
+def test_chunk_outside_the_file_is_rejected(uploads, offset, length):
+    upload_id = uploads.create('resume.pdf', len(DATA))
+    with pytest.raises(ValueError, match='outside'):
+        uploads.write_chunk(upload_id, offset, length, io.BytesIO(b'x' * max(length, 0)))
+
+
+@pytest.mark.parametrize("size, checksum", [(0, None), (10 ** 9, None), (10, 'not-a-digest')])
+def test_create_validates(uploads, size, checksum):
+    with pytest.raises(ValueError):
+        uploads.create('resume.pdf', size, checksum)
+
+
+def test_unknown_upload(uploads):
+    with pytest.raises(LookupError):
+        uploads.write_chunk('0' * 32, 0, 1, io.BytesIO(b'x'))
+    assert uploads.info('../../etc') is None
+
+
+def test_purge_removes_idle_uploads(tmp_path, store):
+    uploads = ChunkedUploads(str(tmp_path / 'partial'), store, ttl_seconds=60)
+    idle = uploads.create('idle.pdf', 10)
+    active = uploads.create('active.pdf', 10)
+    meta = os.path.join(uploads.directory, idle, 'meta.json')
+    os.utime(meta, (0, 0))
+    assert uploads.purge() == 1
+    assert uploads.info(idle) is None
+    assert uploads.info(active) is not None
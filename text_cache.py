@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class TextCache:
+    """Two-tier cache of extracted resume text keyed by file content hash.
+
+    The memory tier is an LRU of recently used entries. The optional disk tier
+    keeps one JSON file per entry and evicts the least recently used files
+    once the directory grows past max_disk_bytes.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        max_entries: int = 512,
+        cache_dir: Optional[str] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024
+    ):
+        """Initialize the cache.
+
+        Args:
+            version: Parser version mixed into every key, so a parser change
+                never serves text extracted by older code
+            max_entries: Number of entries kept in memory (0 disables the tier)
+            cache_dir: Directory for the disk tier, or None to disable it
+            max_disk_bytes: Size limit for the disk tier
+        """
+        self.version = version
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'seconds_saved': 0.0
+        }
+
+        self._disk_bytes = 0
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    @classmethod
+    def from_env(cls, version: str) -> "TextCache":
+        """Create a cache configured from RESUME_TEXT_CACHE_* environment variables."""
+        return cls(
+            version,
+            max_entries=int(os.environ.get('RESUME_TEXT_CACHE_SIZE', 512)),
+            cache_dir=os.environ.get('RESUME_TEXT_CACHE_DIR') or None,
+            max_disk_bytes=int(os.environ.get('RESUME_TEXT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+        )
+
+    def key(self, file_content: bytes, filename: str) -> str:
+        """Return the cache key for a file's bytes.
+
+        The extension is part of the key because it selects the parser.
+        """
+        file_extension = os.path.splitext(filename)[1].lower()
+        digest = hashlib.sha256(f"{self.version}:{file_extension}\0".encode())
+        digest.update(file_content)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached text for a key, or None on a miss."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                self._counters['seconds_saved'] += entry[1]
+                return entry[0]
+
+        entry = self._read_disk(key)
+
+        with self._lock:
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+            self._counters['seconds_saved'] += entry[1]
+            self._remember(key, entry)
+        return entry[0]
+
+    def put(self, key: str, text: str, seconds: float = 0.0) -> None:
+        """Store extracted text.
+
+        Args:
+            key: Key from key()
+            text: The extracted text
+            seconds: How long extraction took, credited to seconds_saved on
+                every later hit
+        """
+        with self._lock:
+            self._remember(key, (text, seconds))
+        self._write_disk(key, text, seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['hits'] = stats['memory_hits'] + stats['disk_hits']
+            stats['memory_entries'] = len(self._memory)
+            stats['disk_bytes'] = self._disk_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['seconds_saved'] = round(stats['seconds_saved'], 3)
+        return stats
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+        for path, _, _ in self._disk_entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._disk_bytes = 0
+
+    def _remember(self, key: str, entry: Tuple[str, float]) -> None:
+        """Insert into the memory tier (caller holds the lock)."""
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        """Return the disk tier file for a key."""
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[str, float]]:
+        """Load an entry from the disk tier, refreshing its recency."""
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            os.utime(path)
+            return data['text'], data.get('seconds', 0.0)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key: str, text: str, seconds: float) -> None:
+        """Write an entry to the disk tier and evict if over the size limit."""
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'text': text, 'seconds': seconds}, f)
+            size = os.path.getsize(tmp_path)
+            # Rewriting an entry only changes the total by the difference
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing text cache entry {key}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._disk_bytes += size - replaced
+            over_limit = self._disk_bytes > self.max_disk_bytes
+        if over_limit:
+            self._evict_disk()
+
+    def _disk_entries(self):
+        """List (path, size, mtime) for every entry in the disk tier."""
+        entries = []
+        if not self.cache_dir:
+            return entries
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used disk entries until under the size limit."""
+        # Rescan rather than trusting the running total, since other worker
+        # processes may share the directory.
+        entries = sorted(self._disk_entries(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
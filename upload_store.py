@@ -0,0 +1,414 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+
+# Uploaded files expire this long after they were last uploaded or used
+DEFAULT_UPLOAD_TTL = 24 * 3600
+
+# Multipart file parts are held in memory up to this size, then spooled to disk
+DEFAULT_SPOOL_BYTES = 1024 * 1024
+
+COPY_CHUNK_BYTES = 64 * 1024
+
+# How often expired files are swept out of the staging directory
+PURGE_INTERVAL = 600
+
+FILE_ID_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+# Chunked uploads: chunk size offered to clients, and the largest file accepted
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+DEFAULT_MAX_UPLOAD_BYTES = 512 * 1024 * 1024
+
+UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadStore:
+    """Staging area on disk for uploaded resume files.
+
+    Files are stored under the SHA-256 of their content, which doubles as the
+    file ID handed back to the client, so uploading the same file twice keeps
+    one copy. The directory may be shared by several worker processes. Files
+    expire ttl_seconds after they were last uploaded or read.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float = DEFAULT_UPLOAD_TTL):
+        """Initialize the store, creating the directory if needed.
+
+        Args:
+            directory: Where staged files are kept
+            ttl_seconds: Seconds an unused file is kept
+        """
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, stream: BinaryIO) -> Tuple[str, int]:
+        """Copy a file stream into the store in chunks.
+
+        Returns:
+            The file ID and the file size in bytes
+        """
+        digest = hashlib.sha256()
+        size = 0
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.part')
+        try:
+            with os.fdopen(handle, 'wb') as temp_file:
+                while True:
+                    chunk = stream.read(COPY_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+                    size += len(chunk)
+
+            file_id = digest.hexdigest()
+            # Renaming is atomic, so readers never see a partly written file
+            os.replace(temp_path, self._path(file_id))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self._purge_if_due()
+        return file_id, size
+
+    def adopt(self, path: str, file_id: str) -> None:
+        """Move a complete file whose SHA-256 is file_id into the store.
+
+        Falls back to copying when path is on another file system.
+        """
+        try:
+            os.replace(path, self._path(file_id))
+        except OSError:
+            with open(path, 'rb') as stream:
+                self.put(stream)
+            os.remove(path)
+        self._purge_if_due()
+
+    def path(self, file_id: str) -> Optional[str]:
+        """Return the path of a stored file, or None if unknown or expired.
+
+        Reading a file restarts its expiry clock.
+        """
+        if not FILE_ID_PATTERN.match(file_id or ''):
+            return None
+        path = self._path(file_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def has(self, file_id: str) -> bool:
+        """Check whether a file is stored and not expired."""
+        return self.path(file_id) is not None
+
+    def purge(self) -> int:
+        """Delete expired files and abandoned partial writes; return how many were removed."""
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def _path(self, file_id: str) -> str:
+        """Return where a file ID is stored."""
+        return os.path.join(self.directory, file_id)
+
+    def _purge_if_due(self) -> None:
+        """Run purge at most once per PURGE_INTERVAL in this process."""
+        with self._lock:
+            now = time.time()
+            if now - self._last_purge < PURGE_INTERVAL:
+                return
+            self._last_purge = now
+        try:
+            self.purge()
+        except OSError as e:
+            print(f"Error purging upload staging directory: {e}")
+
+
+class ChunkedUploads:
+    """Resumable uploads assembled on disk chunk by chunk.
+
+    Each upload gets a directory holding its metadata, a data file of the
+    declared size that chunks are written into at their offsets, and one
+    marker per received chunk. Chunks may arrive in any order, in parallel,
+    and at any worker process sharing the directory, so an interrupted
+    upload resumes by sending only the ranges that are missing. Once every
+    byte has arrived, complete() checks the whole file against its SHA-256
+    and moves it into the UploadStore.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        store: UploadStore,
+        ttl_seconds: float = DEFAULT_UPLOAD_TTL,
+        max_bytes: int = DEFAULT_MAX_UPLOAD_BYTES
+    ):
+        """Initialize the uploads area, creating the directory if needed.
+
+        Args:
+            directory: Where partial uploads are assembled
+            store: Where completed files are moved
+            ttl_seconds: Seconds an upload is kept after its last chunk
+            max_bytes: Largest file accepted
+        """
+        self.directory = directory
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def create(self, filename: str, size: int, sha256: Optional[str] = None) -> str:
+        """Start an upload of size bytes and return its upload ID.
+
+        Args:
+            filename: Original file name, kept for the completed file
+            size: File size in bytes
+            sha256: SHA-256 hex digest of the whole file, checked on completion
+        """
+        if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+            raise ValueError("size must be a positive number of bytes")
+        if size > self.max_bytes:
+            raise ValueError(f"Files larger than {self.max_bytes} bytes are not accepted")
+        if sha256 is not None:
+            sha256 = sha256.lower()
+            if not FILE_ID_PATTERN.match(sha256):
+                raise ValueError("sha256 must be a SHA-256 hex digest")
+
+        self._purge_if_due()
+        upload_id = uuid.uuid4().hex
+        upload_dir = self._dir(upload_id)
+        os.makedirs(os.path.join(upload_dir, 'chunks'))
+        with open(os.path.join(upload_dir, 'data'), 'wb') as data_file:
+            data_file.truncate(size)
+        self._write_atomic(
+            os.path.join(upload_dir, 'meta.json'),
+            json.dumps({'filename': filename, 'size': size, 'sha256': sha256})
+        )
+        return upload_id
+
+    def info(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """Return an upload's metadata and received byte ranges, or None if unknown.
+
+        Ranges are [offset, length] pairs, merged and sorted by offset.
+        """
+        meta = self._meta(upload_id)
+        if meta is None:
+            return None
+        received = self._received(upload_id)
+        return {
+            'upload_id': upload_id,
+            'filename': meta['filename'],
+            'size': meta['size'],
+            'sha256': meta['sha256'],
+            'received': received,
+            'received_bytes': sum(length for _, length in received),
+            'missing': self._missing(received, meta['size'])
+        }
+
+    def write_chunk(
+        self,
+        upload_id: str,
+        offset: int,
+        length: int,
+        stream: BinaryIO,
+        sha256: Optional[str] = None
+    ) -> int:
+        """Write one chunk read from stream at offset.
+
+        The chunk is read and checked against sha256, if given, before any of
+        it is written, so a short or corrupt resend never overwrites bytes
+        already received; a failed chunk can simply be sent again.
+
+        Returns:
+            Total bytes received for the upload so far
+        """
+        meta = self._meta(upload_id)
+        if meta is None:
+            raise LookupError(f"Unknown upload {upload_id}")
+        if offset < 0 or length <= 0 or offset + length > meta['size']:
+            raise ValueError(f"Chunk {offset}+{length} lies outside the {meta['size']}-byte file")
+
+        upload_dir = self._dir(upload_id)
+        digest = hashlib.sha256()
+        received = 0
+        with tempfile.SpooledTemporaryFile(max_size=DEFAULT_SPOOL_BYTES) as buffer:
+            while received < length:
+                chunk = stream.read(min(COPY_CHUNK_BYTES, length - received))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                buffer.write(chunk)
+                received += len(chunk)
+
+            if received != length:
+                raise ValueError(f"Chunk ended after {received} of {length} bytes")
+            if sha256 is not None and digest.hexdigest() != sha256.lower():
+                raise ValueError("Chunk checksum does not match")
+
+            buffer.seek(0)
+            written = 0
+            fd = os.open(os.path.join(upload_dir, 'data'), os.O_WRONLY)
+            try:
+                for chunk in iter(lambda: buffer.read(COPY_CHUNK_BYTES), b''):
+                    os.pwrite(fd, chunk, offset + written)
+                    written += len(chunk)
+            finally:
+                os.close(fd)
+
+        self._write_atomic(os.path.join(upload_dir, 'chunks', str(offset)), str(length))
+        # Keeps an upload that is still receiving chunks from expiring
+        os.utime(os.path.join(upload_dir, 'meta.json'))
+        return sum(received_length for _, received_length in self._received(upload_id))
+
+    def complete(self, upload_id: str) -> Tuple[str, int]:
+        """Verify a fully received upload and move it into the store.
+
+        Returns:
+            The file ID and the file size in bytes
+        """
+        info = self.info(upload_id)
+        if info is None:
+            raise LookupError(f"Unknown upload {upload_id}")
+        if info['missing']:
+            raise ValueError(f"Upload is missing {info['size'] - info['received_bytes']} bytes")
+
+        upload_dir = self._dir(upload_id)
+        data_path = os.path.join(upload_dir, 'data')
+        digest = hashlib.sha256()
+        with open(data_path, 'rb') as data_file:
+            for chunk in iter(lambda: data_file.read(COPY_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        file_id = digest.hexdigest()
+
+        if info['sha256'] and file_id != info['sha256']:
+            # Every chunk arrived intact, so the file itself differs from
+            # the one announced; start over rather than keep bad data
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            raise ValueError("File checksum does not match; upload it again")
+
+        self.store.adopt(data_path, file_id)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        return file_id, info['size']
+
+    def purge(self) -> int:
+        """Delete uploads that received nothing for ttl_seconds; return how many were removed."""
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        for name in os.listdir(self.directory):
+            try:
+                if os.path.getmtime(os.path.join(self.directory, name, 'meta.json')) >= cutoff:
+                    continue
+            except OSError:
+                # Metadata never written or already gone; judge by the directory
+                try:
+                    if os.path.getmtime(os.path.join(self.directory, name)) >= cutoff:
+                        continue
+                except OSError:
+                    continue
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+            removed += 1
+        return removed
+
+    def _dir(self, upload_id: str) -> str:
+        """Return where an upload is assembled."""
+        return os.path.join(self.directory, upload_id)
+
+    def _meta(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """Load an upload's metadata, or None if the ID is unknown or expired."""
+        if not UPLOAD_ID_PATTERN.match(upload_id or ''):
+            return None
+        path = os.path.join(self._dir(upload_id), 'meta.json')
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            with open(path, 'r', encoding='utf-8') as meta_file:
+                return json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+    def _received(self, upload_id: str) -> List[List[int]]:
+        """Return the merged [offset, length] ranges of the chunks received."""
+        chunks_dir = os.path.join(self._dir(upload_id), 'chunks')
+        try:
+            names = os.listdir(chunks_dir)
+        except OSError:
+            return []
+        spans = []
+        for name in names:
+            if not name.isdigit():
+                continue
+            try:
+                with open(os.path.join(chunks_dir, name), 'r') as marker:
+                    spans.append((int(name), int(marker.read())))
+            except (OSError, ValueError):
+                continue
+
+        merged: List[List[int]] = []
+        for offset, length in sorted(spans):
+            if merged and offset <= merged[-1][0] + merged[-1][1]:
+                end = max(merged[-1][0] + merged[-1][1], offset + length)
+                merged[-1][1] = end - merged[-1][0]
+            else:
+                merged.append([offset, length])
+        return merged
+
+    @staticmethod
+    def _missing(received: List[List[int]], size: int) -> List[List[int]]:
+        """Return the [offset, length] ranges not covered by received."""
+        missing = []
+        position = 0
+        for offset, length in received:
+            if offset > position:
+                missing.append([position, offset - position])
+            position = max(position, offset + length)
+        if position < size:
+            missing.append([position, size - position])
+        return missing
+
+    @staticmethod
+    def _write_atomic(path: str, content: str) -> None:
+        """Write a small file so readers see either nothing or all of it."""
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        with os.fdopen(handle, 'w', encoding='utf-8') as temp_file:
+            temp_file.write(content)
+        os.replace(temp_path, path)
+
+    def _purge_if_due(self) -> None:
+        """Run purge at most once per PURGE_INTERVAL in this process."""
+        with self._lock:
+            now = time.time()
+            if now - self._last_purge < PURGE_INTERVAL:
+                return
+            self._last_purge = now
+        try:
+            self.purge()
+        except OSError as e:
+            print(f"Error purging partial uploads: {e}")